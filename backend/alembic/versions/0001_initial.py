@@ -0,0 +1,63 @@
+"""Initial schema: users, notes and transcription jobs
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+Databases created before migrations were introduced already have these
+tables; mark them with `alembic stamp 0001` before upgrading.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("username", sa.String()),
+        sa.Column("hashed_password", sa.String()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+
+    op.create_table(
+        "notes",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("tags", sa.JSON()),
+        sa.Column("source_url", sa.String()),
+        sa.Column("segments", sa.JSON()),
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+
+    op.create_table(
+        "transcription_jobs",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("url", sa.String(), nullable=False),
+        sa.Column("topics", sa.JSON()),
+        sa.Column("status", sa.String()),
+        sa.Column("progress", sa.Integer()),
+        sa.Column("result_s3_key", sa.String()),
+        sa.Column("error_message", sa.Text()),
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+
+def downgrade():
+    op.drop_table("transcription_jobs")
+    op.drop_table("notes")
+    op.drop_index("ix_users_username", table_name="users")
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_table("users")
@@ -0,0 +1,27 @@
+"""Media key on transcription jobs, for the transcript cache and job deduplication
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+Schema for the media-identity transcript cache, which predates migrations.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column("transcription_jobs", sa.Column("media_key", sa.String()))
+    # Built without blocking job writes on Postgres
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_transcription_jobs_media_key", "transcription_jobs", ["media_key"], postgresql_concurrently=True
+        )
+
+def downgrade():
+    op.drop_index("ix_transcription_jobs_media_key", table_name="transcription_jobs")
+    op.drop_column("transcription_jobs", "media_key")
@@ -0,0 +1,88 @@
+"""Search index tables for full-text search over notes and transcripts
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+Schema for ranked full-text search, which predates migrations. Existing
+notes are indexed here; completed transcripts are read from S3, so they are
+queued for index_transcript_task once the migration commits.
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.services.search_service import build_search_rows, note_search_segments
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+def upgrade():
+    search_segments = op.create_table(
+        "search_segments",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("source_type", sa.String(), nullable=False),
+        sa.Column("source_id", sa.String(), nullable=False),
+        sa.Column("position", sa.Integer()),
+        sa.Column("timestamp", sa.Float()),
+        sa.Column("text", sa.Text(), nullable=False),
+    )
+    op.create_index("ix_search_segments_source", "search_segments", ["source_type", "source_id"])
+
+    search_terms = op.create_table(
+        "search_terms",
+        sa.Column("segment_id", sa.String(), sa.ForeignKey("search_segments.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("term", sa.String(), primary_key=True),
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_search_terms_user_term", "search_terms", ["user_id", "term"])
+
+    if op.get_context().as_sql:
+        return
+    connection = op.get_bind()
+
+    # Terms are built in Python with the same stemming the service indexes with
+    notes = sa.table(
+        "notes",
+        sa.column("id", sa.String()),
+        sa.column("user_id", sa.String()),
+        sa.column("title", sa.String()),
+        sa.column("tags", sa.JSON()),
+        sa.column("segments", sa.JSON()),
+    )
+    result = connection.execution_options(yield_per=BATCH_SIZE).execute(
+        sa.select(notes.c.id, notes.c.user_id, notes.c.title, notes.c.tags, notes.c.segments)
+    )
+    for batch in result.partitions():
+        segment_rows, term_rows = [], []
+        for note in batch:
+            rows = build_search_rows(note.user_id, "note", note.id, note_search_segments(note))
+            segment_rows += rows[0]
+            term_rows += rows[1]
+        for table, rows in ((search_segments, segment_rows), (search_terms, term_rows)):
+            for first in range(0, len(rows), BATCH_SIZE):
+                op.bulk_insert(table, rows[first:first + BATCH_SIZE])
+
+    jobs = sa.table("transcription_jobs", sa.column("id", sa.String()), sa.column("status", sa.String()))
+    job_ids = connection.execute(sa.select(jobs.c.id).where(jobs.c.status == "completed")).scalars().all()
+    if job_ids:
+        # Queued only after commit, so workers see the new tables
+        sa.event.listen(connection, "commit", lambda conn: queue_transcript_indexing(job_ids), once=True)
+
+def queue_transcript_indexing(job_ids):
+    from app.tasks.transcription_tasks import index_transcript_task
+    try:
+        for job_id in job_ids:
+            index_transcript_task.delay(job_id)
+    except Exception as e:
+        print(f"Error queueing transcripts for search indexing: {e}")
+
+def downgrade():
+    op.drop_index("ix_search_terms_user_term", table_name="search_terms")
+    op.drop_table("search_terms")
+    op.drop_index("ix_search_segments_source", table_name="search_segments")
+    op.drop_table("search_segments")
@@ -0,0 +1,24 @@
+"""Composite index for keyset pagination of a user's notes
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+Schema for the keyset-paginated notes listing, which predates migrations.
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Built without blocking note writes on Postgres
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_notes_user_created", "notes", ["user_id", "created_at", "id"], postgresql_concurrently=True
+        )
+
+def downgrade():
+    op.drop_index("ix_notes_user_created", table_name="notes")
@@ -0,0 +1,45 @@
+"""note_tags table for indexed tag filters, backfilled from notes.tags
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+def upgrade():
+    note_tags = op.create_table(
+        "note_tags",
+        sa.Column("note_id", sa.String(), sa.ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("tag", sa.String(), primary_key=True),
+        sa.Column("user_id", sa.String(), nullable=False),
+    )
+    op.create_index("ix_note_tags_user_tag", "note_tags", ["user_id", "tag"])
+
+    # Offline --sql scripts get the schema only; the backfill needs a live connection
+    if op.get_context().as_sql:
+        return
+
+    # Tags are copied in Python so the backfill runs the same on every backend
+    notes = sa.table("notes", sa.column("id", sa.String()), sa.column("user_id", sa.String()), sa.column("tags", sa.JSON()))
+    connection = op.get_bind()
+    result = connection.execution_options(yield_per=BATCH_SIZE).execute(sa.select(notes.c.id, notes.c.user_id, notes.c.tags))
+    for batch in result.partitions():
+        rows = [
+            {"note_id": note_id, "tag": tag, "user_id": user_id}
+            for note_id, user_id, tags in batch
+            for tag in dict.fromkeys(tags or [])
+        ]
+        if rows:
+            op.bulk_insert(note_tags, rows)
+
+def downgrade():
+    op.drop_index("ix_note_tags_user_tag", table_name="note_tags")
+    op.drop_table("note_tags")
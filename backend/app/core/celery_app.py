@@ -1,5 +1,13 @@
+import time
 from celery import Celery
+from celery.signals import (
+    before_task_publish, celeryd_init, task_postrun, task_prerun, worker_init, worker_process_shutdown
+)
+from kombu import Queue
+from opentelemetry import context, trace
 from app.core.config import settings
+from app.core.metrics import QUEUE_WAIT_SECONDS, mark_process_dead, multiprocess_enabled, start_metrics_server
+from app.core.tracing import tracer, setup_tracing, inject_context, extract_context
 
 celery_app = Celery(
     "video_transcription",
@@ -8,6 +16,18 @@ celery_app = Celery(
     include=["app.tasks.transcription_tasks"]
 )
 
+# I/O-bound stages (downloads, S3, DB) and CPU-bound stages (ffmpeg, ASR)
+# run on separate queues so each can be scaled with its own workers.
+IO_QUEUE = "io"
+CPU_QUEUE = "cpu"
+
+# Message priorities; with the Redis broker lower values are delivered first.
+# Short audio takes the fast lane, and workflows started from a user's
+# backlog run behind interactive ones.
+PRIORITY_FAST = 0
+PRIORITY_INTERACTIVE = 3
+PRIORITY_BULK = 6
+
 celery_app.conf.update(
     task_serializer="json",
     accept_content=["json"],
@@ -17,4 +37,100 @@ celery_app.conf.update(
     task_track_started=True,
     task_time_limit=30 * 60,  # 30 minutes
     task_soft_time_limit=25 * 60,  # 25 minutes
-) 
\ No newline at end of file
+    task_acks_late=True,
+    task_queues=[Queue(IO_QUEUE), Queue(CPU_QUEUE)],
+    task_default_queue=IO_QUEUE,
+    task_default_priority=PRIORITY_INTERACTIVE,
+    broker_transport_options={"priority_steps": [PRIORITY_FAST, PRIORITY_INTERACTIVE, PRIORITY_BULK, 9]},
+    task_routes={
+        "app.tasks.transcription_tasks.download_audio_task": {"queue": IO_QUEUE},
+        "app.tasks.transcription_tasks.split_audio_task": {"queue": CPU_QUEUE},
+        "app.tasks.transcription_tasks.transcribe_chunk_task": {"queue": CPU_QUEUE},
+        "app.tasks.transcription_tasks.merge_transcript_task": {"queue": CPU_QUEUE},
+        "app.tasks.transcription_tasks.upload_transcript_task": {"queue": IO_QUEUE},
+        "app.tasks.transcription_tasks.transcription_failed_task": {"queue": IO_QUEUE},
+        "app.tasks.transcription_tasks.index_transcript_task": {"queue": IO_QUEUE},
+        "app.tasks.transcription_tasks.embed_transcript_task": {"queue": CPU_QUEUE},
+    },
+)
+
+QUEUE_PROFILES = {
+    IO_QUEUE: {
+        "worker_concurrency": settings.celery_io_concurrency,
+        "worker_prefetch_multiplier": settings.celery_io_prefetch_multiplier,
+    },
+    CPU_QUEUE: {
+        "worker_concurrency": settings.celery_cpu_concurrency,
+        "worker_prefetch_multiplier": settings.celery_cpu_prefetch_multiplier,
+    },
+}
+
+@celeryd_init.connect
+def apply_queue_profile(sender=None, conf=None, options=None, **kwargs):
+    """Tune a worker started with `-Q io` or `-Q cpu` for that stage.
+
+    An explicit --concurrency on the command line still wins.
+    """
+    queues = (options or {}).get("queues") or []
+    if isinstance(queues, str):
+        queues = queues.split(",")
+    if len(queues) == 1 and queues[0] in QUEUE_PROFILES:
+        conf.update(QUEUE_PROFILES[queues[0]])
+
+@worker_init.connect
+def setup_worker_telemetry(**kwargs):
+    """Start tracing and the worker's metrics endpoint.
+
+    worker_init runs in the main process, while tasks run in pool processes,
+    so the endpoint can only report task metrics collected through
+    PROMETHEUS_MULTIPROC_DIR. Without it the worker refuses to start.
+    """
+    setup_tracing("worker")
+    if settings.worker_metrics_port:
+        if not multiprocess_enabled():
+            # Signal handler exceptions are only logged; SystemExit stops the worker
+            raise SystemExit("WORKER_METRICS_PORT requires PROMETHEUS_MULTIPROC_DIR to report task metrics")
+        start_metrics_server(settings.worker_metrics_port)
+
+@worker_process_shutdown.connect
+def release_process_metrics(pid=None, **kwargs):
+    """Stop recycled pool processes from leaving live samples behind"""
+    mark_process_dead(pid)
+
+@before_task_publish.connect
+def add_task_headers(headers=None, **kwargs):
+    """Stamp outgoing task messages with their enqueue time and the current trace context"""
+    headers["enqueued_at"] = time.time()
+    inject_context(headers)
+
+# Spans of the tasks running in this process, by task ID
+_task_spans = {}
+
+@task_prerun.connect
+def start_task_span(task_id=None, task=None, **kwargs):
+    """Record the queue wait and continue the publisher's trace for the task"""
+    request = task.request
+    enqueued_at = request.get("enqueued_at")
+    if enqueued_at:
+        queue = (request.delivery_info or {}).get("routing_key") or ""
+        QUEUE_WAIT_SECONDS.labels(task.name, queue).observe(max(0.0, time.time() - enqueued_at))
+    
+    carrier = {key: request.get(key) for key in ("traceparent", "tracestate") if request.get(key)}
+    span = tracer.start_span(
+        task.name,
+        context=extract_context(carrier),
+        kind=trace.SpanKind.CONSUMER,
+        attributes={"celery.task_id": task_id}
+    )
+    _task_spans[task_id] = (span, context.attach(trace.set_span_in_context(span)))
+
+@task_postrun.connect
+def end_task_span(task_id=None, state=None, **kwargs):
+    entry = _task_spans.pop(task_id, None)
+    if entry is None:
+        return
+    span, token = entry
+    if state == "FAILURE":
+        span.set_status(trace.Status(trace.StatusCode.ERROR))
+    context.detach(token)
+    span.end()
@@ -1,11 +1,48 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from app.core.config import settings
 
-engine = create_engine(settings.database_url)
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+def pool_options(url: str) -> dict:
+    """Pool settings for server databases; SQLite keeps SQLAlchemy's defaults"""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+def get_async_database_url() -> str:
+    if settings.async_database_url:
+        return settings.async_database_url
+    url = make_url(settings.database_url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    return url.set(drivername=driver).render_as_string(hide_password=False) if driver else settings.database_url
+
+# Used by Celery workers and other synchronous code
+engine = create_engine(settings.database_url, **pool_options(settings.database_url))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Used by the API so queries do not block the event loop
+async_database_url = get_async_database_url()
+async_engine = create_async_engine(
+    async_database_url,
+    connect_args=(
+        {"statement_cache_size": settings.db_statement_cache_size,
+         "prepared_statement_cache_size": settings.db_statement_cache_size}
+        if make_url(async_database_url).get_driver_name() == "asyncpg" else {}
+    ),
+    **pool_options(async_database_url)
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -13,4 +50,8 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
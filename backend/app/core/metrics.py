@@ -0,0 +1,68 @@
+import os
+from prometheus_client import CollectorRegistry, Histogram, REGISTRY, generate_latest, multiprocess, start_http_server
+
+# Metrics are recorded by the API and by every Celery worker process. With
+# PROMETHEUS_MULTIPROC_DIR set, processes share samples through that
+# directory, so one endpoint reports them all.
+
+DOWNLOAD_SECONDS = Histogram(
+    "transcription_download_seconds",
+    "Time yt-dlp took to download and extract a job's audio",
+    buckets=(1, 2, 5, 10, 20, 30, 60, 120, 300, 600, 1200)
+)
+DOWNLOAD_BYTES = Histogram(
+    "transcription_download_bytes",
+    "Size of the downloaded audio",
+    buckets=tuple(256 * 1024 * 2 ** i for i in range(13))
+)
+AUDIO_DURATION_SECONDS = Histogram(
+    "transcription_audio_duration_seconds",
+    "Duration of the audio a workflow transcribes",
+    buckets=(30, 60, 300, 600, 1200, 1800, 3600, 7200, 14400)
+)
+REAL_TIME_FACTOR = Histogram(
+    "transcription_real_time_factor",
+    "Transcription time divided by audio duration, per chunk",
+    ["engine"],
+    buckets=(0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 5)
+)
+S3_UPLOAD_SECONDS = Histogram(
+    "s3_upload_seconds",
+    "Latency of S3 uploads",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+)
+DB_STATUS_WRITE_SECONDS = Histogram(
+    "db_job_status_write_seconds",
+    "Latency of writing a job status transition to the database",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    "celery_queue_wait_seconds",
+    "Time a task message waited in its queue before a worker started it",
+    ["task", "queue"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 1800, 3600)
+)
+
+def multiprocess_enabled() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+def metrics_registry() -> CollectorRegistry:
+    """Registry to expose: aggregated over processes in multiprocess mode, else this process's"""
+    if not multiprocess_enabled():
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+def render_metrics() -> bytes:
+    return generate_latest(metrics_registry())
+
+def start_metrics_server(port: int):
+    """Serve /metrics from a background thread, for processes without an HTTP API"""
+    start_http_server(port, registry=metrics_registry())
+
+def mark_process_dead(pid: int):
+    """Drop the live samples of an exited process in multiprocess mode"""
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,8 @@
+import redis
+import redis.asyncio
+from app.core.config import settings
+
+redis_client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+
+# For the API event loop; connections are only opened on first use
+async_redis_client = redis.asyncio.Redis.from_url(settings.redis_url, decode_responses=True)
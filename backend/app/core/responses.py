@@ -0,0 +1,26 @@
+from typing import Any
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+def _encode_model(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+class TrustedJSONResponse(Response):
+    """JSON encoded straight with orjson, for data the service built itself.
+
+    Returning it skips FastAPI's response_model validation and its
+    jsonable_encoder pass. Slotted dataclass records and datetimes are
+    encoded natively, UTC datetimes with a "Z" suffix as pydantic does;
+    pydantic models are dumped without being validated again.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_encode_model, option=orjson.OPT_UTC_Z)
+
+def ndjson_line(content: Any) -> bytes:
+    return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_APPEND_NEWLINE)
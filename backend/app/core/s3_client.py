@@ -0,0 +1,67 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from app.core.config import settings
+
+MB = 1024 * 1024
+
+# Multipart settings for upload_file/download_file and the fileobj variants
+transfer_config = TransferConfig(
+    multipart_threshold=settings.s3_multipart_threshold_mb * MB,
+    multipart_chunksize=settings.s3_multipart_chunksize_mb * MB,
+    max_concurrency=settings.s3_transfer_concurrency
+)
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+def get_s3_client():
+    """Process-wide S3 client with a pooled, keep-alive connection pool.
+
+    boto3 clients are thread-safe but not fork-safe, so a forked worker
+    process builds its own client on first use.
+    """
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        with _client_lock:
+            if _client is None or _client_pid != os.getpid():
+                _client = boto3.client(
+                    's3',
+                    aws_access_key_id=settings.s3_access_key,
+                    aws_secret_access_key=settings.s3_secret_key,
+                    endpoint_url=settings.s3_endpoint,
+                    region_name=settings.s3_region,
+                    config=Config(
+                        max_pool_connections=settings.s3_max_pool_connections,
+                        retries={'max_attempts': settings.s3_max_attempts, 'mode': 'adaptive'},
+                        tcp_keepalive=True
+                    )
+                )
+                _client_pid = os.getpid()
+    return _client
+
+def reset_s3_client():
+    """Drop the shared client, e.g. after changing settings or inside a moto mock"""
+    global _client, _client_pid
+    with _client_lock:
+        _client = None
+        _client_pid = None
+
+_executor = None
+
+async def run_in_s3_executor(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking S3 call off the event loop on a bounded thread pool"""
+    global _executor
+    if _executor is None:
+        with _client_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=settings.s3_async_workers, thread_name_prefix="s3")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(func, *args, **kwargs))
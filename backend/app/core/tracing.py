@@ -0,0 +1,66 @@
+import threading
+from typing import Any, Dict
+from opentelemetry import context, propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from app.core.config import settings
+
+tracer = trace.get_tracer("video_transcription")
+
+_configured = False
+_configure_lock = threading.Lock()
+
+def setup_tracing(component: str):
+    """Install the tracer provider for this process, e.g. "api" or "worker".
+
+    Spans get real trace IDs either way, so context still propagates from
+    the API to the workers; they are only exported when an OTLP endpoint is
+    configured.
+    """
+    global _configured
+    with _configure_lock:
+        if _configured:
+            return
+        provider = TracerProvider(resource=Resource.create({"service.name": f"{settings.otel_service_name}-{component}"}))
+        if settings.otel_exporter_otlp_endpoint:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=settings.otel_exporter_otlp_endpoint)))
+        trace.set_tracer_provider(provider)
+        _configured = True
+
+def inject_context(carrier: Dict[str, Any]):
+    """Add the current trace context (W3C traceparent/tracestate) to a header dict"""
+    propagate.inject(carrier)
+
+def extract_context(carrier: Dict[str, Any]) -> context.Context:
+    return propagate.extract(carrier)
+
+class TracingMiddleware:
+    """ASGI middleware opening a server span per HTTP request.
+
+    An incoming traceparent header is continued, and every Celery task
+    queued while handling the request carries the request's trace context.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        with tracer.start_as_current_span(
+            f"{scope['method']} {scope['path']}",
+            context=extract_context(headers),
+            kind=trace.SpanKind.SERVER,
+            attributes={"http.method": scope["method"], "http.target": scope["path"]}
+        ) as span:
+            async def send_with_status(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                await send(message)
+
+            await self.app(scope, receive, send_with_status)
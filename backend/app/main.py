@@ -1,7 +1,13 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import transcribe, notes
+from prometheus_client import CONTENT_TYPE_LATEST
+from app.routers import transcribe, notes, search
 from app.core.config import settings
+from app.core.metrics import render_metrics
+from app.core.tracing import TracingMiddleware, setup_tracing
+from app.services.result_cache import result_cache
+
+setup_tracing("api")
 
 app = FastAPI(
     title="Video Transcription API",
@@ -18,9 +24,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(TracingMiddleware)
+
 # Include routers
 app.include_router(transcribe.router, prefix="/api", tags=["transcribe"])
 app.include_router(notes.router, prefix="/api", tags=["notes"])
+app.include_router(search.router, prefix="/api", tags=["search"])
 
 @app.get("/")
 async def root():
@@ -28,4 +37,13 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"} 
\ No newline at end of file
+    return {"status": "healthy"} 
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics; includes the workers' when they share PROMETHEUS_MULTIPROC_DIR"""
+    return Response(render_metrics(), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+@app.get("/metrics/result-cache")
+async def result_cache_metrics():
+    return result_cache.stats()
\ No newline at end of file
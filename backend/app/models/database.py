@@ -1,7 +1,8 @@
-from sqlalchemy import Column, String, DateTime, Integer, Text, JSON, ForeignKey, Boolean
+from sqlalchemy import Column, String, DateTime, Integer, Float, Text, JSON, ForeignKey, Boolean, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from datetime import datetime, timezone
 import uuid
 
 Base = declarative_base()
@@ -9,6 +10,9 @@ Base = declarative_base()
 def generate_uuid():
     return str(uuid.uuid4())
 
+def utcnow():
+    return datetime.now(timezone.utc)
+
 class User(Base):
     __tablename__ = "users"
     
@@ -31,16 +35,35 @@ class Note(Base):
     source_url = Column(String)
     segments = Column(JSON)  # Array of segment objects
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set client-side too, so the keyset cursor round-trips exactly on every backend
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     user = relationship("User", back_populates="notes")
+    
+    __table_args__ = (
+        # Backs keyset pagination of a user's notes, newest first
+        Index("ix_notes_user_created", "user_id", "created_at", "id"),
+    )
+
+class NoteTag(Base):
+    """One tag of a note; mirrors Note.tags so tag filters and counts can use an index"""
+    __tablename__ = "note_tags"
+    
+    note_id = Column(String, ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True)
+    tag = Column(String, primary_key=True)
+    user_id = Column(String, nullable=False)  # Denormalized so lookups stay within one user's tags
+    
+    __table_args__ = (
+        Index("ix_note_tags_user_tag", "user_id", "tag"),
+    )
 
 class TranscriptionJob(Base):
     __tablename__ = "transcription_jobs"
     
     id = Column(String, primary_key=True, default=generate_uuid)
     url = Column(String, nullable=False)
+    media_key = Column(String, index=True)  # Canonical media identity, e.g. "youtube:<id>"
     topics = Column(JSON)  # Array of strings
     status = Column(String, default="pending")  # pending, processing, completed, failed
     progress = Column(Integer, default=0)
@@ -48,4 +71,33 @@ class TranscriptionJob(Base):
     error_message = Column(Text)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now()) 
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class SearchSegment(Base):
+    """A searchable piece of a note or transcript: a segment, or a note's title and tags"""
+    __tablename__ = "search_segments"
+    
+    id = Column(String, primary_key=True, default=generate_uuid)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    source_type = Column(String, nullable=False)  # note, transcript
+    source_id = Column(String, nullable=False)  # Note or transcription job ID
+    position = Column(Integer)  # Segment position; NULL for a note's title and tags
+    timestamp = Column(Float)
+    text = Column(Text, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_search_segments_source", "source_type", "source_id"),
+    )
+
+class SearchTerm(Base):
+    """Inverted index posting: a stemmed term occurring in a search segment"""
+    __tablename__ = "search_terms"
+    
+    segment_id = Column(String, ForeignKey("search_segments.id", ondelete="CASCADE"), primary_key=True)
+    term = Column(String, primary_key=True)
+    user_id = Column(String, nullable=False)  # Denormalized so lookups stay within one user's postings
+    count = Column(Integer, nullable=False, default=1)
+    
+    __table_args__ = (
+        Index("ix_search_terms_user_term", "user_id", "term"),
+    )
\ No newline at end of file
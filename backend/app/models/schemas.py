@@ -1,10 +1,12 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
 
 class Segment(BaseModel):
     timestamp: float
     text: str
+    topics: Optional[List[str]] = None  # Topics matched by this segment, when filtered
+    score: Optional[float] = None  # Similarity to the best matching topic, in semantic mode
 
 class TranscriptionRequest(BaseModel):
     url: str
@@ -20,6 +22,7 @@ class TranscriptionStatus(BaseModel):
 
 class TranscriptionResult(BaseModel):
     segments: List[Segment]
+    next_cursor: Optional[str] = None  # Set when a limited page has more segments
 
 class NoteBase(BaseModel):
     title: str
@@ -38,11 +41,49 @@ class Note(NoteBase):
     id: str
     user_id: str
     created_at: datetime
-    updated_at: datetime
+    updated_at: Optional[datetime] = None  # Set once the note is first updated
 
     class Config:
         from_attributes = True
 
+class NotesBulkCreate(BaseModel):
+    notes: List[NoteCreate] = Field(..., min_length=1, max_length=500)
+
+class NotesBulkTagUpdate(BaseModel):
+    note_ids: List[str] = Field(..., min_length=1, max_length=500)
+    add_tags: List[str] = []
+    remove_tags: List[str] = []
+
+class NotesBulkDelete(BaseModel):
+    note_ids: List[str] = Field(..., min_length=1, max_length=500)
+
+class BulkItemResult(BaseModel):
+    id: Optional[str] = None
+    status: str  # created, updated, deleted, not_found
+    error: Optional[str] = None
+
+class BulkResult(BaseModel):
+    results: List[BulkItemResult]  # In request order
+
+class NoteSummary(BaseModel):
+    """Note without its segments, for listings"""
+    id: str
+    title: str
+    tags: List[str]
+    source_url: str
+    segment_count: int
+    preview: Optional[str] = None  # Text of the first segment
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+class TagCount(BaseModel):
+    tag: str
+    count: int
+
+class NotesPage(BaseModel):
+    notes: List[NoteSummary]
+    next_cursor: Optional[str] = None  # Set while older notes remain
+
 class UserBase(BaseModel):
     email: str
     username: Optional[str] = None
@@ -57,4 +98,26 @@ class User(UserBase):
     updated_at: datetime
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class Principal(BaseModel):
+    """Authenticated user as cached by get_current_user"""
+    id: str
+    email: str
+    username: Optional[str] = None
+    is_active: bool
+
+    class Config:
+        from_attributes = True
+
+class SearchHit(BaseModel):
+    source_type: str  # note, transcript
+    source_id: str  # Note or transcription job ID
+    title: Optional[str] = None  # Note title or transcript source URL
+    position: Optional[int] = None  # Segment position; None for a note's title and tags
+    timestamp: Optional[float] = None
+    text: str
+    score: float
+
+class SearchResponse(BaseModel):
+    results: List[SearchHit]
\ No newline at end of file
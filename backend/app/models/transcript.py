@@ -0,0 +1,25 @@
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional
+
+@dataclass(slots=True)
+class SegmentRecord:
+    """A result or note segment with the fields of schemas.Segment.
+
+    Services build these from stored, already validated data instead of
+    pydantic models; orjson encodes them natively with the same JSON shape.
+    """
+    timestamp: float
+    text: str
+    topics: Optional[List[str]] = None
+    score: Optional[float] = None
+
+    @classmethod
+    def from_dict(cls, segment: Dict[str, Any]) -> "SegmentRecord":
+        # Older stored segments may hold integer timestamps; the schema sends floats
+        return cls(float(segment.get("timestamp", 0)), segment.get("text", ""), segment.get("topics"), segment.get("score"))
+
+@dataclass(slots=True)
+class ResultPage:
+    """A page of a transcription result, encoded like schemas.TranscriptionResult"""
+    segments: List[SegmentRecord]
+    next_cursor: Optional[str] = None
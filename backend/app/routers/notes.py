@@ -1,41 +1,110 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
-from app.models.schemas import Note, NoteCreate, NoteUpdate
-from app.services.notes_service import NotesService
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.core.database import get_async_db
+from app.models.schemas import (
+    Note, NoteCreate, NoteUpdate, NotesPage, Segment, Principal,
+    NotesBulkCreate, NotesBulkTagUpdate, NotesBulkDelete, BulkResult, TagCount
+)
+from app.services.notes_service import NotesService, note_record
+from app.core.responses import TrustedJSONResponse
 from app.services.auth_service import get_current_user
-from app.models.database import User
 
 router = APIRouter()
 
-@router.get("/notes", response_model=List[Note])
+@router.get("/notes", response_model=NotesPage)
 async def get_notes(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    limit: int = Query(50, ge=1, le=200, description="Maximum notes per page"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
+    tags_any: str = Query(None, description="Comma-separated tags; notes with any of them"),
+    tags_all: str = Query(None, description="Comma-separated tags; notes with all of them"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    """Get all notes for the current user"""
+    """Get a page of the current user's notes, newest first, without segments"""
     notes_service = NotesService(db)
-    return await notes_service.get_user_notes(current_user.id)
+    try:
+        page = await notes_service.list_note_summaries(
+            current_user.id,
+            limit,
+            cursor,
+            tags_any=[tag.strip() for tag in tags_any.split(',') if tag.strip()] if tags_any else None,
+            tags_all=[tag.strip() for tag in tags_all.split(',') if tag.strip()] if tags_all else None
+        )
+        return TrustedJSONResponse(page)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/notes/tags", response_model=List[TagCount])
+async def get_tag_counts(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Get the current user's tags with the number of notes using each"""
+    notes_service = NotesService(db)
+    return await notes_service.get_tag_counts(current_user.id)
+
+@router.post("/notes/bulk", response_model=BulkResult)
+async def create_notes(
+    request: NotesBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Create many notes in one transaction"""
+    notes_service = NotesService(db)
+    return await notes_service.create_notes(request.notes, current_user.id)
+
+@router.post("/notes/bulk/tags", response_model=BulkResult)
+async def update_notes_tags(
+    request: NotesBulkTagUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Add and remove tags on many notes in one transaction"""
+    notes_service = NotesService(db)
+    return await notes_service.update_notes_tags(request, current_user.id)
+
+@router.post("/notes/bulk/delete", response_model=BulkResult)
+async def delete_notes(
+    request: NotesBulkDelete,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Delete many notes in one transaction"""
+    notes_service = NotesService(db)
+    return await notes_service.delete_notes(request.note_ids, current_user.id)
 
 @router.get("/notes/{note_id}", response_model=Note)
 async def get_note(
     note_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get a specific note by ID"""
     notes_service = NotesService(db)
     note = await notes_service.get_note(note_id, current_user.id)
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
-    return note
+    return TrustedJSONResponse(note_record(note))
+
+@router.get("/notes/{note_id}/segments", response_model=List[Segment])
+async def get_note_segments(
+    note_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Get the segments of a specific note"""
+    notes_service = NotesService(db)
+    segments = await notes_service.get_note_segments(note_id, current_user.id)
+    if segments is None:
+        raise HTTPException(status_code=404, detail="Note not found")
+    return TrustedJSONResponse(segments)
 
 @router.post("/notes", response_model=Note)
 async def create_note(
     note: NoteCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Create a new note"""
     notes_service = NotesService(db)
@@ -45,8 +114,8 @@ async def create_note(
 async def update_note(
     note_id: str,
     note_update: NoteUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Update an existing note"""
     notes_service = NotesService(db)
@@ -58,8 +127,8 @@ async def update_note(
 @router.delete("/notes/{note_id}")
 async def delete_note(
     note_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Delete a note"""
     notes_service = NotesService(db)
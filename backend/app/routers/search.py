@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.core.database import get_async_db
+from app.models.schemas import SearchResponse, Principal
+from app.services.search_service import SearchService
+from app.services.auth_service import get_current_user
+
+router = APIRouter()
+
+@router.get("/search", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, description="Search query, matched by stemmed words"),
+    type: Optional[str] = Query(None, pattern="^(note|transcript)$", description="Restrict to notes or transcripts"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Search the current user's notes and transcripts, best matches first"""
+    try:
+        search_service = SearchService(db)
+        results = await search_service.search(current_user.id, q, source_type=type, limit=limit)
+        return SearchResponse(results=results)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
@@ -1,37 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
-from app.models.schemas import TranscriptionRequest, TranscriptionResponse, TranscriptionStatus, TranscriptionResult
+from botocore.exceptions import BotoCoreError, ClientError
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.core.database import get_async_db
+from app.models.schemas import TranscriptionRequest, TranscriptionResponse, TranscriptionStatus, TranscriptionResult, Principal
 from app.services.transcription_service import TranscriptionService
-from app.services.auth_service import get_current_user
-from app.models.database import User
+from app.services.auth_service import get_current_user, get_current_user_for_stream
+from app.services.progress_service import job_event_stream
+from app.services.idempotency_service import IdempotencyConflict
+from app.services.job_scheduler import QuotaExceeded
+from app.services.semantic_matcher import EmbeddingsNotReady
+from app.core.responses import TrustedJSONResponse
 
 router = APIRouter()
 
 @router.post("/transcribe", response_model=TranscriptionResponse)
 async def start_transcription(
     request: TranscriptionRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    """Start a transcription job for a video URL"""
+    """Start a transcription job for a video URL; repeats with the same Idempotency-Key return the same job"""
     try:
         transcription_service = TranscriptionService(db)
         job_id = await transcription_service.start_transcription(
             url=request.url,
             topics=request.topics,
-            user_id=current_user.id
+            user_id=current_user.id,
+            idempotency_key=idempotency_key
         )
         return TranscriptionResponse(jobId=job_id)
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except QuotaExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/transcribe/{job_id}/status", response_model=TranscriptionStatus)
 async def get_transcription_status(
     job_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get the status of a transcription job"""
     try:
@@ -41,22 +53,76 @@ async def get_transcription_status(
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+@router.get("/transcribe/{job_id}/events")
+async def stream_transcription_events(
+    job_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_for_stream)
+):
+    """Stream job progress as Server-Sent Events until the job completes or fails"""
+    try:
+        transcription_service = TranscriptionService(db)
+        status = await transcription_service.get_job_status(job_id, current_user.id)
+    except Exception as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    # Release the DB connection now instead of holding it for the stream's lifetime
+    await db.close()
+    return StreamingResponse(
+        job_event_stream(job_id, status.model_dump()),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/transcribe/{job_id}/result", response_model=TranscriptionResult)
 async def get_transcription_result(
     job_id: str,
-    topics: str = Query(None, description="Comma-separated topics for filtering"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    topics: str = Query(None, description="Comma-separated topics for filtering; defaults to the job's topics"),
+    from_: Optional[float] = Query(None, alias="from", description="Window start in seconds"),
+    to: Optional[float] = Query(None, description="Window end in seconds"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
+    limit: Optional[int] = Query(None, ge=1, le=5000, description="Maximum segments per page"),
+    stream: bool = Query(False, description="Stream segments as NDJSON instead of one JSON document"),
+    mode: str = Query("keyword", pattern="^(keyword|semantic)$", description="Match topics by keywords or by meaning"),
+    threshold: Optional[float] = Query(None, ge=-1, le=1, description="Minimum similarity in semantic mode"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get the filtered transcription result"""
     try:
         transcription_service = TranscriptionService(db)
-        topics_list = topics.split(',') if topics else []
+        topics_list = [topic.strip() for topic in topics.split(',') if topic.strip()] if topics else []
+        if stream:
+            lines = await transcription_service.stream_result(
+                job_id,
+                current_user.id,
+                topics_list,
+                start_time=from_,
+                end_time=to,
+                cursor=cursor,
+                semantic=mode == "semantic",
+                threshold=threshold
+            )
+            # Release the DB connection before the body is streamed
+            await db.close()
+            return StreamingResponse(lines, media_type="application/x-ndjson")
+        
         result = await transcription_service.get_filtered_result(
             job_id, 
             current_user.id, 
-            topics_list
+            topics_list,
+            start_time=from_,
+            end_time=to,
+            cursor=cursor,
+            limit=limit,
+            semantic=mode == "semantic",
+            threshold=threshold
         )
-        return result
+        # Built from stored, validated data: encode it directly rather than re-validating every segment
+        return TrustedJSONResponse(result)
+    except EmbeddingsNotReady as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
+    except (BotoCoreError, ClientError):
+        raise HTTPException(status_code=503, detail="Transcript storage is unavailable; retry shortly")
     except Exception as e:
-        raise HTTPException(status_code=404, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=404, detail=str(e))
@@ -0,0 +1,137 @@
+import os
+import re
+import subprocess
+from typing import List, Dict, Any
+from app.core.config import settings
+
+SILENCE_START_RE = re.compile(r"silence_start: (-?\d+(?:\.\d+)?)")
+SILENCE_END_RE = re.compile(r"silence_end: (-?\d+(?:\.\d+)?)")
+
+class AudioService:
+    def __init__(self):
+        self.chunk_seconds = settings.transcription_chunk_seconds
+        self.overlap_seconds = settings.transcription_chunk_overlap_seconds
+        self.silence_search_seconds = settings.transcription_silence_search_seconds
+
+    def get_duration(self, audio_path: str) -> float:
+        """Get audio duration in seconds using ffprobe"""
+        output = subprocess.run(
+            [
+                "ffprobe", "-v", "error",
+                "-show_entries", "format=duration",
+                "-of", "default=noprint_wrappers=1:nokey=1",
+                audio_path
+            ],
+            capture_output=True, text=True, check=True
+        ).stdout
+        return float(output.strip())
+
+    def detect_silences(self, audio_path: str) -> List[float]:
+        """Return midpoints of silent intervals detected by ffmpeg"""
+        stderr = subprocess.run(
+            [
+                "ffmpeg", "-hide_banner", "-nostats", "-i", audio_path,
+                "-af", "silencedetect=noise=-35dB:d=0.4",
+                "-f", "null", "-"
+            ],
+            capture_output=True, text=True, check=True
+        ).stderr
+        starts = [float(m) for m in SILENCE_START_RE.findall(stderr)]
+        ends = [float(m) for m in SILENCE_END_RE.findall(stderr)]
+        return [(start + end) / 2 for start, end in zip(starts, ends)]
+
+    def plan_chunks(self, duration: float, silences: List[float]) -> List[Dict[str, float]]:
+        """Plan chunk boundaries, preferring cuts at silence near each window edge.
+
+        Each chunk owns the range [cut_start, cut_end) and is extracted with
+        half of the overlap padded on both sides, so that words on a cut are
+        heard in full by at least one chunk.
+        """
+        cuts = [0.0]
+        target = self.chunk_seconds
+        while target < duration - self.overlap_seconds:
+            candidates = [
+                s for s in silences
+                if abs(s - target) <= self.silence_search_seconds and s > cuts[-1] + self.overlap_seconds
+            ]
+            cut = min(candidates, key=lambda s: abs(s - target)) if candidates else target
+            cuts.append(cut)
+            target = cut + self.chunk_seconds
+        cuts.append(duration)
+
+        pad = self.overlap_seconds / 2
+        chunks = []
+        for index in range(len(cuts) - 1):
+            chunks.append({
+                "index": index,
+                "cut_start": cuts[index],
+                "cut_end": cuts[index + 1],
+                "start": max(0.0, cuts[index] - pad),
+                "end": min(duration, cuts[index + 1] + pad),
+            })
+        return chunks
+
+    def extract_chunk(self, audio_path: str, chunk: Dict[str, float], output_dir: str) -> str:
+        """Cut a single chunk out of the source audio"""
+        base, ext = os.path.splitext(os.path.basename(audio_path))
+        chunk_path = os.path.join(output_dir, f"{base}.chunk{chunk['index']:04d}{ext}")
+        subprocess.run(
+            [
+                "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+                "-ss", f"{chunk['start']:.3f}",
+                "-t", f"{chunk['end'] - chunk['start']:.3f}",
+                "-i", audio_path,
+                "-c", "copy",
+                chunk_path
+            ],
+            check=True
+        )
+        return chunk_path
+
+    def split_audio(self, audio_path: str, output_dir: str) -> List[Dict[str, Any]]:
+        """Split audio into overlapping chunks cut at silence where possible"""
+        duration = self.get_duration(audio_path)
+        if duration <= self.chunk_seconds + self.overlap_seconds:
+            return [{
+                "index": 0,
+                "cut_start": 0.0,
+                "cut_end": duration,
+                "start": 0.0,
+                "end": duration,
+                "path": audio_path,
+            }]
+
+        chunks = self.plan_chunks(duration, self.detect_silences(audio_path))
+        for chunk in chunks:
+            chunk["path"] = self.extract_chunk(audio_path, chunk, output_dir)
+        return chunks
+
+def merge_chunk_segments(chunks: List[Dict[str, Any]], chunk_segments: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Stitch per-chunk segments into one transcript with global timestamps.
+
+    Segments are shifted by their chunk offset and kept only by the chunk that
+    owns their start time, which drops the copies heard in the overlap. A
+    segment repeating the previous one's text across a cut is dropped too.
+    """
+    merged = []
+    last_chunk = len(chunks) - 1
+    for chunk, segments in zip(chunks, chunk_segments):
+        first_in_chunk = True
+        for segment in segments:
+            start = segment.get("start", 0) + chunk["start"]
+            end = segment.get("end", segment.get("start", 0)) + chunk["start"]
+            if chunk["index"] > 0 and start < chunk["cut_start"]:
+                continue
+            if chunk["index"] < last_chunk and start >= chunk["cut_end"]:
+                continue
+
+            text = segment.get("text", "")
+            if first_in_chunk and merged and _normalize(text) and _normalize(merged[-1]["text"]).endswith(_normalize(text)):
+                continue
+
+            first_in_chunk = False
+            merged.append({**segment, "start": start, "end": end, "text": text})
+    return merged
+
+def _normalize(text: str) -> str:
+    return " ".join(re.findall(r"\w+", text.lower()))
@@ -0,0 +1,98 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from app.core.config import settings
+from app.core.redis_client import async_redis_client
+from app.models.schemas import Principal
+
+REDIS_PREFIX = "auth-principal:"
+REDIS_USER_PREFIX = "auth-principal-tokens:"
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+class PrincipalCache:
+    """Short-TTL cache of verified token -> principal.
+
+    The in-process tier answers most requests without I/O; the optional
+    Redis tier is shared by all API processes. Entries never outlive the
+    token itself. invalidate_user drops a user's entries from Redis and from
+    this process; other processes stop serving them within the local TTL.
+    """
+
+    def __init__(self, max_entries: int, local_ttl_seconds: int, redis_ttl_seconds: int):
+        self.max_entries = max_entries
+        self.local_ttl_seconds = local_ttl_seconds
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[Principal, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, token: str) -> Optional[Principal]:
+        digest = token_digest(token)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                if entry[1] > time.time():
+                    self._entries.move_to_end(digest)
+                    return entry[0]
+                del self._entries[digest]
+
+        if not self.redis_ttl_seconds:
+            return None
+        try:
+            data = await async_redis_client.get(REDIS_PREFIX + digest)
+        except Exception as e:
+            print(f"Error reading auth cache: {e}")
+            return None
+        if data is None:
+            return None
+        principal = Principal.model_validate_json(data)
+        self._set_local(digest, principal, time.time() + self.local_ttl_seconds)
+        return principal
+
+    async def set(self, token: str, principal: Principal, token_expires_at: float):
+        digest = token_digest(token)
+        now = time.time()
+        self._set_local(digest, principal, min(now + self.local_ttl_seconds, token_expires_at))
+
+        redis_ttl = int(min(self.redis_ttl_seconds, token_expires_at - now))
+        if redis_ttl <= 0:
+            return
+        try:
+            pipe = async_redis_client.pipeline()
+            pipe.set(REDIS_PREFIX + digest, principal.model_dump_json(), ex=redis_ttl)
+            pipe.sadd(REDIS_USER_PREFIX + principal.id, digest)
+            pipe.expire(REDIS_USER_PREFIX + principal.id, self.redis_ttl_seconds)
+            await pipe.execute()
+        except Exception as e:
+            print(f"Error writing auth cache: {e}")
+
+    def _set_local(self, digest: str, principal: Principal, expires_at: float):
+        with self._lock:
+            self._entries[digest] = (principal, expires_at)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def invalidate_user(self, user_id: str):
+        """Forget every cached token of a user, e.g. after deactivation"""
+        with self._lock:
+            for digest in [d for d, (principal, _) in self._entries.items() if principal.id == user_id]:
+                del self._entries[digest]
+
+        if not self.redis_ttl_seconds:
+            return
+        try:
+            digests = await async_redis_client.smembers(REDIS_USER_PREFIX + user_id)
+            keys = [REDIS_PREFIX + digest for digest in digests] + [REDIS_USER_PREFIX + user_id]
+            await async_redis_client.delete(*keys)
+        except Exception as e:
+            print(f"Error invalidating auth cache: {e}")
+
+principal_cache = PrincipalCache(
+    max_entries=settings.auth_cache_max_entries,
+    local_ttl_seconds=settings.auth_cache_local_ttl_seconds,
+    redis_ttl_seconds=settings.auth_cache_redis_ttl_seconds
+)
@@ -1,25 +1,81 @@
+from sqlalchemy import update
 from sqlalchemy.orm import Session
+from typing import List, Dict, Any, Optional
 from app.core.database import SessionLocal
-from app.models.database import TranscriptionJob
+from app.core.metrics import DB_STATUS_WRITE_SECONDS
+from app.models.database import TranscriptionJob, SearchSegment
+from app.services.search_service import build_search_rows, remove_statements, index_statements
 
 class DatabaseService:
     def __init__(self):
         self.db: Session = SessionLocal()
 
     def update_job_status(self, job_id: str, status: str, progress: int, s3_key: str = None, error_message: str = None):
-        """Update transcription job status"""
+        """Update transcription job status with a single UPDATE statement"""
+        values = {"status": status, "progress": progress}
+        if s3_key:
+            values["result_s3_key"] = s3_key
+        if error_message:
+            values["error_message"] = error_message
         try:
-            job = self.db.query(TranscriptionJob).filter(TranscriptionJob.id == job_id).first()
-            if job:
-                job.status = status
-                job.progress = progress
-                if s3_key:
-                    job.result_s3_key = s3_key
-                if error_message:
-                    job.error_message = error_message
+            with DB_STATUS_WRITE_SECONDS.time():
+                self.db.execute(
+                    update(TranscriptionJob).where(TranscriptionJob.id == job_id).values(**values)
+                )
                 self.db.commit()
         except Exception as e:
             print(f"Error updating job status: {e}")
             self.db.rollback()
         finally:
-            self.db.close() 
\ No newline at end of file
+            self.db.close()
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get the fields of a job that workers need"""
+        try:
+            job = self.db.get(TranscriptionJob, job_id)
+            if not job:
+                return None
+            return {
+                "id": job.id,
+                "user_id": job.user_id,
+                "status": job.status,
+                "result_s3_key": job.result_s3_key,
+            }
+        except Exception as e:
+            print(f"Error loading job: {e}")
+            return None
+        finally:
+            self.db.close()
+
+    def is_transcript_indexed(self, user_id: str, result_s3_key: str, exclude_job_id: str) -> bool:
+        """Whether another job of the user already indexed the same transcript"""
+        try:
+            job_ids = self.db.query(TranscriptionJob.id).filter(
+                TranscriptionJob.user_id == user_id,
+                TranscriptionJob.result_s3_key == result_s3_key,
+                TranscriptionJob.id != exclude_job_id
+            )
+            return self.db.query(SearchSegment.id).filter(
+                SearchSegment.source_type == "transcript",
+                SearchSegment.source_id.in_(job_ids)
+            ).first() is not None
+        except Exception as e:
+            print(f"Error checking search index: {e}")
+            return False
+        finally:
+            self.db.close()
+
+    def replace_search_index(self, user_id: str, source_type: str, source_id: str, pieces: List[Dict[str, Any]]) -> bool:
+        """Replace the indexed rows of a source in one transaction"""
+        segment_rows, term_rows = build_search_rows(user_id, source_type, source_id, pieces)
+        try:
+            for statement in remove_statements(source_type, [source_id]) + index_statements(segment_rows, term_rows):
+                self.db.execute(statement)
+            self.db.commit()
+            return True
+        except Exception as e:
+            print(f"Error updating search index: {e}")
+            self.db.rollback()
+            return False
+        finally:
+            self.db.close()
\ No newline at end of file
@@ -0,0 +1,51 @@
+import hashlib
+import json
+from typing import List, Optional
+from app.core.config import settings
+from app.core.redis_client import async_redis_client
+
+IDEMPOTENCY_PREFIX = "idempotency:"
+
+class IdempotencyConflict(ValueError):
+    """The key was already used for a different request"""
+
+def request_fingerprint(url: str, topics: List[str]) -> str:
+    return hashlib.sha256(json.dumps([url, topics], ensure_ascii=False).encode()).hexdigest()
+
+class IdempotencyService:
+    """Idempotency-Key records for POST /transcribe, stored in Redis with a TTL.
+
+    The first request claims the key with SET NX before creating its job, so
+    concurrent duplicates can never both create one; they get the claimed
+    job ID instead. Keys are scoped per user.
+    """
+
+    def __init__(self, redis=None):
+        self.redis = redis or async_redis_client
+
+    def _key(self, user_id: str, idempotency_key: str) -> str:
+        digest = hashlib.sha256(idempotency_key.encode()).hexdigest()
+        return f"{IDEMPOTENCY_PREFIX}{user_id}:{digest}"
+
+    async def claim(self, user_id: str, idempotency_key: str, fingerprint: str, job_id: str) -> Optional[str]:
+        """Claim the key for a new job; returns the original job ID when it was already claimed"""
+        key = self._key(user_id, idempotency_key)
+        record = json.dumps({"job_id": job_id, "fingerprint": fingerprint})
+        if await self.redis.set(key, record, nx=True, ex=settings.idempotency_key_ttl_seconds):
+            return None
+        
+        existing = await self.redis.get(key)
+        if existing is None:
+            # Expired between the two calls; claim it again
+            return await self.claim(user_id, idempotency_key, fingerprint, job_id)
+        existing = json.loads(existing)
+        if existing["fingerprint"] != fingerprint:
+            raise IdempotencyConflict("Idempotency-Key was already used for a different request")
+        return existing["job_id"]
+
+    async def release(self, user_id: str, idempotency_key: str, job_id: str):
+        """Drop a claim whose job could not be created, so a retry can proceed"""
+        key = self._key(user_id, idempotency_key)
+        existing = await self.redis.get(key)
+        if existing is not None and json.loads(existing)["job_id"] == job_id:
+            await self.redis.delete(key)
\ No newline at end of file
@@ -0,0 +1,102 @@
+import json
+import time
+from typing import List, Dict, Any, Optional, Tuple
+from app.core.config import settings
+from app.core.redis_client import redis_client, async_redis_client
+
+RATE_PREFIX = "transcription-rate:"
+RUNNING_PREFIX = "transcription-running:"
+BACKLOG_PREFIX = "transcription-backlog:"
+
+# Frees finished and expired slots, appends a new job to the user's backlog,
+# drops jobs that waited longer than the backlog TTL and moves the rest into
+# free slots in arrival order.
+# KEYS: running slots (zset of job ID -> expiry), backlog (list of job JSON)
+# ARGV: now, slot expiry, slot limit, finished job ID or "", slot TTL,
+#       new job JSON or "", oldest queued_at still allowed to start
+# Returns the started and the expired jobs.
+SCHEDULE_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if ARGV[4] ~= '' then redis.call('ZREM', KEYS[1], ARGV[4]) end
+if ARGV[6] ~= '' then redis.call('RPUSH', KEYS[2], ARGV[6]) end
+local expired = {}
+while true do
+    local job = redis.call('LINDEX', KEYS[2], 0)
+    if not job then break end
+    local queued_at = cjson.decode(job)['queued_at']
+    if not queued_at or queued_at >= tonumber(ARGV[7]) then break end
+    table.insert(expired, redis.call('LPOP', KEYS[2]))
+end
+local started = {}
+while redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[3]) do
+    local job = redis.call('LPOP', KEYS[2])
+    if not job then break end
+    redis.call('ZADD', KEYS[1], ARGV[2], cjson.decode(job)['job_id'])
+    table.insert(started, job)
+end
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return {started, expired}
+"""
+
+class QuotaExceeded(ValueError):
+    """A user is over their submission rate or backlog quota"""
+
+class JobScheduler:
+    """Per-user admission control and fair sharing of transcription workflows.
+
+    Each user runs at most `user_max_running_jobs` workflows at once; further
+    jobs wait in the user's own FIFO backlog and start as the user's running
+    jobs finish, so one large batch occupies a few slots instead of the whole
+    queue. Slots expire after `transcription_slot_ttl_seconds` in case a
+    workflow dies without reporting back. Jobs still queued after
+    `transcription_backlog_ttl_seconds` are handed back as expired, for the
+    caller to fail, rather than silently dropped.
+    """
+
+    def __init__(self, redis=None, async_redis=None):
+        self.redis = redis or redis_client
+        self.async_redis = async_redis or async_redis_client
+        self._schedule = self.redis.register_script(SCHEDULE_SCRIPT)
+
+    async def admit(self, user_id: str):
+        """Count a submission against the user's quotas, raising QuotaExceeded when over them"""
+        window = int(time.time() // 3600)
+        rate_key = f"{RATE_PREFIX}{user_id}:{window}"
+        pipe = self.async_redis.pipeline()
+        pipe.incr(rate_key)
+        pipe.expire(rate_key, 3600)
+        pipe.llen(BACKLOG_PREFIX + user_id)
+        submitted, _, backlog = await pipe.execute()
+        if submitted > settings.user_jobs_per_hour:
+            raise QuotaExceeded(f"Too many transcription jobs; the limit is {settings.user_jobs_per_hour} per hour")
+        if backlog >= settings.user_max_backlog_jobs:
+            raise QuotaExceeded(f"Too many queued transcription jobs; the limit is {settings.user_max_backlog_jobs}")
+
+    def submit(self, user_id: str, job: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Queue a job for the user, returning the jobs that may start now and the expired ones"""
+        return self._run(user_id, new_job=job)
+
+    def finish(self, user_id: str, job_id: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Free a job's slot, returning the backlogged jobs that may start now and the expired ones"""
+        return self._run(user_id, finished_job_id=job_id)
+
+    def _run(
+        self,
+        user_id: str,
+        finished_job_id: str = "",
+        new_job: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        now = time.time()
+        started, expired = self._schedule(
+            keys=[RUNNING_PREFIX + user_id, BACKLOG_PREFIX + user_id],
+            args=[
+                now,
+                now + settings.transcription_slot_ttl_seconds,
+                settings.user_max_running_jobs,
+                finished_job_id,
+                settings.transcription_slot_ttl_seconds,
+                json.dumps({**new_job, "queued_at": now}) if new_job else "",
+                now - settings.transcription_backlog_ttl_seconds,
+            ]
+        )
+        return [json.loads(job) for job in started], [json.loads(job) for job in expired]
@@ -0,0 +1,112 @@
+import hashlib
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlsplit, urlunsplit
+import yt_dlp
+from app.core.config import settings
+from app.core.redis_client import redis_client, async_redis_client
+from app.services.s3_service import S3Service
+from app.services.transcript_index import build_token_index
+from app.services.transcript_store import TranscriptStore, index_key_for
+
+CACHE_PREFIX = "transcript-cache:"
+INFLIGHT_PREFIX = "transcript-inflight:"
+ATTACHED_PREFIX = "transcript-attached:"
+
+# Claims the media for a job or, while another job holds the claim, attaches
+# the job to that job's workflow. Atomic, so the holder never misses a job.
+# KEYS: claim, attached job set; ARGV: job ID, TTL
+CLAIM_SCRIPT = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'EX', ARGV[2]) then return 1 end
+redis.call('SADD', KEYS[2], ARGV[1])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+return 0
+"""
+
+# Drops a job's claim and returns the jobs attached to it. Attachments are
+# left for the new holder when another job took over an expired claim.
+# KEYS: claim, attached job set; ARGV: job ID
+RELEASE_SCRIPT = """
+local holder = redis.call('GET', KEYS[1])
+if holder and holder ~= ARGV[1] then return {} end
+local attached = redis.call('SMEMBERS', KEYS[2])
+redis.call('DEL', KEYS[2])
+if holder then redis.call('DEL', KEYS[1]) end
+return attached
+"""
+
+def media_key_for_url(url: str) -> str:
+    """Resolve a URL to its canonical media identity without network access.
+
+    Uses the matching yt-dlp extractor and its video id, e.g. "youtube:<id>",
+    so different URL spellings of one video share a key. URLs no extractor
+    recognises fall back to a hash of the normalised URL.
+    """
+    for extractor in yt_dlp.extractor.gen_extractor_classes():
+        if extractor.ie_key() == "Generic" or not extractor.suitable(url):
+            continue
+        video_id = extractor.get_temp_id(url)
+        if video_id:
+            return f"{extractor.ie_key().lower()}:{video_id}"
+        break
+
+    parts = urlsplit(url.strip())
+    normalized = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, ""))
+    return "url:" + hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+def media_key_for_file(path: str) -> str:
+    """Content hash of a downloaded audio file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return "sha256:" + digest.hexdigest()
+
+class MediaCacheService:
+    def __init__(self, s3_service: Optional[S3Service] = None, redis=None, async_redis=None):
+        self.redis = redis or redis_client
+        self.async_redis = async_redis or async_redis_client
+        self.s3_service = s3_service or S3Service()
+        self._claim = self.redis.register_script(CLAIM_SCRIPT)
+        self._release = self.redis.register_script(RELEASE_SCRIPT)
+
+    def get_transcript_key(self, media_key: str) -> Optional[str]:
+        """Get the S3 key of a cached transcript"""
+        return self.redis.get(CACHE_PREFIX + media_key)
+
+    async def get_transcript_key_async(self, media_key: str) -> Optional[str]:
+        return await self.async_redis.get(CACHE_PREFIX + media_key)
+
+    def store_transcript(
+        self,
+        segments: List[Dict[str, Any]],
+        media_keys: List[str],
+        index: Optional[Dict[str, Any]] = None
+    ) -> Optional[str]:
+        """Store an unfiltered transcript and its token index once, then index it under every media key"""
+        digest = hashlib.sha256(media_keys[0].encode("utf-8")).hexdigest()
+        s3_key = TranscriptStore(self.s3_service).write(segments, f"transcripts/{digest}")
+        if not s3_key:
+            return None
+        self.s3_service.upload_json(index or build_token_index(segments), index_key_for(s3_key))
+        for media_key in media_keys:
+            self.link_transcript(media_key, s3_key)
+        return s3_key
+
+    def link_transcript(self, media_key: str, s3_key: str):
+        """Index an already stored transcript under another media key"""
+        self.redis.set(CACHE_PREFIX + media_key, s3_key, ex=settings.transcript_cache_ttl_seconds)
+
+    def claim_or_attach(self, media_key: str, job_id: str) -> bool:
+        """Claim the media for this job; True when the job should run its own workflow.
+
+        While another job holds the claim, this job is attached to that job's
+        workflow instead, and completed or failed along with it.
+        """
+        return bool(self._claim(
+            keys=[INFLIGHT_PREFIX + media_key, ATTACHED_PREFIX + media_key],
+            args=[job_id, settings.transcription_inflight_ttl_seconds]
+        ))
+
+    def release_inflight(self, media_key: str, job_id: str) -> List[str]:
+        """Release this job's claim, returning the IDs of the jobs attached to it"""
+        return self._release(keys=[INFLIGHT_PREFIX + media_key, ATTACHED_PREFIX + media_key], args=[job_id])
@@ -1,46 +1,166 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.models.database import Note
-from app.models.schemas import NoteCreate, NoteUpdate
+from sqlalchemy import select, update, delete, insert, func, and_, or_, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Any, Optional, Tuple, Union
+from app.models.database import Note, NoteTag
+from app.models.schemas import (
+    NoteCreate, NoteUpdate, NoteSummary, NotesPage,
+    NotesBulkTagUpdate, BulkItemResult, BulkResult, TagCount
+)
+from app.models.transcript import SegmentRecord
+from app.services.search_service import SearchService, NoteTitle
 from datetime import datetime
+import base64
+
+def encode_note_cursor(created_at: datetime, note_id: str) -> str:
+    """Opaque keyset cursor pointing after a note in newest-first order"""
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{note_id}".encode()).decode().rstrip("=")
+
+def decode_note_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        created_at, note_id = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), note_id
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+def note_record(note: Note) -> Dict[str, Any]:
+    """A stored note in the shape of schemas.Note, without re-validating its segments"""
+    return {
+        "title": note.title,
+        "tags": note.tags or [],
+        "segments": [SegmentRecord.from_dict(segment) for segment in note.segments or []],
+        "source_url": note.source_url,
+        "id": note.id,
+        "user_id": note.user_id,
+        "created_at": note.created_at,
+        "updated_at": note.updated_at,
+    }
 
 class NotesService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
+        self.search_service = SearchService(db)
 
-    async def get_user_notes(self, user_id: str) -> List[Note]:
-        """Get all notes for a user"""
-        notes = self.db.query(Note).filter(Note.user_id == user_id).order_by(Note.created_at.desc()).all()
-        return notes
+    async def list_note_summaries(
+        self,
+        user_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        tags_any: Optional[List[str]] = None,
+        tags_all: Optional[List[str]] = None
+    ) -> NotesPage:
+        """Page through a user's notes, newest first, without loading their segments.
+
+        Keyset pagination on (created_at, id) walks the (user_id, created_at, id)
+        index, so every page costs the same however deep it is. Tag filters
+        resolve through the (user_id, tag) index of note_tags.
+        """
+        query = select(
+            Note.id,
+            Note.title,
+            Note.tags,
+            Note.source_url,
+            func.coalesce(func.json_array_length(Note.segments), 0).label("segment_count"),
+            Note.segments[0]["text"].as_string().label("preview"),
+            Note.created_at,
+            Note.updated_at
+        ).where(Note.user_id == user_id)
+        if tags_any:
+            query = query.where(Note.id.in_(
+                select(NoteTag.note_id).where(NoteTag.user_id == user_id, NoteTag.tag.in_(tags_any))
+            ))
+        if tags_all:
+            tags_all = list(dict.fromkeys(tags_all))
+            query = query.where(Note.id.in_(
+                select(NoteTag.note_id)
+                .where(NoteTag.user_id == user_id, NoteTag.tag.in_(tags_all))
+                .group_by(NoteTag.note_id)
+                .having(func.count() == len(tags_all))
+            ))
+        if cursor:
+            created_at, note_id = decode_note_cursor(cursor)
+            query = query.where(or_(
+                Note.created_at < created_at,
+                and_(Note.created_at == created_at, Note.id < note_id)
+            ))
+        query = query.order_by(Note.created_at.desc(), Note.id.desc()).limit(limit + 1)
+        
+        rows = (await self.db.execute(query)).mappings().all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_note_cursor(rows[-1]["created_at"], rows[-1]["id"])
+        return NotesPage(
+            notes=[NoteSummary(**{**row, "tags": row["tags"] or []}) for row in rows],
+            next_cursor=next_cursor
+        )
+
+    async def get_tag_counts(self, user_id: str) -> List[TagCount]:
+        """Number of notes per tag, most used first"""
+        count = func.count().label("count")
+        result = await self.db.execute(
+            select(NoteTag.tag, count)
+            .where(NoteTag.user_id == user_id)
+            .group_by(NoteTag.tag)
+            .order_by(count.desc(), NoteTag.tag)
+        )
+        return [TagCount(tag=tag, count=count) for tag, count in result.all()]
+
+    async def _replace_note_tags(self, notes: List[Union[Note, NoteTitle]], replace: bool = True):
+        """Mirror the notes' tags into note_tags, within the caller's transaction"""
+        if replace:
+            await self.db.execute(delete(NoteTag).where(NoteTag.note_id.in_([note.id for note in notes])))
+        rows = [
+            {"note_id": note.id, "tag": tag, "user_id": note.user_id}
+            for note in notes
+            for tag in dict.fromkeys(note.tags or [])
+        ]
+        if rows:
+            await self.db.execute(insert(NoteTag).values(rows))
+
+    async def get_note_segments(self, note_id: str, user_id: str) -> Optional[List[SegmentRecord]]:
+        """Get only the segments of one note"""
+        result = await self.db.execute(
+            select(Note.segments).where(
+                Note.id == note_id,
+                Note.user_id == user_id
+            )
+        )
+        row = result.first()
+        if row is None:
+            return None
+        # Segments were validated when the note was written
+        return [SegmentRecord.from_dict(segment) for segment in row.segments or []]
 
     async def get_note(self, note_id: str, user_id: str) -> Optional[Note]:
         """Get a specific note by ID"""
-        note = self.db.query(Note).filter(
-            Note.id == note_id,
-            Note.user_id == user_id
-        ).first()
-        return note
+        result = await self.db.execute(
+            select(Note).where(
+                Note.id == note_id,
+                Note.user_id == user_id
+            )
+        )
+        return result.scalars().first()
 
     async def create_note(self, note_data: NoteCreate, user_id: str) -> Note:
         """Create a new note"""
         note = Note(
             title=note_data.title,
             tags=note_data.tags,
-            segments=note_data.segments,
+            segments=[segment.model_dump() for segment in note_data.segments],
             source_url=note_data.source_url,
             user_id=user_id
         )
         self.db.add(note)
-        self.db.commit()
-        self.db.refresh(note)
+        await self.db.flush()
+        await self._replace_note_tags([note], replace=False)
+        await self.search_service.index_note(note, replace=False)
+        await self.db.commit()
+        await self.db.refresh(note)
         return note
 
     async def update_note(self, note_id: str, note_update: NoteUpdate, user_id: str) -> Optional[Note]:
         """Update an existing note"""
-        note = self.db.query(Note).filter(
-            Note.id == note_id,
-            Note.user_id == user_id
-        ).first()
+        note = await self.get_note(note_id, user_id)
         
         if not note:
             return None
@@ -49,22 +169,94 @@ class NotesService:
             note.title = note_update.title
         if note_update.tags is not None:
             note.tags = note_update.tags
+            await self._replace_note_tags([note])
         
         note.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(note)
+        await self.search_service.index_note(note)
+        await self.db.commit()
+        await self.db.refresh(note)
         return note
 
     async def delete_note(self, note_id: str, user_id: str) -> bool:
         """Delete a note"""
-        note = self.db.query(Note).filter(
-            Note.id == note_id,
-            Note.user_id == user_id
-        ).first()
+        note = await self.get_note(note_id, user_id)
         
         if not note:
             return False
         
-        self.db.delete(note)
-        self.db.commit()
-        return True 
\ No newline at end of file
+        await self.search_service.remove_notes([note.id])
+        await self.db.execute(delete(NoteTag).where(NoteTag.note_id == note.id))
+        await self.db.delete(note)
+        await self.db.commit()
+        return True
+
+    async def create_notes(self, notes_data: List[NoteCreate], user_id: str) -> BulkResult:
+        """Create many notes in one transaction with multi-row inserts"""
+        notes = [
+            Note(
+                title=note_data.title,
+                tags=note_data.tags,
+                segments=[segment.model_dump() for segment in note_data.segments],
+                source_url=note_data.source_url,
+                user_id=user_id
+            )
+            for note_data in notes_data
+        ]
+        self.db.add_all(notes)
+        await self.db.flush()
+        await self._replace_note_tags(notes, replace=False)
+        await self.search_service.index_notes(notes)
+        await self.db.commit()
+        return BulkResult(results=[BulkItemResult(id=note.id, status="created") for note in notes])
+
+    async def update_notes_tags(self, tag_update: NotesBulkTagUpdate, user_id: str) -> BulkResult:
+        """Add and remove tags on many notes in one transaction"""
+        result = await self.db.execute(
+            select(Note.id, Note.title, Note.tags).where(
+                Note.id.in_(tag_update.note_ids),
+                Note.user_id == user_id
+            )
+        )
+        found = {row.id: row for row in result.all()}
+        
+        removed = set(tag_update.remove_tags)
+        updated_notes = []
+        for row in found.values():
+            tags = [tag for tag in row.tags or [] if tag not in removed]
+            tags += [tag for tag in dict.fromkeys(tag_update.add_tags) if tag not in tags]
+            updated_notes.append(NoteTitle(id=row.id, user_id=user_id, title=row.title, tags=tags))
+        
+        if updated_notes:
+            now = datetime.utcnow()
+            await self.db.execute(
+                update(Note.__table__)
+                .where(Note.__table__.c.id == bindparam("note_id"))
+                .values(tags=bindparam("tags"), updated_at=now),
+                [{"note_id": note.id, "tags": note.tags} for note in updated_notes]
+            )
+            await self._replace_note_tags(updated_notes)
+            await self.search_service.reindex_note_titles(updated_notes)
+        await self.db.commit()
+        return BulkResult(results=[
+            BulkItemResult(id=note_id, status="updated" if note_id in found else "not_found")
+            for note_id in tag_update.note_ids
+        ])
+
+    async def delete_notes(self, note_ids: List[str], user_id: str) -> BulkResult:
+        """Delete many notes in one transaction"""
+        result = await self.db.execute(
+            select(Note.id).where(
+                Note.id.in_(note_ids),
+                Note.user_id == user_id
+            )
+        )
+        found = set(result.scalars().all())
+        if found:
+            await self.search_service.remove_notes(list(found))
+            await self.db.execute(delete(NoteTag).where(NoteTag.note_id.in_(found)))
+            await self.db.execute(delete(Note).where(Note.id.in_(found)))
+        await self.db.commit()
+        return BulkResult(results=[
+            BulkItemResult(id=note_id, status="deleted" if note_id in found else "not_found")
+            for note_id in note_ids
+        ])
\ No newline at end of file
@@ -0,0 +1,137 @@
+import asyncio
+import json
+from collections import defaultdict
+from typing import Dict, Set, Optional, Any, AsyncIterator
+from app.core.config import settings
+from app.core.redis_client import redis_client, async_redis_client
+from app.services.database_service import DatabaseService
+
+CHANNEL_PREFIX = "job-progress:"
+SNAPSHOT_PREFIX = "job-progress-snapshot:"
+THROTTLE_PREFIX = "job-progress-throttle:"
+TERMINAL_STATUSES = {"completed", "failed"}
+
+class ProgressSink:
+    """Coalescing, rate-limited job status writer for workers.
+
+    Every update refreshes the job's snapshot in Redis. Intermediate progress
+    is published to streams at most once per interval, and Postgres is only
+    written when the status changes or reaches a terminal state.
+    """
+
+    def __init__(self, db_service: Optional[DatabaseService] = None):
+        self.db_service = db_service or DatabaseService()
+
+    def update(self, job_id: str, status: str, progress: int, s3_key: Optional[str] = None, error_message: Optional[str] = None):
+        event = json.dumps({"status": status, "progress": progress, "message": error_message})
+        try:
+            previous = redis_client.set(SNAPSHOT_PREFIX + job_id, event, ex=settings.progress_snapshot_ttl_seconds, get=True)
+            transition = status in TERMINAL_STATUSES or not previous or json.loads(previous)["status"] != status
+            if transition or redis_client.set(THROTTLE_PREFIX + job_id, 1, nx=True, px=settings.progress_publish_interval_ms):
+                redis_client.publish(CHANNEL_PREFIX + job_id, event)
+        except Exception as e:
+            print(f"Error publishing job progress: {e}")
+            transition = True
+
+        if transition:
+            self.db_service.update_job_status(job_id, status, progress, s3_key, error_message)
+
+async def get_progress_snapshot(job_id: str) -> Optional[Dict[str, Any]]:
+    """Latest progress reported by the workers, if still in Redis"""
+    try:
+        snapshot = await async_redis_client.get(SNAPSHOT_PREFIX + job_id)
+    except Exception as e:
+        print(f"Error reading job progress: {e}")
+        return None
+    return json.loads(snapshot) if snapshot else None
+
+class ProgressBroadcaster:
+    """Fans job progress events out to the streams open in this API process.
+
+    A single pattern subscription per process receives every job's events,
+    so open client streams cost no extra Redis connections or DB queries.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self._listener: Optional[asyncio.Task] = None
+        self._listening: Optional[asyncio.Event] = None
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        if self._listener is None or self._listener.done():
+            self._listening = asyncio.Event()
+            self._listener = asyncio.create_task(self._listen())
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers[job_id].add(queue)
+        return queue
+
+    async def wait_listening(self, timeout: float) -> bool:
+        """Wait until the pattern subscription is active; False on timeout"""
+        try:
+            await asyncio.wait_for(self._listening.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(job_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[job_id]
+
+    async def _listen(self):
+        while True:
+            pubsub = async_redis_client.pubsub()
+            try:
+                await pubsub.psubscribe(CHANNEL_PREFIX + "*")
+                self._listening.set()
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    job_id = message["channel"][len(CHANNEL_PREFIX):]
+                    for queue in list(self._subscribers.get(job_id, ())):
+                        queue.put_nowait(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Progress listener error, reconnecting: {e}")
+                self._listening.clear()
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.close()
+
+progress_broadcaster = ProgressBroadcaster()
+
+def format_sse(data: str, event: str = "progress") -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+async def job_event_stream(job_id: str, initial: Dict[str, Any]) -> AsyncIterator[str]:
+    """Server-Sent Events for one job, ending after a terminal status"""
+    queue = progress_broadcaster.subscribe(job_id)
+    try:
+        # Wait for the subscription to be active, then send the latest known
+        # state, so no event is missed
+        while not await progress_broadcaster.wait_listening(settings.progress_keepalive_seconds):
+            yield ": keepalive\n\n"
+        snapshot = await async_redis_client.get(SNAPSHOT_PREFIX + job_id) or json.dumps(initial)
+        yield format_sse(snapshot)
+        if json.loads(snapshot)["status"] in TERMINAL_STATUSES:
+            return
+
+        while True:
+            try:
+                data = await asyncio.wait_for(queue.get(), timeout=settings.progress_keepalive_seconds)
+            except asyncio.TimeoutError:
+                # Events published while the listener reconnects are lost, so
+                # fall back to the snapshot to notice a finished job
+                snapshot = await get_progress_snapshot(job_id)
+                if not snapshot or snapshot["status"] not in TERMINAL_STATUSES:
+                    yield ": keepalive\n\n"
+                    continue
+                data = json.dumps(snapshot)
+            yield format_sse(data)
+            if json.loads(data)["status"] in TERMINAL_STATUSES:
+                return
+    finally:
+        progress_broadcaster.unsubscribe(job_id, queue)
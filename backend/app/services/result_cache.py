@@ -0,0 +1,154 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+from app.core.config import settings
+from app.core.redis_client import redis_client
+
+REDIS_PREFIX = "result-cache:"
+REDIS_PARTS_PREFIX = "result-cache-parts:"
+
+class ResultCache:
+    """Two-tier cache for parsed transcript data, keyed by result S3 key.
+
+    The first tier is an in-process LRU bounded by the JSON size of its
+    entries; the second is Redis, shared by all API processes. Stored
+    transcripts are immutable per key, so entries only need dropping when a
+    key is rewritten; local entries also expire after a short TTL so other
+    processes pick up such invalidations.
+    """
+
+    def __init__(self, max_bytes: int, local_ttl_seconds: int, redis_ttl_seconds: int):
+        self.max_bytes = max_bytes
+        self.local_ttl_seconds = local_ttl_seconds
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[Any, int, float]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "load_count": 0,
+            "load_seconds": 0.0,
+            "get_count": 0,
+            "get_seconds": 0.0,
+        }
+
+    def get(self, s3_key: str, part: str, decode: Optional[Callable[[Any], Any]] = None) -> Optional[Any]:
+        """Return a cached value or None.
+
+        Values read back from Redis are plain JSON; `decode` rebuilds objects
+        that were cached through their `to_json()`.
+        """
+        started = time.perf_counter()
+        value = self._get(s3_key, part, decode)
+        self._record("get", time.perf_counter() - started)
+        return value
+
+    def get_or_load(
+        self,
+        s3_key: str,
+        part: str,
+        loader: Callable[[], Any],
+        decode: Optional[Callable[[Any], Any]] = None
+    ) -> Any:
+        """Return a cached value, loading and caching it on a miss"""
+        value = self.get(s3_key, part, decode)
+        if value is None:
+            started = time.perf_counter()
+            value = loader()
+            self._record("load", time.perf_counter() - started)
+            if value:
+                self.set(s3_key, part, value)
+        return value
+
+    def _get(self, s3_key: str, part: str, decode: Optional[Callable[[Any], Any]]) -> Optional[Any]:
+        cache_key = f"{s3_key}#{part}"
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[2] > time.monotonic():
+                self._entries.move_to_end(cache_key)
+                self._stats["local_hits"] += 1
+                return entry[0]
+
+        try:
+            data = redis_client.get(REDIS_PREFIX + cache_key)
+        except Exception as e:
+            print(f"Error reading result cache: {e}")
+            data = None
+        if data is None:
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+
+        value = json.loads(data)
+        if decode:
+            value = decode(value)
+        self._set_local(cache_key, value, len(data))
+        with self._lock:
+            self._stats["redis_hits"] += 1
+        return value
+
+    def set(self, s3_key: str, part: str, value: Any):
+        cache_key = f"{s3_key}#{part}"
+        data = json.dumps(value, ensure_ascii=False, default=lambda obj: obj.to_json())
+        self._set_local(cache_key, value, len(data))
+        try:
+            pipe = redis_client.pipeline()
+            pipe.set(REDIS_PREFIX + cache_key, data, ex=self.redis_ttl_seconds)
+            pipe.sadd(REDIS_PARTS_PREFIX + s3_key, part)
+            pipe.expire(REDIS_PARTS_PREFIX + s3_key, self.redis_ttl_seconds)
+            pipe.execute()
+        except Exception as e:
+            print(f"Error writing result cache: {e}")
+
+    def _set_local(self, cache_key: str, value: Any, size: int):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(cache_key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[cache_key] = (value, size, time.monotonic() + self.local_ttl_seconds)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def invalidate(self, s3_key: str):
+        """Drop every cached part of a result"""
+        prefix = f"{s3_key}#"
+        with self._lock:
+            for cache_key in [k for k in self._entries if k.startswith(prefix)]:
+                self._size -= self._entries.pop(cache_key)[1]
+        try:
+            parts = redis_client.smembers(REDIS_PARTS_PREFIX + s3_key)
+            keys = [REDIS_PREFIX + prefix + part for part in parts] + [REDIS_PARTS_PREFIX + s3_key]
+            redis_client.delete(*keys)
+        except Exception as e:
+            print(f"Error invalidating result cache: {e}")
+
+    def _record(self, kind: str, seconds: float):
+        with self._lock:
+            self._stats[f"{kind}_count"] += 1
+            self._stats[f"{kind}_seconds"] += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit ratio, latency and size figures for this process"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._size
+        lookups = stats["local_hits"] + stats["redis_hits"] + stats["misses"]
+        stats["hit_ratio"] = (stats["local_hits"] + stats["redis_hits"]) / lookups if lookups else 0.0
+        stats["avg_get_ms"] = 1000 * stats["get_seconds"] / stats["get_count"] if stats["get_count"] else 0.0
+        stats["avg_load_ms"] = 1000 * stats["load_seconds"] / stats["load_count"] if stats["load_count"] else 0.0
+        return stats
+
+result_cache = ResultCache(
+    max_bytes=settings.result_cache_max_bytes,
+    local_ttl_seconds=settings.result_cache_local_ttl_seconds,
+    redis_ttl_seconds=settings.result_cache_redis_ttl_seconds
+)
@@ -1,42 +1,70 @@
-import boto3
 import json
-from typing import Dict, Any
+from typing import Dict, Any, BinaryIO, Iterator
+from botocore.exceptions import ClientError
 from app.core.config import settings
+from app.core.s3_client import get_s3_client, transfer_config
+from app.core.metrics import S3_UPLOAD_SECONDS
+
+def is_missing_object(error: Exception) -> bool:
+    """Whether an S3 error means the object does not exist, rather than a failed request"""
+    return isinstance(error, ClientError) and error.response.get("Error", {}).get("Code") in ("NoSuchKey", "404")
 
 class S3Service:
-    def __init__(self):
-        self.s3_client = boto3.client(
-            's3',
-            aws_access_key_id=settings.s3_access_key,
-            aws_secret_access_key=settings.s3_secret_key,
-            endpoint_url=settings.s3_endpoint
-        )
+    def __init__(self, s3_client=None):
+        # Instances are cheap: they share the process-wide pooled client
+        self.s3_client = s3_client or get_s3_client()
         self.bucket = settings.s3_bucket
 
     def upload_json(self, data: Dict[str, Any], key: str) -> bool:
         """Upload JSON data to S3"""
         try:
             json_data = json.dumps(data, ensure_ascii=False)
-            self.s3_client.put_object(
-                Bucket=self.bucket,
-                Key=key,
-                Body=json_data,
-                ContentType='application/json'
-            )
+            with S3_UPLOAD_SECONDS.labels("put_object").time():
+                self.s3_client.put_object(
+                    Bucket=self.bucket,
+                    Key=key,
+                    Body=json_data,
+                    ContentType='application/json'
+                )
+            return True
+        except Exception as e:
+            print(f"Error uploading to S3: {e}")
+            return False
+
+    def upload_bytes(self, data: bytes, key: str, content_type: str = 'application/octet-stream') -> bool:
+        """Upload raw bytes to S3"""
+        try:
+            with S3_UPLOAD_SECONDS.labels("put_object").time():
+                self.s3_client.put_object(
+                    Bucket=self.bucket,
+                    Key=key,
+                    Body=data,
+                    ContentType=content_type
+                )
             return True
         except Exception as e:
             print(f"Error uploading to S3: {e}")
             return False
 
+    def download_range(self, key: str, start: int, end: int) -> bytes:
+        """Download an inclusive byte range of an S3 object"""
+        response = self.s3_client.get_object(Bucket=self.bucket, Key=key, Range=f"bytes={start}-{end}")
+        return response['Body'].read()
+
     def download_json(self, key: str) -> Dict[str, Any]:
-        """Download JSON data from S3"""
+        """Download JSON data from S3; empty if the object does not exist.
+
+        Other errors are raised, so a failed request is never mistaken for
+        an empty result.
+        """
         try:
             response = self.s3_client.get_object(Bucket=self.bucket, Key=key)
-            json_data = response['Body'].read().decode('utf-8')
-            return json.loads(json_data)
-        except Exception as e:
+        except ClientError as e:
+            if not is_missing_object(e):
+                raise
             print(f"Error downloading from S3: {e}")
             return {}
+        return json.loads(response['Body'].read().decode('utf-8'))
 
     def delete_object(self, key: str) -> bool:
         """Delete object from S3"""
@@ -45,4 +73,65 @@ class S3Service:
             return True
         except Exception as e:
             print(f"Error deleting from S3: {e}")
-            return False 
\ No newline at end of file
+            return False
+
+
+    def upload_file(self, path: str, key: str) -> bool:
+        """Upload a local file to S3"""
+        try:
+            with S3_UPLOAD_SECONDS.labels("upload_file").time():
+                self.s3_client.upload_file(path, self.bucket, key, Config=transfer_config)
+            return True
+        except Exception as e:
+            print(f"Error uploading file to S3: {e}")
+            return False
+
+    def download_file(self, key: str, path: str) -> bool:
+        """Download an S3 object to a local file"""
+        try:
+            self.s3_client.download_file(self.bucket, key, path, Config=transfer_config)
+            return True
+        except Exception as e:
+            print(f"Error downloading file from S3: {e}")
+            return False
+
+    def upload_fileobj(self, fileobj: BinaryIO, key: str, content_type: str = 'application/octet-stream') -> bool:
+        """Stream a file-like object to S3, in parallel multipart parts when large"""
+        try:
+            with S3_UPLOAD_SECONDS.labels("upload_fileobj").time():
+                self.s3_client.upload_fileobj(
+                    fileobj, self.bucket, key,
+                    ExtraArgs={'ContentType': content_type},
+                    Config=transfer_config
+                )
+            return True
+        except Exception as e:
+            print(f"Error uploading stream to S3: {e}")
+            return False
+
+    def download_fileobj(self, key: str, fileobj: BinaryIO) -> bool:
+        """Stream an S3 object into a writable file-like object"""
+        try:
+            self.s3_client.download_fileobj(self.bucket, key, fileobj, Config=transfer_config)
+            return True
+        except Exception as e:
+            print(f"Error downloading stream from S3: {e}")
+            return False
+
+    def iter_object(self, key: str, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+        """Yield an S3 object's body in chunks without holding it in memory"""
+        response = self.s3_client.get_object(Bucket=self.bucket, Key=key)
+        yield from response['Body'].iter_chunks(chunk_size)
+
+    def delete_prefix(self, prefix: str) -> bool:
+        """Delete every object under a key prefix"""
+        try:
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+                objects = [{'Key': obj['Key']} for obj in page.get('Contents', [])]
+                if objects:
+                    self.s3_client.delete_objects(Bucket=self.bucket, Delete={'Objects': objects})
+            return True
+        except Exception as e:
+            print(f"Error deleting prefix from S3: {e}")
+            return False
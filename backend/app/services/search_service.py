@@ -0,0 +1,201 @@
+import math
+from collections import Counter
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+from sqlalchemy import select, delete, insert, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.database import SearchSegment, SearchTerm, Note, TranscriptionJob, generate_uuid
+from app.models.schemas import SearchHit
+from app.services.topic_matcher import normalize_tokens
+
+INSERT_BATCH_ROWS = 1000
+
+@dataclass(slots=True)
+class NoteTitle:
+    """The fields of a note that its title entry and tag rows are built from"""
+    id: str
+    user_id: str
+    title: str
+    tags: List[str]
+
+def note_title_piece(title: str, tags: Optional[List[str]]) -> Dict[str, Any]:
+    return {"position": None, "timestamp": None, "text": " ".join([title] + list(tags or []))}
+
+def note_search_segments(note: Note) -> List[Dict[str, Any]]:
+    """Searchable pieces of a note: its title and tags, then each segment"""
+    pieces = [note_title_piece(note.title, note.tags)]
+    for position, segment in enumerate(note.segments or []):
+        pieces.append({"position": position, "timestamp": segment.get("timestamp"), "text": segment.get("text", "")})
+    return pieces
+
+def transcript_search_segments(segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {"position": position, "timestamp": segment.get("start", segment.get("timestamp")), "text": segment.get("text", "")}
+        for position, segment in enumerate(segments)
+    ]
+
+def build_search_rows(
+    user_id: str,
+    source_type: str,
+    source_id: str,
+    pieces: List[Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Rows for search_segments and their postings for search_terms.
+
+    Terms are the same case-folded Snowball stems (Russian or English per
+    word) that topic filtering uses.
+    """
+    segment_rows = []
+    term_rows = []
+    for piece in pieces:
+        counts = Counter(normalize_tokens(piece["text"]))
+        if not counts:
+            continue
+        segment_id = generate_uuid()
+        segment_rows.append({
+            "id": segment_id,
+            "user_id": user_id,
+            "source_type": source_type,
+            "source_id": source_id,
+            "position": piece["position"],
+            "timestamp": piece["timestamp"],
+            "text": piece["text"],
+        })
+        term_rows.extend(
+            {"segment_id": segment_id, "term": term, "user_id": user_id, "count": count}
+            for term, count in counts.items()
+        )
+    return segment_rows, term_rows
+
+def remove_statements(source_type: str, source_ids: List[str], titles_only: bool = False) -> list:
+    """Statements deleting the indexed rows of some sources, or just their title pieces"""
+    conditions = [SearchSegment.source_type == source_type, SearchSegment.source_id.in_(source_ids)]
+    if titles_only:
+        conditions.append(SearchSegment.position.is_(None))
+    return [
+        delete(SearchTerm).where(SearchTerm.segment_id.in_(select(SearchSegment.id).where(*conditions))),
+        delete(SearchSegment).where(*conditions),
+    ]
+
+def index_statements(segment_rows: List[Dict[str, Any]], term_rows: List[Dict[str, Any]]) -> list:
+    """Multi-row inserts for prepared search rows, batched to stay under bind parameter limits"""
+    statements = []
+    for model, rows in ((SearchSegment, segment_rows), (SearchTerm, term_rows)):
+        for first in range(0, len(rows), INSERT_BATCH_ROWS):
+            statements.append(insert(model).values(rows[first:first + INSERT_BATCH_ROWS]))
+    return statements
+
+class SearchService:
+    """Ranked full-text search over a user's notes and transcripts.
+
+    Backed by an inverted index in the database (search_terms), so a query
+    only touches the postings of its own terms for one user. Segments are
+    scored by the sum of their matched terms' weights, where rarer terms
+    weigh more and repeated terms saturate.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def index_note(self, note: Note, replace: bool = True):
+        """Index a note within the caller's transaction"""
+        statements = remove_statements("note", [note.id]) if replace else []
+        statements += index_statements(*build_search_rows(note.user_id, "note", note.id, note_search_segments(note)))
+        for statement in statements:
+            await self.db.execute(statement)
+
+    async def index_notes(self, notes: List[Note]):
+        """Index new notes with one set of inserts, within the caller's transaction"""
+        segment_rows, term_rows = [], []
+        for note in notes:
+            rows = build_search_rows(note.user_id, "note", note.id, note_search_segments(note))
+            segment_rows += rows[0]
+            term_rows += rows[1]
+        for statement in index_statements(segment_rows, term_rows):
+            await self.db.execute(statement)
+
+    async def reindex_note_titles(self, notes: List[NoteTitle]):
+        """Re-index only the title and tags of notes, within the caller's transaction"""
+        segment_rows, term_rows = [], []
+        for note in notes:
+            rows = build_search_rows(note.user_id, "note", note.id, [note_title_piece(note.title, note.tags)])
+            segment_rows += rows[0]
+            term_rows += rows[1]
+        statements = remove_statements("note", [note.id for note in notes], titles_only=True)
+        for statement in statements + index_statements(segment_rows, term_rows):
+            await self.db.execute(statement)
+
+    async def remove_notes(self, note_ids: List[str]):
+        """Drop notes from the index within the caller's transaction"""
+        for statement in remove_statements("note", note_ids):
+            await self.db.execute(statement)
+
+    async def search(
+        self,
+        user_id: str,
+        query: str,
+        source_type: Optional[str] = None,
+        limit: int = 20
+    ) -> List[SearchHit]:
+        """Best matching segments for a query, highest score first"""
+        terms = list(dict.fromkeys(normalize_tokens(query)))
+        if not terms:
+            return []
+
+        # Document frequencies of the query terms weight the rarer ones higher
+        result = await self.db.execute(
+            select(SearchTerm.term, func.count())
+            .where(SearchTerm.user_id == user_id, SearchTerm.term.in_(terms))
+            .group_by(SearchTerm.term)
+        )
+        frequencies = dict(result.all())
+        if not frequencies:
+            return []
+        max_frequency = max(frequencies.values())
+        weights = {term: math.log(1 + (max_frequency + 1) / df) for term, df in frequencies.items()}
+
+        score = func.sum(case(weights, value=SearchTerm.term) * SearchTerm.count / (SearchTerm.count + 1.2))
+        ranked = (
+            select(SearchTerm.segment_id, score.label("score"))
+            .where(SearchTerm.user_id == user_id, SearchTerm.term.in_(list(weights)))
+            .group_by(SearchTerm.segment_id)
+            .order_by(score.desc())
+            .limit(limit)
+        )
+        if source_type:
+            ranked = ranked.join(SearchSegment, SearchSegment.id == SearchTerm.segment_id).where(
+                SearchSegment.source_type == source_type
+            )
+        scores = dict((await self.db.execute(ranked)).all())
+        if not scores:
+            return []
+
+        result = await self.db.execute(select(SearchSegment).where(SearchSegment.id.in_(list(scores))))
+        segments = result.scalars().all()
+        titles = await self._source_titles(segments)
+        hits = [
+            SearchHit(
+                source_type=segment.source_type,
+                source_id=segment.source_id,
+                title=titles.get((segment.source_type, segment.source_id)),
+                position=segment.position,
+                timestamp=segment.timestamp,
+                text=segment.text,
+                score=scores[segment.id]
+            )
+            for segment in segments
+        ]
+        return sorted(hits, key=lambda hit: hit.score, reverse=True)
+
+    async def _source_titles(self, segments: List[SearchSegment]) -> Dict[Tuple[str, str], str]:
+        """Note titles and transcript source URLs of the matched segments"""
+        note_ids = {segment.source_id for segment in segments if segment.source_type == "note"}
+        job_ids = {segment.source_id for segment in segments if segment.source_type == "transcript"}
+        titles = {}
+        if note_ids:
+            result = await self.db.execute(select(Note.id, Note.title).where(Note.id.in_(note_ids)))
+            titles.update({("note", note_id): title for note_id, title in result.all()})
+        if job_ids:
+            result = await self.db.execute(select(TranscriptionJob.id, TranscriptionJob.url).where(TranscriptionJob.id.in_(job_ids)))
+            titles.update({("transcript", job_id): url for job_id, url in result.all()})
+        return titles
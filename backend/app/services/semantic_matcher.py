@@ -0,0 +1,204 @@
+import hashlib
+import io
+import re
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Callable, Tuple
+import numpy as np
+from app.core.config import settings
+from app.core.redis_client import redis_client
+from app.services.s3_service import S3Service, is_missing_object
+from app.services.topic_matcher import normalize_tokens
+from app.services.transcript_store import TranscriptStore, transcript_base_key
+
+BUILD_REQUEST_PREFIX = "embedding-build-requested:"
+
+class EmbeddingsNotReady(ValueError):
+    """A transcript's segment embeddings are still being built"""
+
+class Embedder(ABC):
+    """Turns texts into L2-normalized float32 vectors, one row per text"""
+
+    name = "base"
+
+    @property
+    def cache_id(self) -> str:
+        """Identifies the vector space, so cached embeddings are never mixed across models"""
+        return self.name
+
+    @abstractmethod
+    def encode(self, texts: List[str]) -> np.ndarray:
+        ...
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.maximum(norms, 1e-12)).astype(np.float32)
+
+class FastEmbedEmbedder(Embedder):
+    """Sentence embeddings from a local ONNX model on CPU (multilingual by default)"""
+
+    name = "fastembed"
+
+    def __init__(self):
+        try:
+            from fastembed import TextEmbedding
+        except ImportError:
+            raise ValueError("Semantic matching requires the fastembed package")
+        self.model = TextEmbedding(
+            model_name=settings.embedding_model,
+            threads=settings.embedding_threads or None
+        )
+
+    @property
+    def cache_id(self) -> str:
+        return f"{self.name}-{re.sub(r'[^A-Za-z0-9]+', '-', settings.embedding_model).strip('-').lower()}"
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = list(self.model.embed(texts, batch_size=settings.embedding_batch_size))
+        if not vectors:
+            return np.zeros((0, 0), dtype=np.float32)
+        return normalize_rows(np.vstack(vectors))
+
+class HashingEmbedder(Embedder):
+    """Deterministic offline embedder for tests: signed hashed bag of stemmed words"""
+
+    name = "hashing"
+
+    @property
+    def cache_id(self) -> str:
+        return f"{self.name}-{settings.embedding_hash_dim}"
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), settings.embedding_hash_dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in normalize_tokens(text):
+                digest = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+                # A hash-derived sign keeps collisions from adding up to false similarity
+                vectors[row, (digest >> 1) % settings.embedding_hash_dim] += 1.0 if digest & 1 else -1.0
+        return normalize_rows(vectors)
+
+EMBEDDERS = {embedder.name: embedder for embedder in (FastEmbedEmbedder, HashingEmbedder)}
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+def get_embedder() -> Embedder:
+    """Get the embedder selected by settings, created once per process"""
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                embedder_class = EMBEDDERS.get(settings.embedding_engine)
+                if embedder_class is None:
+                    raise ValueError(f"Unknown embedding engine: {settings.embedding_engine}")
+                _embedder = embedder_class()
+    return _embedder
+
+@lru_cache(maxsize=256)
+def encode_topics(topics: Tuple[str, ...]) -> np.ndarray:
+    """Topic description embeddings, encoded once per distinct topic set"""
+    return get_embedder().encode(list(topics))
+
+def embeddings_key_for(transcript_key: str, revision: str, embedder: Embedder) -> str:
+    """S3 key of a transcript revision's segment embeddings for one embedder"""
+    suffix = f"-{revision}" if revision else ""
+    return f"{transcript_base_key(transcript_key)}.emb-{embedder.cache_id}{suffix}.npy"
+
+class SegmentEmbeddings:
+    """Segment embedding matrices, encoded once per transcript revision.
+
+    Workers build the matrix when a transcript is stored and keep it next to
+    the transcript in S3 as float16 .npy; the API only loads it, keeping the
+    most recently used ones in memory, so queries with new topics only encode
+    the topics. Transcripts are content-addressed, so every job of the same
+    media shares one matrix, and the key carries the transcript's revision so
+    a re-transcription never pairs old rows with new segments.
+    """
+
+    _memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+    _memory_lock = threading.Lock()
+
+    def __init__(self, s3_service: Optional[S3Service] = None):
+        self.s3_service = s3_service or S3Service()
+
+    def _key(self, transcript_key: str) -> str:
+        revision = TranscriptStore(self.s3_service).revision(transcript_key)
+        return embeddings_key_for(transcript_key, revision, get_embedder())
+
+    def get(self, transcript_key: str) -> Optional[np.ndarray]:
+        """The transcript's embeddings, or None while they have not been built"""
+        key = self._key(transcript_key)
+        with self._memory_lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+        embeddings = self._download(key)
+        if embeddings is not None:
+            self._remember(key, embeddings)
+        return embeddings
+
+    def claim_build(self, transcript_key: str) -> bool:
+        """True for the first caller in a while to find the embeddings missing, who queues their build"""
+        return bool(redis_client.set(
+            BUILD_REQUEST_PREFIX + self._key(transcript_key),
+            1,
+            nx=True,
+            ex=settings.embedding_build_retry_seconds
+        ))
+
+    def build(self, transcript_key: str, load_texts: Callable[[], List[str]]) -> bool:
+        """Encode and store the transcript's embeddings unless they already exist"""
+        key = self._key(transcript_key)
+        if self._download(key) is not None:
+            return True
+        embeddings = get_embedder().encode(load_texts())
+        buffer = io.BytesIO()
+        np.save(buffer, embeddings.astype(np.float16))
+        return self.s3_service.upload_bytes(buffer.getvalue(), key, "application/octet-stream")
+
+    def _remember(self, key: str, embeddings: np.ndarray):
+        with self._memory_lock:
+            self._memory[key] = embeddings
+            while len(self._memory) > settings.embedding_cache_entries:
+                self._memory.popitem(last=False)
+
+    def _download(self, key: str) -> Optional[np.ndarray]:
+        try:
+            data = b"".join(self.s3_service.iter_object(key))
+        except Exception as e:
+            if not is_missing_object(e):
+                raise
+            return None
+        return np.load(io.BytesIO(data)).astype(np.float32)
+
+def rank_segments(
+    embeddings: np.ndarray,
+    topics: List[str],
+    threshold: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """Segments similar to any topic, best first.
+
+    All segments are scored against all topics with one matrix product of
+    normalized embeddings (cosine similarity). A segment matches the topics
+    scoring at least the threshold and ranks by its best score.
+    """
+    topics = list(dict.fromkeys(topic.strip() for topic in topics if topic.strip()))
+    if not topics or not len(embeddings):
+        return []
+    threshold = settings.semantic_threshold if threshold is None else threshold
+
+    scores = embeddings @ encode_topics(tuple(topics)).T
+    best = scores.max(axis=1)
+    positions = np.flatnonzero(best >= threshold)
+    positions = positions[np.argsort(-best[positions], kind="stable")]
+    return [
+        {
+            "position": int(position),
+            "score": float(best[position]),
+            "topics": [topics[i] for i in np.flatnonzero(scores[position] >= threshold)],
+        }
+        for position in positions
+    ]
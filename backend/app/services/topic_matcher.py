@@ -0,0 +1,108 @@
+import re
+import threading
+from collections import deque
+from functools import lru_cache
+from typing import List, Dict, Iterable, Set, Tuple
+import snowballstemmer
+
+TOKEN_RE = re.compile(r"\w+")
+CYRILLIC_RE = re.compile(r"[Ѐ-ӿ]")
+
+# Snowball stemmers keep per-word state on the instance, so each thread
+# (S3 executor, Starlette threadpool) gets its own pair
+_stemmers = threading.local()
+
+def _stemmer(language: str):
+    stemmer = getattr(_stemmers, language, None)
+    if stemmer is None:
+        stemmer = snowballstemmer.stemmer(language)
+        setattr(_stemmers, language, stemmer)
+    return stemmer
+
+@lru_cache(maxsize=200_000)
+def stem(token: str) -> str:
+    """Stem a case-folded token with the Russian or English Snowball stemmer"""
+    if CYRILLIC_RE.search(token):
+        return _stemmer("russian").stemWord(token.replace("ё", "е"))
+    return _stemmer("english").stemWord(token)
+
+def normalize_tokens(text: str) -> List[str]:
+    """Split text into case-folded, stemmed word tokens"""
+    return [stem(token) for token in TOKEN_RE.findall(text.casefold())]
+
+class TopicMatcher:
+    """Aho-Corasick automaton over stemmed word tokens.
+
+    Matching works on whole words, so "art" no longer matches "start", and
+    every topic (including multi-word phrases) is found in a single pass over
+    a segment regardless of how many topics there are.
+    """
+
+    def __init__(self, topics: Iterable[str]):
+        self.topics: List[str] = []
+        self.patterns: List[List[str]] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Set[int]] = [set()]
+
+        for topic in dict.fromkeys(topic.strip() for topic in topics):
+            tokens = normalize_tokens(topic)
+            if not tokens:
+                continue
+            self._add_pattern(len(self.topics), tokens)
+            self.topics.append(topic)
+            self.patterns.append(tokens)
+        self._build_failure_links()
+
+    def _add_pattern(self, topic_id: int, tokens: List[str]):
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(set())
+                self._goto[state][token] = next_state
+            state = next_state
+        self._out[state].add(topic_id)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(token, 0)
+                self._out[next_state] |= self._out[self._fail[next_state]]
+
+    def match_tokens(self, tokens: List[str]) -> Set[int]:
+        """Ids of the topics occurring in a normalized token sequence"""
+        hits: Set[int] = set()
+        state = 0
+        for token in tokens:
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            if self._out[state]:
+                hits |= self._out[state]
+        return hits
+
+    def match(self, text: str) -> List[str]:
+        """Topics occurring in the text, in topic order"""
+        return [self.topics[topic_id] for topic_id in sorted(self.match_tokens(normalize_tokens(text)))]
+
+    def candidates(self, index: Dict[str, List[int]]) -> Set[int]:
+        """Segment positions that may match, using each pattern's rarest token"""
+        positions: Set[int] = set()
+        for tokens in self.patterns:
+            positions.update(min((index.get(token, []) for token in tokens), key=len))
+        return positions
+
+@lru_cache(maxsize=256)
+def get_topic_matcher(topics: Tuple[str, ...]) -> TopicMatcher:
+    """Build the matcher once per distinct topic set"""
+    return TopicMatcher(topics)
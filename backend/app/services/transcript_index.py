@@ -0,0 +1,65 @@
+from typing import List, Dict, Any, Optional, Set, Union, Iterable, Iterator, Tuple
+from app.models.transcript import SegmentRecord
+from app.services.topic_matcher import normalize_tokens, get_topic_matcher
+
+INDEX_VERSION = 2
+
+def build_token_index(segments: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Map every stemmed token to the sorted positions of the segments containing it"""
+    tokens: Dict[str, List[int]] = {}
+    for position, segment in enumerate(segments):
+        for token in set(normalize_tokens(segment.get("text", ""))):
+            tokens.setdefault(token, []).append(position)
+    return {"version": INDEX_VERSION, "tokens": tokens}
+
+def to_result_segment(
+    segment: Dict[str, Any],
+    topics: Optional[List[str]] = None,
+    score: Optional[float] = None
+) -> SegmentRecord:
+    """Project a stored transcript segment onto the result shape"""
+    return SegmentRecord(float(segment.get("start", segment.get("timestamp", 0))), segment.get("text", ""), topics, score)
+
+def candidate_positions(topics: List[str], index: Optional[Dict[str, Any]]) -> Optional[Set[int]]:
+    """Positions of the segments that may match the topics, or None without a usable index"""
+    if not topics or not index or index.get("version") != INDEX_VERSION:
+        return None
+    return get_topic_matcher(tuple(sorted(topics))).candidates(index["tokens"])
+
+def iter_filtered_segments(
+    items: Iterable[Tuple[int, Dict[str, Any]]],
+    topics: List[str],
+    candidates: Optional[Set[int]] = None
+) -> Iterator[Tuple[int, SegmentRecord]]:
+    """Lazily filter (position, segment) pairs, yielding result segments"""
+    if not topics:
+        for position, segment in items:
+            yield position, to_result_segment(segment)
+        return
+
+    matcher = get_topic_matcher(tuple(sorted(topics)))
+    for position, segment in items:
+        if candidates is not None and position not in candidates:
+            continue
+        matched_topics = matcher.match(segment.get("text", ""))
+        if matched_topics:
+            yield position, to_result_segment(segment, matched_topics)
+
+def filter_segments_by_topics(
+    segments: Union[List[Dict[str, Any]], Dict[int, Dict[str, Any]]],
+    topics: List[str],
+    index: Optional[Dict[str, Any]] = None
+) -> List[SegmentRecord]:
+    """Filter segments based on topics/keywords.
+
+    Topics are matched as whole, stemmed words by a matcher compiled once per
+    topic set, and each returned segment lists the topics it matched. With a
+    token index only the segments containing a topic's rarest word are
+    scanned; an index in an older format is ignored. Segments may be a list
+    or a position -> segment mapping holding at least the candidates.
+    """
+    available = segments if isinstance(segments, dict) else dict(enumerate(segments))
+    candidates = candidate_positions(topics, index)
+    positions = sorted(available if candidates is None else candidates.intersection(available))
+    items = ((position, available[position]) for position in positions)
+    return [segment for _, segment in iter_filtered_segments(items, topics)]
@@ -0,0 +1,268 @@
+import hashlib
+import json
+from array import array
+from bisect import bisect_right
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
+import orjson
+import zstandard
+from app.core.config import settings
+from app.services.s3_service import S3Service
+from app.services.result_cache import ResultCache, result_cache
+
+BLOCK_FORMAT = "zstd-ndjson"
+BLOCKS_SUFFIX = ".ndjson.zst"
+BLOCK_INDEX_SUFFIX = ".blocks.json"
+
+def is_block_transcript(transcript_key: str) -> bool:
+    return transcript_key.endswith(BLOCKS_SUFFIX)
+
+def transcript_base_key(transcript_key: str) -> str:
+    """Key without the format suffix, shared by a transcript's sidecar objects"""
+    for suffix in (BLOCKS_SUFFIX, ".json"):
+        if transcript_key.endswith(suffix):
+            return transcript_key[:-len(suffix)]
+    return transcript_key
+
+def index_key_for(transcript_key: str) -> str:
+    """S3 key of the token index stored next to a transcript"""
+    return f"{transcript_base_key(transcript_key)}.index.json"
+
+def block_index_key_for(transcript_key: str) -> str:
+    """S3 key of the block index stored next to a block transcript"""
+    return transcript_base_key(transcript_key) + BLOCK_INDEX_SUFFIX
+
+class SegmentBlock:
+    """Decoded segments of one block as parallel arrays.
+
+    Start and end times are float arrays and all texts share one string
+    sliced by offsets, so a cached block is a handful of objects instead of
+    a dict, two floats and a string per segment.
+    """
+
+    __slots__ = ("starts", "ends", "text", "offsets")
+
+    def __init__(self, starts: array, ends: array, text: str, offsets: array):
+        self.starts = starts
+        self.ends = ends
+        self.text = text
+        self.offsets = offsets
+
+    @classmethod
+    def from_ndjson(cls, data: bytes) -> "SegmentBlock":
+        starts, ends, texts = array("d"), array("d"), []
+        for line in data.splitlines():
+            segment = orjson.loads(line)
+            start = segment.get("start", 0)
+            starts.append(start)
+            ends.append(segment.get("end", start))
+            texts.append(segment.get("text", ""))
+        offsets = array("q", [0])
+        for text in texts:
+            offsets.append(offsets[-1] + len(text))
+        return cls(starts, ends, "".join(texts), offsets)
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "SegmentBlock":
+        return cls(array("d", data["starts"]), array("d", data["ends"]), data["text"], array("q", data["offsets"]))
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "starts": self.starts.tolist(),
+            "ends": self.ends.tolist(),
+            "text": self.text,
+            "offsets": self.offsets.tolist(),
+        }
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def segment_at(self, i: int) -> Dict[str, Any]:
+        return {"start": self.starts[i], "end": self.ends[i], "text": self.text[self.offsets[i]:self.offsets[i + 1]]}
+
+class TranscriptStore:
+    """Transcripts stored as independently compressed blocks of segments.
+
+    The transcript object is a concatenation of zstd frames, each holding
+    NDJSON for up to `transcript_block_segments` segments. A small sidecar
+    block index maps every block to its byte range, segment positions and
+    time range, so readers fetch only the blocks they need with range GETs.
+    Indexes and decoded blocks, held as SegmentBlock columns, go through the
+    two-tier result cache.
+    Transcripts written before this format (one JSON array) are still read.
+    """
+
+    def __init__(self, s3_service: Optional[S3Service] = None, cache: Optional[ResultCache] = None):
+        self.s3_service = s3_service or S3Service()
+        self.cache = cache or result_cache
+
+    def write(self, segments: List[Dict[str, Any]], base_key: str) -> Optional[str]:
+        """Store a transcript in block format, returning its key"""
+        compressor = zstandard.ZstdCompressor(level=settings.transcript_zstd_level)
+        block_size = settings.transcript_block_segments
+        frames = []
+        blocks = []
+        offset = 0
+        for first in range(0, len(segments), block_size):
+            block = [
+                {"start": seg.get("start", 0), "end": seg.get("end", seg.get("start", 0)), "text": seg.get("text", "")}
+                for seg in segments[first:first + block_size]
+            ]
+            payload = "".join(json.dumps(seg, ensure_ascii=False) + "\n" for seg in block).encode("utf-8")
+            frame = compressor.compress(payload)
+            frames.append(frame)
+            blocks.append({
+                "offset": offset,
+                "length": len(frame),
+                "first_segment": first,
+                "segment_count": len(block),
+                "start": block[0]["start"],
+                "end": max(seg["end"] for seg in block),
+            })
+            offset += len(frame)
+
+        transcript_key = base_key + BLOCKS_SUFFIX
+        body = b"".join(frames)
+        block_index = {
+            "version": 1,
+            "format": BLOCK_FORMAT,
+            "segment_count": len(segments),
+            "size": offset,
+            "sha256": hashlib.sha256(body).hexdigest(),
+            "blocks": blocks,
+        }
+        if not self.s3_service.upload_bytes(body, transcript_key, "application/zstd"):
+            return None
+        if not self.s3_service.upload_json(block_index, block_index_key_for(transcript_key)):
+            return None
+        self.cache.invalidate(transcript_key)
+        return transcript_key
+
+    def read_block_index(self, transcript_key: str) -> Dict[str, Any]:
+        return self.cache.get_or_load(
+            transcript_key, "blocks",
+            lambda: self.s3_service.download_json(block_index_key_for(transcript_key))
+        )
+
+    def revision(self, transcript_key: str) -> str:
+        """Short hash of the block index, which changes whenever the key is rewritten.
+
+        Transcript keys are content-addressed by media, so the same key is
+        reused when media is transcribed again; derived objects such as
+        embeddings include the revision in their keys to never go stale.
+        """
+        if not is_block_transcript(transcript_key):
+            return ""
+        block_index = self.read_block_index(transcript_key)
+        return hashlib.sha256(orjson.dumps(block_index, option=orjson.OPT_SORT_KEYS)).hexdigest()[:16]
+
+    def read_token_index(self, transcript_key: str) -> Dict[str, Any]:
+        return self.cache.get_or_load(
+            transcript_key, "tokens",
+            lambda: self.s3_service.download_json(index_key_for(transcript_key))
+        )
+
+    def _read_blocks(self, transcript_key: str, blocks: List[Dict[str, Any]]) -> List[SegmentBlock]:
+        """Decoded segments of each block, from the cache or coalesced range GETs"""
+        decoded = {}
+        missing = []
+        for block in blocks:
+            cached = self.cache.get(transcript_key, f"columns{block['offset']}", SegmentBlock.from_json)
+            if cached is None:
+                missing.append(block)
+            else:
+                decoded[block["offset"]] = cached
+
+        decompressor = zstandard.ZstdDecompressor()
+        for range_start, range_end, range_blocks in self._coalesce(missing):
+            data = self.s3_service.download_range(transcript_key, range_start, range_end)
+            for block in range_blocks:
+                frame = data[block["offset"] - range_start:block["offset"] - range_start + block["length"]]
+                decoded[block["offset"]] = SegmentBlock.from_ndjson(decompressor.decompress(frame))
+                self.cache.set(transcript_key, f"columns{block['offset']}", decoded[block["offset"]])
+        return [decoded[block["offset"]] for block in blocks]
+
+    def iter_segments(
+        self,
+        transcript_key: str,
+        positions: Optional[Iterable[int]] = None,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        from_position: int = 0
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (position, segment) pairs in order, fetching blocks lazily.
+
+        Restricting to positions, a time window and/or a starting position
+        limits the blocks downloaded. Segments outside the window or before
+        from_position are skipped, and for block transcripts so are segments
+        other than the requested positions.
+        """
+        if not is_block_transcript(transcript_key):
+            segments = self.cache.get_or_load(
+                transcript_key, "json",
+                lambda: self.s3_service.download_json(transcript_key)
+            ) or []
+            for position in range(from_position, len(segments)):
+                if self._in_window(segments[position], start_time, end_time):
+                    yield position, segments[position]
+            return
+
+        block_index = self.read_block_index(transcript_key)
+        blocks = [
+            block for block in block_index.get("blocks", [])
+            if block["first_segment"] + block["segment_count"] > from_position
+        ]
+        if positions is not None:
+            positions = set(positions)
+            first_segments = [block["first_segment"] for block in blocks]
+            needed = {bisect_right(first_segments, position) - 1 for position in positions}
+            blocks = [blocks[i] for i in sorted(needed) if i >= 0]
+        if start_time is not None:
+            blocks = [block for block in blocks if block["end"] >= start_time]
+        if end_time is not None:
+            blocks = [block for block in blocks if block["start"] <= end_time]
+
+        batch_size = settings.transcript_range_max_blocks
+        for batch_start in range(0, len(blocks), batch_size):
+            batch = blocks[batch_start:batch_start + batch_size]
+            for block, columns in zip(batch, self._read_blocks(transcript_key, batch)):
+                for i in range(len(columns)):
+                    position = block["first_segment"] + i
+                    if (
+                        position >= from_position
+                        and (positions is None or position in positions)
+                        and (start_time is None or columns.ends[i] >= start_time)
+                        and (end_time is None or columns.starts[i] <= end_time)
+                    ):
+                        yield position, columns.segment_at(i)
+
+    def read_segments(
+        self,
+        transcript_key: str,
+        positions: Optional[Iterable[int]] = None,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None
+    ) -> Dict[int, Dict[str, Any]]:
+        """Read segments keyed by position"""
+        return dict(self.iter_segments(transcript_key, positions, start_time, end_time))
+
+    def _coalesce(self, blocks: List[Dict[str, Any]]) -> List[Tuple[int, int, List[Dict[str, Any]]]]:
+        """Group adjacent blocks into inclusive byte ranges of bounded size"""
+        ranges = []
+        for block in sorted(blocks, key=lambda b: b["offset"]):
+            block_end = block["offset"] + block["length"] - 1
+            if (
+                ranges
+                and ranges[-1][1] + 1 == block["offset"]
+                and len(ranges[-1][2]) < settings.transcript_range_max_blocks
+            ):
+                ranges[-1] = (ranges[-1][0], block_end, ranges[-1][2] + [block])
+            else:
+                ranges.append((block["offset"], block_end, [block]))
+        return ranges
+
+    def _in_window(self, segment: Dict[str, Any], start_time: Optional[float], end_time: Optional[float]) -> bool:
+        start = segment.get("start", segment.get("timestamp", 0))
+        return (
+            (start_time is None or segment.get("end", start) >= start_time)
+            and (end_time is None or start <= end_time)
+        )
@@ -0,0 +1,95 @@
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any
+from app.core.config import settings
+from app.services.audio_service import AudioService
+
+class TranscriptionEngine(ABC):
+    """Turns an audio file into a list of {"start", "end", "text"} segments"""
+
+    name = "base"
+
+    @abstractmethod
+    def transcribe(self, audio_path: str) -> List[Dict[str, Any]]:
+        ...
+
+class OpenAIEngine(TranscriptionEngine):
+    """Whisper through the OpenAI API"""
+
+    name = "openai"
+
+    def __init__(self):
+        if not settings.openai_api_key:
+            raise ValueError("OpenAI API key not configured")
+        from openai import OpenAI
+        self.client = OpenAI(api_key=settings.openai_api_key)
+
+    def transcribe(self, audio_path: str) -> List[Dict[str, Any]]:
+        with open(audio_path, "rb") as audio_file:
+            transcript = self.client.audio.transcriptions.create(
+                model="whisper-1",
+                file=audio_file,
+                response_format="verbose_json"
+            )
+        return transcript.model_dump().get("segments") or []
+
+class LocalWhisperEngine(TranscriptionEngine):
+    """faster-whisper on CPU with int8 quantization.
+
+    The model is loaded once per worker process and reused by every chunk
+    task that process runs.
+    """
+
+    name = "local"
+
+    def __init__(self):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise ValueError("Local transcription engine requires the faster-whisper package")
+        self.model = WhisperModel(
+            settings.local_model_size,
+            device="cpu",
+            compute_type=settings.local_compute_type,
+            cpu_threads=settings.local_cpu_threads
+        )
+
+    def transcribe(self, audio_path: str) -> List[Dict[str, Any]]:
+        segments, _ = self.model.transcribe(audio_path, beam_size=settings.local_beam_size, vad_filter=True)
+        return [
+            {"id": segment.id, "start": segment.start, "end": segment.end, "text": segment.text}
+            for segment in segments
+        ]
+
+class StubEngine(TranscriptionEngine):
+    """Deterministic offline engine for tests: one numbered segment every few seconds"""
+
+    name = "stub"
+
+    def transcribe(self, audio_path: str) -> List[Dict[str, Any]]:
+        duration = AudioService().get_duration(audio_path)
+        step = settings.stub_segment_seconds
+        segments = []
+        start = 0.0
+        while start < duration:
+            end = min(start + step, duration)
+            segments.append({"id": len(segments), "start": start, "end": end, "text": f"Segment {len(segments)}"})
+            start = end
+        return segments
+
+ENGINES = {engine.name: engine for engine in (OpenAIEngine, LocalWhisperEngine, StubEngine)}
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_transcription_engine() -> TranscriptionEngine:
+    """Get the engine selected by settings, created once per process"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine_class = ENGINES.get(settings.transcription_engine)
+                if engine_class is None:
+                    raise ValueError(f"Unknown transcription engine: {settings.transcription_engine}")
+                _engine = engine_class()
+    return _engine
@@ -1,57 +1,149 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.models.database import TranscriptionJob
-from app.models.schemas import TranscriptionStatus, TranscriptionResult, Segment
-from app.tasks.transcription_tasks import transcribe_video_task
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from app.models.database import TranscriptionJob, generate_uuid
+from app.models.schemas import TranscriptionStatus
+from app.models.transcript import SegmentRecord, ResultPage
+from app.tasks.transcription_tasks import schedule_transcription_workflow, index_transcript_task, embed_transcript_task
 from app.services.s3_service import S3Service
-import json
+from app.core.s3_client import run_in_s3_executor
+from app.services.media_cache_service import MediaCacheService, media_key_for_url
+from app.services.transcript_index import iter_filtered_segments, candidate_positions, to_result_segment
+from app.services.semantic_matcher import SegmentEmbeddings, EmbeddingsNotReady, rank_segments
+from app.services.transcript_store import TranscriptStore
+from app.services.progress_service import get_progress_snapshot
+from app.services.idempotency_service import IdempotencyService, request_fingerprint
+from app.services.job_scheduler import JobScheduler
+from app.core.responses import ndjson_line
+import base64
+
+SEMANTIC_READ_BATCH = 200
+
+def encode_cursor(position: int) -> str:
+    """Opaque pagination cursor pointing after a segment position"""
+    return base64.urlsafe_b64encode(str(position).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except ValueError:
+        raise ValueError("Invalid cursor")
 
 class TranscriptionService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.s3_service = S3Service()
 
-    async def start_transcription(self, url: str, topics: List[str], user_id: str) -> str:
-        """Start a transcription job"""
-        # Create job record
-        job = TranscriptionJob(
-            url=url,
-            topics=topics,
-            user_id=user_id,
-            status="pending",
-            progress=0
-        )
-        self.db.add(job)
-        self.db.commit()
-        self.db.refresh(job)
+    async def start_transcription(
+        self,
+        url: str,
+        topics: List[str],
+        user_id: str,
+        idempotency_key: Optional[str] = None
+    ) -> str:
+        """Start a transcription job.
+
+        With an idempotency key, repeats of the same request return the
+        original job ID instead of starting new work. New jobs count against
+        the user's quotas, and their workflows start as the user's earlier
+        ones finish.
+        """
+        # Resolving the URL walks every yt-dlp extractor, so it runs off the event loop
+        media_key = await run_in_threadpool(media_key_for_url, url)
+        job_id = generate_uuid()
+        if idempotency_key:
+            idempotency_service = IdempotencyService()
+            existing_job_id = await idempotency_service.claim(
+                user_id, idempotency_key, request_fingerprint(url, topics), job_id
+            )
+            if existing_job_id:
+                return existing_job_id
+        
+        try:
+            await JobScheduler().admit(user_id)
+            
+            # Create job record
+            job = TranscriptionJob(
+                id=job_id,
+                url=url,
+                media_key=media_key,
+                topics=topics,
+                user_id=user_id,
+                status="pending",
+                progress=0
+            )
+            self.db.add(job)
+            await self.db.commit()
+        except Exception:
+            if idempotency_key:
+                await idempotency_service.release(user_id, idempotency_key, job_id)
+            raise
         
-        # Start Celery task
-        transcribe_video_task.delay(job.id, url, topics, user_id)
+        try:
+            # Finish immediately from a cached transcript of the same media
+            cache_service = MediaCacheService(self.s3_service)
+            cached_key = await cache_service.get_transcript_key_async(media_key)
+            if cached_key:
+                job.result_s3_key = cached_key
+                job.status = "completed"
+                job.progress = 100
+                await self.db.commit()
+            else:
+                # The job claims its media once it gets a workflow slot; if the same media
+                # is being transcribed by then, the running workflow completes this job as well.
+                # Scheduling is blocking Redis, broker and database work, so it runs off the loop
+                await run_in_threadpool(schedule_transcription_workflow, job.id, url, media_key, user_id)
+        except Exception as e:
+            # Neither leave a pending job that nothing will run nor hand it to retries
+            if idempotency_key:
+                await idempotency_service.release(user_id, idempotency_key, job_id)
+            await self._fail_job(job, str(e))
+            raise
         
+        if cached_key:
+            await run_in_threadpool(index_transcript_task.delay, job.id)
         return job.id
 
+    async def _fail_job(self, job: TranscriptionJob, error_message: str):
+        try:
+            await self.db.rollback()
+            job.status = "failed"
+            job.progress = 0
+            job.error_message = error_message
+            await self.db.commit()
+        except Exception as e:
+            print(f"Error failing job: {e}")
+
+    async def _get_job(self, job_id: str, user_id: str) -> Optional[TranscriptionJob]:
+        result = await self.db.execute(
+            select(TranscriptionJob).where(
+                TranscriptionJob.id == job_id,
+                TranscriptionJob.user_id == user_id
+            )
+        )
+        return result.scalars().first()
+
     async def get_job_status(self, job_id: str, user_id: str) -> TranscriptionStatus:
         """Get the status of a transcription job"""
-        job = self.db.query(TranscriptionJob).filter(
-            TranscriptionJob.id == job_id,
-            TranscriptionJob.user_id == user_id
-        ).first()
+        job = await self._get_job(job_id, user_id)
         
         if not job:
             raise ValueError("Job not found")
         
+        # Workers only persist status transitions; fine-grained progress lives in Redis
+        snapshot = await get_progress_snapshot(job_id) if job.status == "processing" else None
+        if snapshot:
+            return TranscriptionStatus(**snapshot)
+        
         return TranscriptionStatus(
             status=job.status,
             progress=job.progress,
             message=job.error_message
         )
 
-    async def get_filtered_result(self, job_id: str, user_id: str, topics: List[str]) -> TranscriptionResult:
-        """Get the filtered transcription result"""
-        job = self.db.query(TranscriptionJob).filter(
-            TranscriptionJob.id == job_id,
-            TranscriptionJob.user_id == user_id
-        ).first()
+    async def _get_completed_job(self, job_id: str, user_id: str) -> TranscriptionJob:
+        job = await self._get_job(job_id, user_id)
         
         if not job:
             raise ValueError("Job not found")
@@ -62,20 +154,166 @@ class TranscriptionService:
         if not job.result_s3_key:
             raise ValueError("No result available")
         
-        # Get result from S3
-        result_data = self.s3_service.download_json(job.result_s3_key)
+        return job
+
+    def _iter_result_segments(
+        self,
+        job: TranscriptionJob,
+        topics: List[str],
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        cursor: Optional[str] = None
+    ) -> Iterator[Tuple[int, SegmentRecord]]:
+        """Lazily yield (position, segment) for a job's result"""
+        result_s3_key = job.result_s3_key
+        topics = topics or job.topics or []
+        after_position = decode_cursor(cursor) if cursor else -1
+        
+        # Narrow the blocks to fetch with the token index, then read just those
+        store = TranscriptStore(self.s3_service)
+        index = store.read_token_index(result_s3_key) if topics else None
+        candidates = candidate_positions(topics, index)
+        positions = None if candidates is None else [p for p in candidates if p > after_position]
+        items = store.iter_segments(
+            result_s3_key, positions, start_time, end_time, after_position + 1
+        )
+        return iter_filtered_segments(items, topics, candidates)
+
+    def _iter_semantic_segments(
+        self,
+        job: TranscriptionJob,
+        topics: List[str],
+        threshold: Optional[float] = None,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        cursor: Optional[str] = None
+    ) -> Iterator[Tuple[int, SegmentRecord]]:
+        """Rank segments semantically similar to the topics, then lazily yield (rank, segment), best first.
+
+        Workers build a transcript's embeddings when it is stored; transcripts
+        stored before that get theirs queued by the first semantic request.
+        """
+        result_s3_key = job.result_s3_key
+        topics = topics or job.topics or []
+        after_rank = decode_cursor(cursor) if cursor else -1
+        
+        segment_embeddings = SegmentEmbeddings(self.s3_service)
+        embeddings = segment_embeddings.get(result_s3_key)
+        if embeddings is None:
+            if segment_embeddings.claim_build(result_s3_key):
+                embed_transcript_task.delay(result_s3_key)
+            raise EmbeddingsNotReady("Semantic matching for this transcript is still being prepared; retry shortly")
+        ranked = rank_segments(embeddings, topics, threshold)
+        return self._iter_ranked_segments(result_s3_key, ranked, after_rank, start_time, end_time)
+
+    def _iter_ranked_segments(
+        self,
+        result_s3_key: str,
+        ranked: List[Dict[str, Any]],
+        after_rank: int,
+        start_time: Optional[float],
+        end_time: Optional[float]
+    ) -> Iterator[Tuple[int, SegmentRecord]]:
+        """Yield (rank, segment) after a rank, reading only the segments of the ranks returned"""
+        store = TranscriptStore(self.s3_service)
+        for first in range(after_rank + 1, len(ranked), SEMANTIC_READ_BATCH):
+            batch = ranked[first:first + SEMANTIC_READ_BATCH]
+            segments = store.read_segments(
+                result_s3_key, [match["position"] for match in batch], start_time, end_time
+            )
+            for rank, match in enumerate(batch, first):
+                segment = segments.get(match["position"])
+                if segment is not None:
+                    yield rank, to_result_segment(segment, match["topics"], match["score"])
+
+    def _iter_segments(
+        self,
+        job: TranscriptionJob,
+        topics: List[str],
+        semantic: bool,
+        threshold: Optional[float],
+        start_time: Optional[float],
+        end_time: Optional[float],
+        cursor: Optional[str]
+    ) -> Iterator[Tuple[int, SegmentRecord]]:
+        if semantic:
+            return self._iter_semantic_segments(job, topics, threshold, start_time, end_time, cursor)
+        return self._iter_result_segments(job, topics, start_time, end_time, cursor)
+
+    async def get_filtered_result(
+        self,
+        job_id: str,
+        user_id: str,
+        topics: List[str],
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        semantic: bool = False,
+        threshold: Optional[float] = None
+    ) -> ResultPage:
+        """Get the transcription result filtered by the given topics, or the job's own topics.
+
+        Optionally restricted to a time window and paginated: with a limit the
+        response carries a cursor for the next page while more segments remain.
+        In semantic mode segments are matched by embedding similarity instead
+        of keywords and ranked best first. The page holds plain records built
+        from stored data, for the router to encode without re-validation.
+        """
+        job = await self._get_completed_job(job_id, user_id)
+        # S3 reads are blocking, so the page is assembled off the event loop
+        return await run_in_s3_executor(
+            self._read_page, job, topics, semantic, threshold, start_time, end_time, cursor, limit
+        )
+
+    def _read_page(
+        self,
+        job: TranscriptionJob,
+        topics: List[str],
+        semantic: bool,
+        threshold: Optional[float],
+        start_time: Optional[float],
+        end_time: Optional[float],
+        cursor: Optional[str],
+        limit: Optional[int]
+    ) -> ResultPage:
+        items = self._iter_segments(job, topics, semantic, threshold, start_time, end_time, cursor)
         
-        # Convert to Segment objects
-        segments = [
-            Segment(timestamp=seg["timestamp"], text=seg["text"])
-            for seg in result_data
-        ]
+        # Read one segment past the page to detect more
+        segments = []
+        next_cursor = None
+        last_position = -1
+        for position, seg in items:
+            if limit is not None and len(segments) == limit:
+                next_cursor = encode_cursor(last_position)
+                break
+            segments.append(seg)
+            last_position = position
         
-        return TranscriptionResult(segments=segments)
+        return ResultPage(segments=segments, next_cursor=next_cursor)
+
+    async def stream_result(
+        self,
+        job_id: str,
+        user_id: str,
+        topics: List[str],
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        cursor: Optional[str] = None,
+        semantic: bool = False,
+        threshold: Optional[float] = None
+    ) -> Iterator[bytes]:
+        """Get the result as an iterator of NDJSON lines, produced as blocks are read"""
+        job = await self._get_completed_job(job_id, user_id)
+        # Any up-front reads happen here; blocks are read as the response iterates in a threadpool
+        items = await run_in_s3_executor(
+            self._iter_segments, job, topics, semantic, threshold, start_time, end_time, cursor
+        )
+        return (ndjson_line(seg) for _, seg in items)
 
-    def update_job_status(self, job_id: str, status: str, progress: int, s3_key: Optional[str] = None, error_message: Optional[str] = None):
-        """Update job status (called by Celery task)"""
-        job = self.db.query(TranscriptionJob).filter(TranscriptionJob.id == job_id).first()
+    async def update_job_status(self, job_id: str, status: str, progress: int, s3_key: Optional[str] = None, error_message: Optional[str] = None):
+        """Update job status"""
+        job = await self.db.get(TranscriptionJob, job_id)
         if job:
             job.status = status
             job.progress = progress
@@ -83,4 +321,4 @@ class TranscriptionService:
                 job.result_s3_key = s3_key
             if error_message:
                 job.error_message = error_message
-            self.db.commit() 
\ No newline at end of file
+            await self.db.commit() 
\ No newline at end of file
@@ -1,110 +1,339 @@
 import os
+import shutil
 import tempfile
-import json
-from typing import List, Dict, Any
+import time
+from collections import deque
+from typing import List, Dict, Any, Optional
 import yt_dlp
-import openai
-from celery import current_task
-from app.core.celery_app import celery_app
+from celery import chain, chord
+from celery.signals import worker_process_init
+from app.core.celery_app import celery_app, PRIORITY_FAST, PRIORITY_INTERACTIVE, PRIORITY_BULK
 from app.core.config import settings
+from app.core.redis_client import redis_client
+from app.core.metrics import DOWNLOAD_SECONDS, DOWNLOAD_BYTES, AUDIO_DURATION_SECONDS, REAL_TIME_FACTOR
+from app.core.tracing import tracer
 from app.services.s3_service import S3Service
 from app.services.database_service import DatabaseService
+from app.services.audio_service import AudioService, merge_chunk_segments
+from app.services.media_cache_service import MediaCacheService, media_key_for_file
+from app.services.transcript_index import build_token_index
+from app.services.transcription_engines import get_transcription_engine
+from app.services.progress_service import ProgressSink
+from app.services.transcript_store import TranscriptStore
+from app.services.search_service import transcript_search_segments
+from app.services.semantic_matcher import SegmentEmbeddings
+from app.services.job_scheduler import JobScheduler
+
+CHUNKS_DONE_PREFIX = "transcription-chunks-done:"
+
+@worker_process_init.connect
+def load_transcription_engine(**kwargs):
+    """Load the local model once per worker process instead of on the first task"""
+    if settings.transcription_engine == "local":
+        get_transcription_engine()
+
+def work_key(job_id: str, name: str) -> str:
+    """S3 key of an intermediate artifact handed from one stage to the next"""
+    return f"work/{job_id}/{name}"
+
+def build_transcription_workflow(
+    job_id: str,
+    url: str,
+    media_key: Optional[str] = None,
+    user_id: Optional[str] = None,
+    priority: int = PRIORITY_INTERACTIVE
+):
+    """Staged pipeline: download -> segment -> transcribe chunks (fan-out) -> merge + index -> upload.
+
+    Stages pass a small state dict along the chain and exchange audio through
+    S3, so each stage can run on any worker consuming its queue.
+    """
+    workflow = chain(
+        download_audio_task.s(job_id, url, media_key, user_id, priority).set(priority=priority),
+        split_audio_task.s().set(priority=priority),
+        upload_transcript_task.s().set(priority=priority)
+    )
+    workflow.link_error(transcription_failed_task.s(job_id, media_key, user_id))
+    return workflow
+
+def start_transcription_workflow(
+    job_id: str,
+    url: str,
+    media_key: Optional[str] = None,
+    user_id: Optional[str] = None,
+    priority: int = PRIORITY_INTERACTIVE
+):
+    """Queue the staged workflow for a job.
+
+    The full transcript is stored once; topic filtering happens at read time.
+    """
+    return build_transcription_workflow(job_id, url, media_key, user_id, priority).apply_async()
+
+def schedule_transcription_workflow(job_id: str, url: str, media_key: str, user_id: str):
+    """Start the workflow once the user has a free slot, queuing it in their backlog meanwhile.
+
+    A job that starts right away runs at interactive priority; jobs that had
+    to wait behind the user's own backlog run at bulk priority.
+    """
+    started, expired = JobScheduler().submit(user_id, {"job_id": job_id, "url": url, "media_key": media_key})
+    interactive = [job["job_id"] for job in started] == [job_id]
+    _start_scheduled(started, expired, user_id, PRIORITY_INTERACTIVE if interactive else PRIORITY_BULK)
+
+def release_workflow_slot(job_id: str, user_id: Optional[str]):
+    """Free a finished workflow's slot and start the user's next backlogged jobs"""
+    if user_id:
+        started, expired = JobScheduler().finish(user_id, job_id)
+        _start_scheduled(started, expired, user_id, PRIORITY_BULK)
+
+def _start_scheduled(started: List[Dict[str, Any]], expired: List[Dict[str, Any]], user_id: str, priority: int):
+    """Start the jobs granted a slot and fail the ones that expired in the backlog.
+
+    The media is only claimed once a job has a slot. A job whose media another
+    workflow is already transcribing attaches to that workflow and passes its
+    slot straight on to the user's next backlogged job.
+    """
+    scheduler = JobScheduler()
+    cache_service = MediaCacheService()
+    progress_sink = ProgressSink()
+    queue = deque(started)
+    while True:
+        for job in expired:
+            progress_sink.update(job["job_id"], "failed", 0, error_message="Expired while waiting in the queue")
+        if not queue:
+            break
+        job = queue.popleft()
+        if cache_service.claim_or_attach(job["media_key"], job["job_id"]):
+            start_transcription_workflow(job["job_id"], job["url"], job["media_key"], user_id, priority)
+            expired = []
+        else:
+            started, expired = scheduler.finish(user_id, job["job_id"])
+            queue.extend(started)
+            priority = PRIORITY_BULK
 
 @celery_app.task(bind=True)
-def transcribe_video_task(self, job_id: str, url: str, topics: List[str], user_id: str):
-    """Celery task to transcribe a video"""
+def download_audio_task(
+    self,
+    job_id: str,
+    url: str,
+    media_key: Optional[str] = None,
+    user_id: Optional[str] = None,
+    priority: int = PRIORITY_INTERACTIVE
+) -> Dict[str, Any]:
+    """I/O stage: download the audio and check the transcript cache"""
+    state = {
+        "job_id": job_id,
+        "media_key": media_key,
+        "user_id": user_id,
+        "priority": priority,
+        "content_key": None,
+        "transcript_key": None
+    }
+    progress_sink = ProgressSink()
+    progress_sink.update(job_id, "processing", 10)
+    
+    # Reuse a cached transcript of the same media if one appeared meanwhile
+    cache_service = MediaCacheService()
+    state["transcript_key"] = cache_service.get_transcript_key(media_key) if media_key else None
+    if state["transcript_key"]:
+        return state
+    
+    # Per-task workspace, so concurrent jobs never share files and nothing leaks on failure
+    workspace = tempfile.mkdtemp(prefix=f"job-{job_id}-", dir=settings.workspace_dir)
     try:
-        # Update job status to processing
-        db_service = DatabaseService()
-        db_service.update_job_status(job_id, "processing", 10)
-        
-        # Download video
-        current_task.update_state(state="PROGRESS", meta={"progress": 20})
-        video_path = download_video(url)
-        
-        # Update progress
-        db_service.update_job_status(job_id, "processing", 40)
-        current_task.update_state(state="PROGRESS", meta={"progress": 40})
-        
-        # Transcribe video
-        transcription_result = transcribe_audio(video_path)
-        
-        # Update progress
-        db_service.update_job_status(job_id, "processing", 80)
-        current_task.update_state(state="PROGRESS", meta={"progress": 80})
-        
-        # Filter segments by topics
-        filtered_segments = filter_segments_by_topics(transcription_result, topics)
+        with tracer.start_as_current_span("yt-dlp download"), DOWNLOAD_SECONDS.time():
+            audio_path = download_video(url, workspace)
+        DOWNLOAD_BYTES.observe(os.path.getsize(audio_path))
         
-        # Save to S3
-        s3_service = S3Service()
-        s3_key = f"transcriptions/{job_id}/result.json"
-        s3_service.upload_json(filtered_segments, s3_key)
+        # Different URLs may still resolve to identical audio
+        state["content_key"] = media_key_for_file(audio_path)
+        state["transcript_key"] = cache_service.get_transcript_key(state["content_key"])
+        if state["transcript_key"]:
+            if media_key:
+                cache_service.link_transcript(media_key, state["transcript_key"])
+            return state
         
-        # Update job status to completed
-        db_service.update_job_status(job_id, "completed", 100, s3_key)
-        current_task.update_state(state="SUCCESS", meta={"progress": 100})
-        
-        # Cleanup
-        os.remove(video_path)
-        
-        return {"status": "completed", "job_id": job_id}
+        state["audio_key"] = work_key(job_id, "audio" + os.path.splitext(audio_path)[1])
+        if not S3Service().upload_file(audio_path, state["audio_key"]):
+            raise RuntimeError("Failed to upload audio")
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+    
+    progress_sink.update(job_id, "processing", 40)
+    return state
+
+@celery_app.task(bind=True)
+def split_audio_task(self, state: Dict[str, Any]):
+    """CPU stage: cut the audio into chunks and fan out their transcription"""
+    if state["transcript_key"]:
+        return state
+    
+    job_id = state["job_id"]
+    s3_service = S3Service()
+    workspace = tempfile.mkdtemp(prefix=f"job-{job_id}-", dir=settings.workspace_dir)
+    try:
+        audio_path = os.path.join(workspace, os.path.basename(state["audio_key"]))
+        if not s3_service.download_file(state["audio_key"], audio_path):
+            raise RuntimeError("Failed to download audio")
         
-    except Exception as e:
-        # Update job status to failed
-        db_service = DatabaseService()
-        db_service.update_job_status(job_id, "failed", 0, error_message=str(e))
-        current_task.update_state(state="FAILURE", meta={"error": str(e)})
-        raise
-
-def download_video(url: str) -> str:
-    """Download video using yt-dlp"""
+        with tracer.start_as_current_span("ffmpeg split"):
+            chunks = AudioService().split_audio(audio_path, workspace)
+        AUDIO_DURATION_SECONDS.observe(chunks[-1]["end"])
+        for chunk in chunks:
+            chunk_key = work_key(job_id, f"chunks/{chunk['index']:04d}{os.path.splitext(chunk['path'])[1]}")
+            if not s3_service.upload_file(chunk.pop("path"), chunk_key):
+                raise RuntimeError("Failed to upload audio chunk")
+            chunk["key"] = chunk_key
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+    
+    # Short audio takes the fast lane past long transcriptions waiting for CPU workers
+    priority = state.get("priority", PRIORITY_INTERACTIVE)
+    if chunks[-1]["end"] <= settings.fast_lane_max_audio_seconds:
+        priority = PRIORITY_FAST
+    
+    redis_client.delete(CHUNKS_DONE_PREFIX + job_id)
+    header = [transcribe_chunk_task.s(job_id, chunk, len(chunks)).set(priority=priority) for chunk in chunks]
+    return self.replace(chord(header, merge_transcript_task.s(state, chunks).set(priority=priority)))
+
+@celery_app.task(bind=True)
+def transcribe_chunk_task(self, job_id: str, chunk: Dict[str, Any], total_chunks: int) -> List[Dict[str, Any]]:
+    """CPU stage: transcribe one chunk, segment times relative to the chunk"""
+    workspace = tempfile.mkdtemp(prefix=f"job-{job_id}-", dir=settings.workspace_dir)
+    try:
+        chunk_path = os.path.join(workspace, os.path.basename(chunk["key"]))
+        if not S3Service().download_file(chunk["key"], chunk_path):
+            raise RuntimeError("Failed to download audio chunk")
+        with tracer.start_as_current_span("transcribe", attributes={"transcription.engine": settings.transcription_engine}):
+            started = time.perf_counter()
+            segments = transcribe_audio(chunk_path)
+        chunk_seconds = chunk["end"] - chunk["start"]
+        if chunk_seconds > 0:
+            REAL_TIME_FACTOR.labels(settings.transcription_engine).observe((time.perf_counter() - started) / chunk_seconds)
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+    
+    done = redis_client.incr(CHUNKS_DONE_PREFIX + job_id)
+    redis_client.expire(CHUNKS_DONE_PREFIX + job_id, settings.transcription_inflight_ttl_seconds)
+    ProgressSink().update(job_id, "processing", 40 + int(40 * done / total_chunks))
+    return segments
+
+@celery_app.task(bind=True)
+def merge_transcript_task(self, chunk_segments: List[List[Dict[str, Any]]], state: Dict[str, Any], chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """CPU stage: stitch chunk transcripts and build the token index.
+
+    Merging and indexing share a task so the transcript only crosses the
+    result backend once on its way to the upload stage.
+    """
+    segments = merge_chunk_segments(chunks, chunk_segments)
+    redis_client.delete(CHUNKS_DONE_PREFIX + state["job_id"])
+    return {**state, "segments": segments, "index": build_token_index(segments)}
+
+@celery_app.task(bind=True)
+def upload_transcript_task(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    """I/O stage: store the transcript and complete the job and any attached jobs"""
+    job_id = state["job_id"]
+    media_key = state["media_key"]
+    cache_service = MediaCacheService()
+    
+    s3_key = state["transcript_key"]
+    if not s3_key:
+        # Save the unfiltered transcript and its token index to S3
+        media_keys = [k for k in (state["content_key"], media_key) if k]
+        with tracer.start_as_current_span("store transcript"):
+            s3_key = cache_service.store_transcript(state["segments"], media_keys, state["index"])
+        if not s3_key:
+            raise RuntimeError("Failed to store transcript")
+        embed_transcript_task.delay(s3_key)
+    
+    # Update job status to completed
+    progress_sink = ProgressSink()
+    progress_sink.update(job_id, "completed", 100, s3_key)
+    
+    completed_job_ids = [job_id]
+    
+    # Complete jobs that attached to this one instead of starting their own run
+    if media_key:
+        for attached_job_id in cache_service.release_inflight(media_key, job_id):
+            progress_sink.update(attached_job_id, "completed", 100, s3_key)
+            completed_job_ids.append(attached_job_id)
+    
+    for completed_job_id in completed_job_ids:
+        index_transcript_task.delay(completed_job_id)
+    
+    S3Service().delete_prefix(work_key(job_id, ""))
+    release_workflow_slot(job_id, state.get("user_id"))
+    return {"status": "completed", "job_id": job_id}
+
+@celery_app.task
+def transcription_failed_task(request, exc, traceback, job_id: str, media_key: Optional[str] = None, user_id: Optional[str] = None):
+    """Error callback of the workflow: fail the job and everything attached to it"""
+    progress_sink = ProgressSink()
+    progress_sink.update(job_id, "failed", 0, error_message=str(exc))
+    if media_key:
+        for attached_job_id in MediaCacheService().release_inflight(media_key, job_id):
+            progress_sink.update(attached_job_id, "failed", 0, error_message=str(exc))
+    redis_client.delete(CHUNKS_DONE_PREFIX + job_id)
+    S3Service().delete_prefix(work_key(job_id, ""))
+    release_workflow_slot(job_id, user_id)
+
+@celery_app.task
+def index_transcript_task(job_id: str):
+    """I/O stage: add a completed job's transcript to its owner's search index"""
+    db_service = DatabaseService()
+    job = db_service.get_job(job_id)
+    if not job or job["status"] != "completed" or not job["result_s3_key"]:
+        return
+    
+    # Users transcribing the same media twice only need it indexed once
+    if db_service.is_transcript_indexed(job["user_id"], job["result_s3_key"], job_id):
+        return
+    
+    segments = [segment for _, segment in TranscriptStore().iter_segments(job["result_s3_key"])]
+    if not db_service.replace_search_index(job["user_id"], "transcript", job_id, transcript_search_segments(segments)):
+        raise RuntimeError("Failed to index transcript")
+
+@celery_app.task
+def embed_transcript_task(transcript_key: str):
+    """CPU stage: encode a stored transcript's segment embeddings for semantic matching"""
+    store = TranscriptStore()
+    stored = SegmentEmbeddings().build(
+        transcript_key, lambda: [segment["text"] for _, segment in store.iter_segments(transcript_key)]
+    )
+    if not stored:
+        raise RuntimeError("Failed to store transcript embeddings")
+
+def download_video(url: str, workspace: str) -> str:
+    """Download the audio track with yt-dlp into the job workspace.
+
+    Audio is extracted straight to compact 16 kHz mono speech audio
+    (Ogg Opus by default) instead of high-bitrate mp3.
+    """
     ydl_opts = {
         'format': 'bestaudio/best',
-        'outtmpl': '%(id)s.%(ext)s',
+        'outtmpl': os.path.join(workspace, '%(id)s.%(ext)s'),
         'postprocessors': [{
             'key': 'FFmpegExtractAudio',
-            'preferredcodec': 'mp3',
-            'preferredquality': '192',
+            'preferredcodec': settings.audio_codec,
+            'preferredquality': settings.audio_bitrate_kbps,
         }],
+        'postprocessor_args': {
+            'extractaudio': ['-ac', '1', '-ar', str(settings.audio_sample_rate)],
+        },
+        'quiet': True,
+        'noprogress': True,
     }
     
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
         info = ydl.extract_info(url, download=True)
-        video_id = info['id']
-        return f"{video_id}.mp3"
+        audio_path = info['requested_downloads'][0]['filepath']
+    
+    # Whisper accepts Ogg Opus only under the .ogg extension
+    if audio_path.endswith('.opus'):
+        ogg_path = audio_path[:-len('.opus')] + '.ogg'
+        os.replace(audio_path, ogg_path)
+        audio_path = ogg_path
+    return audio_path
 
 def transcribe_audio(audio_path: str) -> List[Dict[str, Any]]:
-    """Transcribe audio using OpenAI Whisper"""
-    if not settings.openai_api_key:
-        raise ValueError("OpenAI API key not configured")
-    
-    openai.api_key = settings.openai_api_key
-    
-    with open(audio_path, "rb") as audio_file:
-        transcript = openai.Audio.transcribe(
-            "whisper-1",
-            audio_file,
-            response_format="verbose_json",
-            timestamp_granularities=["segment"]
-        )
-    
-    return transcript.get("segments", [])
-
-def filter_segments_by_topics(segments: List[Dict[str, Any]], topics: List[str]) -> List[Dict[str, Any]]:
-    """Filter segments based on topics/keywords"""
-    if not topics:
-        return segments
-    
-    filtered_segments = []
-    topics_lower = [topic.lower() for topic in topics]
-    
-    for segment in segments:
-        text_lower = segment.get("text", "").lower()
-        if any(topic in text_lower for topic in topics_lower):
-            filtered_segments.append({
-                "timestamp": segment.get("start", 0),
-                "text": segment.get("text", "")
-            })
-    
-    return filtered_segments 
\ No newline at end of file
+    """Transcribe audio with the configured transcription engine"""
+    return get_transcription_engine().transcribe(audio_path)
\ No newline at end of file
@@ -0,0 +1,43 @@
+import asyncio
+from typing import Dict, Any
+import httpx
+from app.main import app
+from benchmarks.fixtures import (
+    create_user, cache_transcripts, create_completed_jobs, make_topics, video_url
+)
+from benchmarks.timing import measure_load
+
+async def _run(quick: bool) -> Dict[str, Dict[str, Any]]:
+    user_id, token = create_user("api")
+    urls = [video_url(number) for number in range(5 if quick else 20)]
+    topics = make_topics(3)
+    transcript_keys = cache_transcripts(urls, 500 if quick else 2000)
+    job_ids = create_completed_jobs(user_id, transcript_keys, topics)
+    total = 60 if quick else 400
+
+    # Submissions of already transcribed media: admission, job row, cache hit
+    # and indexing, without running the stub pipeline on every request
+    scenarios = {
+        "transcribe": lambda client, n: client.post("/api/transcribe", json={"url": urls[n % len(urls)], "topics": topics}),
+        "status": lambda client, n: client.get(f"/api/transcribe/{job_ids[n % len(job_ids)]}/status"),
+        "result": lambda client, n: client.get(f"/api/transcribe/{job_ids[n % len(job_ids)]}/result"),
+        "result_page": lambda client, n: client.get(f"/api/transcribe/{job_ids[n % len(job_ids)]}/result", params={"limit": 100}),
+    }
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers, timeout=60) as client:
+        for name, send in scenarios.items():
+            async def request(number: int) -> bool:
+                response = await send(client, number)
+                return response.status_code == 200
+            # Warm the auth and result caches, as a running service would have
+            await measure_load(request, len(job_ids), 1)
+            for concurrency in (1, 16):
+                results[f"api.{name}.c{concurrency}"] = await measure_load(request, total, concurrency)
+    return results
+
+def run(quick: bool) -> Dict[str, Dict[str, Any]]:
+    """Latency and throughput of /api/transcribe, /status and /result under concurrent clients"""
+    return asyncio.run(_run(quick))
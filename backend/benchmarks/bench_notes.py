@@ -0,0 +1,38 @@
+import asyncio
+from typing import Dict, Any
+from app.core.database import AsyncSessionLocal
+from app.models.schemas import NoteCreate, NoteUpdate
+from app.services.notes_service import NotesService
+from benchmarks.fixtures import create_user, make_segments
+from benchmarks.timing import measure_async
+
+async def _run(quick: bool) -> Dict[str, Dict[str, Any]]:
+    user_id, _ = create_user("notes")
+    repeat = 20 if quick else 100
+    results = {}
+    segments = [{"timestamp": s["start"], "text": s["text"]} for s in make_segments(50)]
+    note_data = NoteCreate(title="Benchmark note", tags=["bench", "music"], segments=segments, source_url="https://example.com/v")
+    async with AsyncSessionLocal() as db:
+        service = NotesService(db)
+        created = []
+
+        async def create():
+            created.append((await service.create_note(note_data, user_id)).id)
+        results["notes.create"] = await measure_async(create, repeat)
+
+        note_ids = iter(created * 2)
+        results["notes.get"] = await measure_async(lambda: service.get_note(next(note_ids), user_id), repeat)
+        results["notes.list_page"] = await measure_async(lambda: service.list_note_summaries(user_id, limit=20), repeat)
+        results["notes.list_by_tag"] = await measure_async(
+            lambda: service.list_note_summaries(user_id, limit=20, tags_any=["music"]), repeat
+        )
+        update = NoteUpdate(title="Renamed note", tags=["bench", "travel"])
+        note_ids = iter(created * 2)
+        results["notes.update"] = await measure_async(lambda: service.update_note(next(note_ids), update, user_id), repeat)
+        note_ids = iter(created)
+        results["notes.delete"] = await measure_async(lambda: service.delete_note(next(note_ids), user_id), repeat - 1)
+    return results
+
+def run(quick: bool) -> Dict[str, Dict[str, Any]]:
+    """NotesService CRUD against the benchmark database"""
+    return asyncio.run(_run(quick))
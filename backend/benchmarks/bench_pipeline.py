@@ -0,0 +1,58 @@
+import os
+import shutil
+import wave
+from itertools import count
+from typing import Dict, Any
+import numpy as np
+from app.core.database import SessionLocal
+from app.models.database import TranscriptionJob
+from app.services.media_cache_service import media_key_for_url
+import app.tasks.transcription_tasks as transcription_tasks
+from benchmarks.fixtures import create_user, video_url
+from benchmarks.timing import measure
+
+SAMPLE_RATE = 16000
+
+def write_tone(path: str, seconds: int, variant: int):
+    """Mono 16-bit audio; the variant changes the content hash, so runs never hit the transcript cache"""
+    frequency = 220 + variant
+    with wave.open(path, "wb") as audio:
+        audio.setnchannels(1)
+        audio.setsampwidth(2)
+        audio.setframerate(SAMPLE_RATE)
+        samples = 8000 * np.sin(2 * np.pi * frequency * np.arange(seconds * SAMPLE_RATE) / SAMPLE_RATE)
+        audio.writeframes(samples.astype("<i2").tobytes())
+
+def run(quick: bool) -> Dict[str, Dict[str, Any]]:
+    """The whole staged workflow with the stub engine and eager Celery; needs ffmpeg"""
+    if not (shutil.which("ffmpeg") and shutil.which("ffprobe")):
+        return {"pipeline": {"skipped": "ffmpeg and ffprobe are required"}}
+
+    user_id, _ = create_user("pipeline")
+    numbers = count(100000)
+    results = {}
+    for seconds in (60,) if quick else (60, 900):
+        def download_video(url: str, workspace: str) -> str:
+            path = os.path.join(workspace, "audio.wav")
+            write_tone(path, seconds, next(numbers) % 500)
+            return path
+
+        def run_workflow():
+            url = video_url(next(numbers))
+            db = SessionLocal()
+            try:
+                job = TranscriptionJob(url=url, media_key=media_key_for_url(url), topics=[], user_id=user_id)
+                db.add(job)
+                db.commit()
+                job_id = job.id
+            finally:
+                db.close()
+            transcription_tasks.start_transcription_workflow(job_id, url, media_key_for_url(url), user_id)
+
+        original = transcription_tasks.download_video
+        transcription_tasks.download_video = download_video
+        try:
+            results[f"pipeline.stub.{seconds}s_audio"] = measure(run_workflow, 2 if quick else 5)
+        finally:
+            transcription_tasks.download_video = original
+    return results
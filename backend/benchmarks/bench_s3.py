@@ -0,0 +1,49 @@
+import io
+from typing import Dict, Any
+from app.services.s3_service import S3Service
+from app.services.transcript_store import TranscriptStore
+from app.services.result_cache import ResultCache
+from benchmarks.fixtures import make_segments
+from benchmarks.timing import measure
+
+def run(quick: bool) -> Dict[str, Dict[str, Any]]:
+    """S3Service and TranscriptStore round-trips against the local S3 stand-in"""
+    results = {}
+    s3_service = S3Service()
+    repeat = 10 if quick else 50
+    for size_kb in (1, 256) if quick else (1, 256, 4096):
+        data = b"x" * (size_kb * 1024)
+        key = f"bench/blob-{size_kb}kb"
+        def round_trip():
+            s3_service.upload_bytes(data, key)
+            return b"".join(s3_service.iter_object(key))
+        results[f"s3.bytes_round_trip.{size_kb}kb"] = measure(round_trip, repeat)
+        results[f"s3.fileobj_round_trip.{size_kb}kb"] = measure(
+            lambda: s3_service.upload_fileobj(io.BytesIO(data), key) and s3_service.download_fileobj(key, io.BytesIO()),
+            repeat
+        )
+
+    document = {"segments": make_segments(1000)}
+    results["s3.json_round_trip.1000seg"] = measure(
+        lambda: s3_service.upload_json(document, "bench/doc.json") and s3_service.download_json("bench/doc.json"),
+        repeat
+    )
+
+    # No result cache in between, so every read goes to S3
+    uncached = ResultCache(max_bytes=0, local_ttl_seconds=0, redis_ttl_seconds=1)
+    uncached.get = lambda s3_key, part, decode=None: None
+    uncached.set = lambda s3_key, part, value: None
+    store = TranscriptStore(s3_service, cache=uncached)
+    for segment_count in (1000,) if quick else (1000, 10000):
+        segments = make_segments(segment_count)
+        key = store.write(segments, f"bench/transcript-{segment_count}")
+        results[f"s3.transcript_write.{segment_count}seg"] = measure(
+            lambda: store.write(segments, f"bench/transcript-{segment_count}"), max(3, repeat // 5)
+        )
+        results[f"s3.transcript_read_all.{segment_count}seg"] = measure(
+            lambda: sum(1 for _ in store.iter_segments(key)), max(3, repeat // 5)
+        )
+        results[f"s3.transcript_read_window.{segment_count}seg"] = measure(
+            lambda: sum(1 for _ in store.iter_segments(key, start_time=600, end_time=900)), repeat
+        )
+    return results
@@ -0,0 +1,29 @@
+from dataclasses import asdict
+from typing import Dict, Any
+from app.core.responses import TrustedJSONResponse
+from app.models.schemas import TranscriptionResult
+from app.models.transcript import ResultPage
+from app.services.transcript_index import filter_segments_by_topics
+from benchmarks.fixtures import make_segments, make_topics
+from benchmarks.timing import measure
+
+def run(quick: bool) -> Dict[str, Dict[str, Any]]:
+    """Result encoding: pydantic TranscriptionResult against records encoded with orjson"""
+    results = {}
+    sizes = (100, 1000) if quick else (100, 1000, 10000)
+    for segment_count in sizes:
+        records = filter_segments_by_topics(make_segments(segment_count), [])
+        filtered = filter_segments_by_topics(make_segments(segment_count), make_topics(5))
+        segments = [asdict(record) for record in records]
+        result = TranscriptionResult(segments=segments)
+        response = TrustedJSONResponse(None)
+        repeat = max(5, 20000 // segment_count)
+        results[f"serialization.validate.{segment_count}seg"] = measure(lambda: TranscriptionResult(segments=segments), repeat)
+        results[f"serialization.dump_json.{segment_count}seg"] = measure(result.model_dump_json, repeat)
+        results[f"serialization.validate_dump.{segment_count}seg.filtered"] = measure(
+            lambda: TranscriptionResult(segments=[asdict(record) for record in filtered]).model_dump_json(), repeat
+        )
+        results[f"serialization.records_orjson.{segment_count}seg"] = measure(
+            lambda: response.render(ResultPage(segments=records)), repeat
+        )
+    return results
@@ -0,0 +1,20 @@
+from typing import Dict, Any
+from app.services.transcript_index import build_token_index, filter_segments_by_topics
+from benchmarks.fixtures import make_segments, make_topics
+from benchmarks.timing import measure
+
+def run(quick: bool) -> Dict[str, Dict[str, Any]]:
+    """filter_segments_by_topics over a full scan and with the token index"""
+    results = {}
+    sizes = (100, 1000) if quick else (100, 1000, 10000)
+    for segment_count in sizes:
+        segments = make_segments(segment_count)
+        index = build_token_index(segments)
+        repeat = max(5, 20000 // segment_count)
+        for topic_count in (1, 5, 20):
+            topics = make_topics(topic_count)
+            name = f"topics.filter.{segment_count}seg.{topic_count}topics"
+            results[f"{name}.scan"] = measure(lambda: filter_segments_by_topics(segments, topics), repeat)
+            results[f"{name}.indexed"] = measure(lambda: filter_segments_by_topics(segments, topics, index), repeat)
+        results[f"topics.build_index.{segment_count}seg"] = measure(lambda: build_token_index(segments), max(3, repeat // 4))
+    return results
@@ -0,0 +1,64 @@
+"""Offline stand-ins for the services the app talks to.
+
+Import this module before anything else from `app`: it points the settings
+at a scratch SQLite database (or BENCH_DATABASE_URL, e.g. a local Postgres),
+the stub transcription engine and the hashing embedder, swaps the Redis
+clients for an in-process fakeredis server, mocks S3 with moto and runs
+Celery tasks eagerly with an in-memory result backend. Nothing leaves the
+machine.
+"""
+import os
+import tempfile
+
+WORKDIR = tempfile.mkdtemp(prefix="transcription-bench-")
+
+os.environ.update({
+    "DATABASE_URL": os.environ.get("BENCH_DATABASE_URL", f"sqlite:///{WORKDIR}/bench.db"),
+    "TRANSCRIPTION_ENGINE": "stub",
+    "EMBEDDING_ENGINE": "hashing",
+    "WORKSPACE_DIR": WORKDIR,
+    "S3_ACCESS_KEY": "bench",
+    "S3_SECRET_KEY": "bench",
+    "S3_BUCKET": "transcriptions-bench",
+    "S3_REGION": "us-east-1",
+    "USER_JOBS_PER_HOUR": "1000000000",
+    "USER_MAX_BACKLOG_JOBS": "1000000000",
+    "SECRET_KEY": "bench-secret",
+})
+os.environ.pop("ASYNC_DATABASE_URL", None)
+
+import fakeredis
+import fakeredis.aioredis
+import app.core.redis_client as redis_module
+
+_redis_server = fakeredis.FakeServer()
+redis_module.redis_client = fakeredis.FakeRedis(server=_redis_server, decode_responses=True)
+redis_module.async_redis_client = fakeredis.aioredis.FakeRedis(server=_redis_server, decode_responses=True)
+
+from moto import mock_aws
+from app.core.config import settings
+from app.core.s3_client import get_s3_client, reset_s3_client
+
+settings.s3_endpoint = None
+_s3_mock = mock_aws()
+_s3_mock.start()
+reset_s3_client()
+get_s3_client().create_bucket(Bucket=settings.s3_bucket)
+
+from app.core.celery_app import celery_app
+
+# Chords save their group result even when eager, so the backend must not be Redis
+celery_app.conf.update(task_always_eager=True, task_eager_propagates=True, result_backend="cache+memory://")
+
+from app.core.database import engine
+from app.models.database import Base
+
+Base.metadata.create_all(bind=engine)
+
+def describe() -> dict:
+    """Where the benchmark ran, recorded alongside its results"""
+    return {
+        "database": engine.url.get_backend_name(),
+        "transcription_engine": settings.transcription_engine,
+        "embedding_engine": settings.embedding_engine,
+    }
@@ -0,0 +1,83 @@
+import random
+from datetime import timedelta
+from typing import List, Dict, Any, Tuple
+from app.core.database import SessionLocal
+from app.models.database import User, TranscriptionJob, generate_uuid
+from app.services.auth_service import create_access_token
+from app.services.media_cache_service import MediaCacheService, media_key_for_url
+from app.services.transcript_index import build_token_index
+
+# Mixed Russian and English vocabulary, so both stemmers are exercised
+WORDS = (
+    "machine learning model training data network neural python database query index "
+    "cooking recipe kitchen travel mountain history economy market music guitar "
+    "машинное обучение модель данные нейронная сеть база запрос индекс рецепт кухня "
+    "путешествие горы история экономика рынок музыка гитара программирование"
+).split()
+
+TOPIC_POOL = [
+    "machine learning", "neural network", "database index", "cooking", "travel", "history",
+    "economy", "music", "python", "машинное обучение", "нейронная сеть", "база данных",
+    "рецепт", "путешествие", "история", "экономика", "музыка", "гитара", "рынок", "программирование",
+]
+
+def make_segments(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """A deterministic transcript of `count` five-second segments"""
+    rng = random.Random(seed)
+    return [
+        {
+            "start": 5.0 * i,
+            "end": 5.0 * (i + 1),
+            "text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))),
+        }
+        for i in range(count)
+    ]
+
+def make_topics(count: int) -> List[str]:
+    return TOPIC_POOL[:count]
+
+def video_url(number: int) -> str:
+    return f"https://www.youtube.com/watch?v=bench{number:06d}"
+
+def create_user(name: str = "bench") -> Tuple[str, str]:
+    """A user row and a bearer token for it, skipping the deliberately slow password hash"""
+    db = SessionLocal()
+    try:
+        user = User(email=f"{name}-{generate_uuid()}@example.com", username=f"{name}-{generate_uuid()}", hashed_password="")
+        db.add(user)
+        db.commit()
+        token = create_access_token({"sub": user.username}, expires_delta=timedelta(hours=12))
+        return user.id, token
+    finally:
+        db.close()
+
+def cache_transcripts(urls: List[str], segment_count: int) -> Dict[str, str]:
+    """Store a transcript for each URL's media, as a finished workflow would; returns URL -> S3 key"""
+    cache_service = MediaCacheService()
+    keys = {}
+    for seed, url in enumerate(urls):
+        segments = make_segments(segment_count, seed)
+        keys[url] = cache_service.store_transcript(segments, [media_key_for_url(url)], build_token_index(segments))
+    return keys
+
+def create_completed_jobs(user_id: str, transcript_keys: Dict[str, str], topics: List[str]) -> List[str]:
+    """Completed jobs pointing at stored transcripts, returning their IDs"""
+    db = SessionLocal()
+    try:
+        jobs = [
+            TranscriptionJob(
+                url=url,
+                media_key=media_key_for_url(url),
+                topics=topics,
+                user_id=user_id,
+                status="completed",
+                progress=100,
+                result_s3_key=key
+            )
+            for url, key in transcript_keys.items()
+        ]
+        db.add_all(jobs)
+        db.commit()
+        return [job.id for job in jobs]
+    finally:
+        db.close()
@@ -0,0 +1,108 @@
+"""Offline benchmarks for the API and the transcription pipeline.
+
+Run from backend/ with the packages in benchmarks/requirements.txt:
+
+    python -m benchmarks.run                                   # every suite
+    python -m benchmarks.run --quick --only topics serialization
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+
+Results are written as JSON. With --baseline, medians slower (and load
+throughput lower) than the baseline by more than the tolerance are
+reported and the exit status is 1, so a CI step can block the deploy.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Any, List
+
+from benchmarks import environment
+from benchmarks import bench_topics, bench_serialization, bench_s3, bench_notes, bench_api, bench_pipeline
+
+SUITES = {
+    "topics": bench_topics.run,
+    "serialization": bench_serialization.run,
+    "s3": bench_s3.run,
+    "notes": bench_notes.run,
+    "api": bench_api.run,
+    "pipeline": bench_pipeline.run,
+}
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float, min_delta_ms: float) -> List[str]:
+    """Descriptions of the results that regressed against the baseline"""
+    regressions = []
+    for name, result in sorted(results.items()):
+        base = baseline.get(name)
+        if not base or "median_ms" not in result or "median_ms" not in base:
+            continue
+        slower = result["median_ms"] - base["median_ms"]
+        if result["median_ms"] > base["median_ms"] * (1 + tolerance) and slower > min_delta_ms:
+            regressions.append(f"{name}: median {base['median_ms']:.3f} -> {result['median_ms']:.3f} ms")
+        if "throughput_rps" in base and result["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {base['throughput_rps']:.1f} -> {result['throughput_rps']:.1f} req/s")
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=sorted(SUITES), help="Suites to run (all by default)")
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes and fewer repetitions")
+    parser.add_argument("--output", default=os.path.join("benchmarks", "results.json"), help="Where to write the results")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Also write the results as a new baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="Baseline to check the results against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown (default 0.25)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="Ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    results = {}
+    for suite in args.only or SUITES:
+        print(f"Running {suite}...", file=sys.stderr)
+        results.update(SUITES[suite](args.quick))
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "quick": args.quick,
+            **environment.describe(),
+        },
+        "results": results,
+    }
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    for name, result in sorted(results.items()):
+        if "median_ms" in result:
+            throughput = f"  {result['throughput_rps']:8.1f} req/s" if "throughput_rps" in result else ""
+            print(f"{name:60} {result['median_ms']:10.3f} ms  p95 {result['p95_ms']:10.3f} ms{throughput}")
+        else:
+            print(f"{name:60} {result}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["meta"].get("quick") != args.quick:
+            print("Warning: baseline and run use different --quick settings", file=sys.stderr)
+        regressions = compare(results, baseline["results"], args.tolerance, args.min_delta_ms)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
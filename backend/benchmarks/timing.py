@@ -0,0 +1,68 @@
+import asyncio
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+def summarize(seconds: List[float], **extra: Any) -> Dict[str, Any]:
+    """Latency percentiles in milliseconds for a list of timings in seconds"""
+    ordered = sorted(seconds)
+    def percentile(p: float) -> float:
+        return 1000 * ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+    return {
+        "runs": len(ordered),
+        "median_ms": 1000 * statistics.median(ordered),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "min_ms": 1000 * ordered[0],
+        "mean_ms": 1000 * statistics.fmean(ordered),
+        **extra,
+    }
+
+def measure(func: Callable[[], Any], repeat: int, warmup: int = 1) -> Dict[str, Any]:
+    """Time repeated calls of a function"""
+    for _ in range(warmup):
+        func()
+    seconds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - started)
+    return summarize(seconds)
+
+async def measure_async(func: Callable[[], Awaitable[Any]], repeat: int, warmup: int = 1) -> Dict[str, Any]:
+    """Time repeated awaits of a coroutine function"""
+    for _ in range(warmup):
+        await func()
+    seconds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func()
+        seconds.append(time.perf_counter() - started)
+    return summarize(seconds)
+
+async def measure_load(
+    request: Callable[[int], Awaitable[bool]],
+    total: int,
+    concurrency: int
+) -> Dict[str, Any]:
+    """Latency and throughput of `total` requests issued by `concurrency` clients.
+
+    The request function gets a sequence number and returns whether the
+    response was successful.
+    """
+    seconds = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def client():
+        nonlocal errors
+        for number in counter:
+            started = time.perf_counter()
+            ok = await request(number)
+            seconds.append(time.perf_counter() - started)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return summarize(seconds, concurrency=concurrency, errors=errors, throughput_rps=total / elapsed)
@@ -0,0 +1,98 @@
+import json
+from collections import OrderedDict
+import fakeredis
+import fakeredis.aioredis
+import httpx
+import pytest
+import pytest_asyncio
+from botocore.exceptions import ClientError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.main import app
+from app.models.database import Base
+from app.models.schemas import Principal
+from app.services import result_cache, semantic_matcher, transcription_service
+from app.services.auth_service import get_current_user
+
+@pytest.fixture
+def redis_server():
+    return fakeredis.FakeServer()
+
+@pytest.fixture
+def redis(redis_server):
+    """An empty in-process Redis with Lua scripting"""
+    return fakeredis.FakeRedis(server=redis_server, decode_responses=True)
+
+@pytest.fixture
+def async_redis(redis_server):
+    """Asyncio client for the same in-process Redis"""
+    return fakeredis.aioredis.FakeRedis(server=redis_server, decode_responses=True)
+
+@pytest_asyncio.fixture
+async def db():
+    """Session on an empty in-memory SQLite database with the app's schema"""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+    await engine.dispose()
+
+@pytest.fixture
+def cache_redis(redis, monkeypatch):
+    """Point the result cache's Redis tier at the in-process Redis"""
+    monkeypatch.setattr(result_cache, "redis_client", redis)
+    return redis
+
+class FakeS3Service:
+    """In-memory stand-in for S3Service that records range GETs"""
+
+    def __init__(self):
+        self.objects = {}
+        self.ranges = []
+
+    def upload_bytes(self, data, key, content_type="application/octet-stream"):
+        self.objects[key] = data
+        return True
+
+    def upload_json(self, data, key):
+        self.objects[key] = json.dumps(data).encode()
+        return True
+
+    def download_json(self, key):
+        return json.loads(self.objects[key]) if key in self.objects else {}
+
+    def download_range(self, key, start, end):
+        self.ranges.append((start, end))
+        return self.objects[key][start:end + 1]
+
+    def iter_object(self, key, chunk_size=1024 * 1024):
+        if key not in self.objects:
+            raise ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+        yield self.objects[key]
+
+@pytest.fixture
+def s3():
+    return FakeS3Service()
+
+@pytest.fixture
+def embedder(redis, monkeypatch):
+    """The offline hashing embedder, with no embeddings cached from other tests"""
+    monkeypatch.setattr(settings, "embedding_engine", "hashing")
+    monkeypatch.setattr(semantic_matcher, "_embedder", None)
+    monkeypatch.setattr(semantic_matcher, "redis_client", redis)
+    monkeypatch.setattr(semantic_matcher.SegmentEmbeddings, "_memory", OrderedDict())
+    semantic_matcher.encode_topics.cache_clear()
+    yield semantic_matcher.get_embedder()
+    semantic_matcher.encode_topics.cache_clear()
+
+@pytest_asyncio.fixture
+async def api(db, s3, cache_redis, monkeypatch):
+    """HTTP client for the app, signed in as u1, on the test database and S3"""
+    monkeypatch.setattr(transcription_service, "S3Service", lambda: s3)
+    app.dependency_overrides[get_async_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: Principal(id="u1", email="u1@example.com", is_active=True)
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
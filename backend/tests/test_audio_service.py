@@ -0,0 +1,77 @@
+import pytest
+from app.core.config import settings
+from app.services.audio_service import AudioService, merge_chunk_segments
+
+@pytest.fixture
+def audio_service(monkeypatch):
+    monkeypatch.setattr(settings, "transcription_chunk_seconds", 600)
+    monkeypatch.setattr(settings, "transcription_chunk_overlap_seconds", 10)
+    monkeypatch.setattr(settings, "transcription_silence_search_seconds", 30)
+    return AudioService()
+
+def cuts(chunks):
+    return [(chunk["cut_start"], chunk["cut_end"]) for chunk in chunks]
+
+def test_plan_chunks_cuts_fixed_windows_without_silence(audio_service):
+    chunks = audio_service.plan_chunks(1500.0, [])
+    assert cuts(chunks) == [(0.0, 600), (600, 1200), (1200, 1500.0)]
+    assert [chunk["index"] for chunk in chunks] == [0, 1, 2]
+
+def test_plan_chunks_pads_each_chunk_by_half_the_overlap(audio_service):
+    chunks = audio_service.plan_chunks(1500.0, [])
+    assert [(chunk["start"], chunk["end"]) for chunk in chunks] == [(0.0, 605), (595, 1205), (1195, 1500.0)]
+
+def test_plan_chunks_prefers_the_nearest_silence(audio_service):
+    chunks = audio_service.plan_chunks(1500.0, [560.0, 590.0, 615.0, 1185.0])
+    # 590 is nearest to 600; the next window is measured from that cut
+    assert cuts(chunks) == [(0.0, 590.0), (590.0, 1185.0), (1185.0, 1500.0)]
+
+def test_plan_chunks_ignores_silence_outside_the_search_window(audio_service):
+    chunks = audio_service.plan_chunks(1500.0, [550.0, 660.0])
+    assert cuts(chunks)[0] == (0.0, 600)
+
+def test_plan_chunks_does_not_leave_a_sliver_after_the_last_cut(audio_service):
+    assert cuts(audio_service.plan_chunks(1205.0, [])) == [(0.0, 600), (600, 1205.0)]
+
+def chunk(index, cut_start, cut_end, pad=5.0):
+    return {"index": index, "cut_start": cut_start, "cut_end": cut_end, "start": max(0.0, cut_start - pad), "end": cut_end + pad}
+
+def test_merge_shifts_segments_to_global_time():
+    chunks = [chunk(0, 0.0, 600.0), chunk(1, 600.0, 900.0)]
+    merged = merge_chunk_segments(chunks, [
+        [{"start": 0.0, "end": 4.0, "text": "first"}],
+        [{"start": 10.0, "end": 14.5, "text": "second"}],
+    ])
+    assert merged == [
+        {"start": 0.0, "end": 4.0, "text": "first"},
+        {"start": 605.0, "end": 609.5, "text": "second"},
+    ]
+
+def test_merge_keeps_each_segment_only_in_the_chunk_owning_its_start():
+    chunks = [chunk(0, 0.0, 600.0), chunk(1, 600.0, 1200.0), chunk(2, 1200.0, 1500.0)]
+    merged = merge_chunk_segments(chunks, [
+        [{"start": 595.0, "end": 599.0, "text": "before the cut"}, {"start": 601.0, "end": 604.0, "text": "overlap copy a"}],
+        [{"start": 0.0, "end": 4.0, "text": "overlap copy b"}, {"start": 6.0, "end": 9.0, "text": "after the cut"},
+         {"start": 606.0, "end": 607.0, "text": "overlap copy c"}],
+        # The last chunk keeps segments running up to the end of the audio
+        [{"start": 5.0, "end": 8.0, "text": "last"}, {"start": 305.0, "end": 306.0, "text": "tail"}],
+    ])
+    assert [(segment["start"], segment["text"]) for segment in merged] == [
+        (595.0, "before the cut"), (601.0, "after the cut"), (1200.0, "last"), (1500.0, "tail"),
+    ]
+
+def test_merge_drops_a_segment_repeating_the_text_before_a_cut():
+    chunks = [chunk(0, 0.0, 600.0), chunk(1, 600.0, 900.0)]
+    merged = merge_chunk_segments(chunks, [
+        [{"start": 590.0, "end": 599.0, "text": "and that is how it works."}],
+        [{"start": 5.5, "end": 7.0, "text": "How it works"}, {"start": 7.0, "end": 9.0, "text": "Next topic"}],
+    ])
+    assert [segment["text"] for segment in merged] == ["and that is how it works.", "Next topic"]
+
+def test_merge_only_dedupes_the_first_segment_of_a_chunk():
+    chunks = [chunk(0, 0.0, 600.0), chunk(1, 600.0, 900.0)]
+    merged = merge_chunk_segments(chunks, [
+        [{"start": 590.0, "end": 599.0, "text": "yes"}],
+        [{"start": 6.0, "end": 7.0, "text": "no"}, {"start": 7.0, "end": 8.0, "text": "yes"}],
+    ])
+    assert [segment["text"] for segment in merged] == ["yes", "no", "yes"]
@@ -0,0 +1,106 @@
+from datetime import timedelta
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from app.models.database import User
+from app.models.schemas import Principal
+from app.services import auth_cache, auth_service
+from app.services.auth_cache import REDIS_PREFIX, REDIS_USER_PREFIX, PrincipalCache, token_digest
+
+NOW = 1_700_000_000.0
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=NOW)
+    monkeypatch.setattr(auth_cache, "time", SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+@pytest.fixture
+def auth_redis(async_redis, monkeypatch):
+    monkeypatch.setattr(auth_cache, "async_redis_client", async_redis)
+    return async_redis
+
+def principal(user_id="u1"):
+    return Principal(id=user_id, email=f"{user_id}@example.com", username=user_id, is_active=True)
+
+def new_cache(redis_ttl_seconds=300, max_entries=100):
+    return PrincipalCache(max_entries=max_entries, local_ttl_seconds=30, redis_ttl_seconds=redis_ttl_seconds)
+
+@pytest.mark.asyncio
+async def test_hits_come_from_the_local_tier_first(clock, auth_redis):
+    cache = new_cache()
+    await cache.set("token-1", principal(), NOW + 3600)
+    await auth_redis.flushall()
+    assert await cache.get("token-1") == principal()
+    assert await cache.get("token-2") is None
+
+@pytest.mark.asyncio
+async def test_other_processes_hit_the_redis_tier(clock, auth_redis):
+    await new_cache().set("token-1", principal(), NOW + 3600)
+    assert await auth_redis.ttl(REDIS_PREFIX + token_digest("token-1")) == 300
+    assert await auth_redis.smembers(REDIS_USER_PREFIX + "u1") == {token_digest("token-1")}
+    assert await new_cache().get("token-1") == principal()
+
+@pytest.mark.asyncio
+async def test_local_entries_expire_after_their_ttl(clock, auth_redis):
+    cache = new_cache(redis_ttl_seconds=0)
+    await cache.set("token-1", principal(), NOW + 3600)
+    clock.now += 29
+    assert await cache.get("token-1") == principal()
+    clock.now += 2
+    assert await cache.get("token-1") is None
+    assert await auth_redis.keys() == []
+
+@pytest.mark.asyncio
+async def test_entries_never_outlive_the_token(clock, auth_redis):
+    cache = new_cache()
+    await cache.set("token-1", principal(), NOW + 10)
+    assert await auth_redis.ttl(REDIS_PREFIX + token_digest("token-1")) == 10
+    clock.now += 11
+    # Redis keeps real time, so its entry is expired by hand
+    await auth_redis.delete(REDIS_PREFIX + token_digest("token-1"))
+    assert await cache.get("token-1") is None
+    # An already expired token is not written to Redis at all
+    await cache.set("token-2", principal(), NOW)
+    assert await auth_redis.exists(REDIS_PREFIX + token_digest("token-2")) == 0
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entries_are_evicted(clock, auth_redis):
+    cache = new_cache(redis_ttl_seconds=0, max_entries=2)
+    for token in ("a", "b"):
+        await cache.set(token, principal(token), NOW + 3600)
+    await cache.get("a")
+    await cache.set("c", principal("c"), NOW + 3600)
+    assert [await cache.get(token) is not None for token in ("a", "b", "c")] == [True, False, True]
+
+@pytest.mark.asyncio
+async def test_invalidate_user_drops_only_that_users_tokens(clock, auth_redis):
+    cache = new_cache()
+    await cache.set("token-1", principal("u1"), NOW + 3600)
+    await cache.set("token-2", principal("u1"), NOW + 3600)
+    await cache.set("token-3", principal("u2"), NOW + 3600)
+    other_process = new_cache()
+    await other_process.get("token-1")
+
+    await cache.invalidate_user("u1")
+    assert await cache.get("token-1") is None
+    assert await cache.get("token-2") is None
+    assert await cache.get("token-3") == principal("u2")
+    assert await auth_redis.exists(REDIS_USER_PREFIX + "u1") == 0
+    # Other processes stop serving the token once their local entry expires
+    clock.now += 31
+    assert await other_process.get("token-1") is None
+
+@pytest.mark.asyncio
+async def test_get_current_user_caches_the_verified_principal(db, auth_redis, monkeypatch):
+    cache = new_cache()
+    monkeypatch.setattr(auth_service, "principal_cache", cache)
+    db.add(User(id="u1", email="u1@example.com", username="u1", is_active=True))
+    await db.commit()
+    token = auth_service.create_access_token({"sub": "u1"}, timedelta(minutes=5))
+
+    assert await auth_service.get_current_user(token, db) == principal()
+    # A hit needs neither the JWT check nor the database
+    assert await auth_service.get_current_user(token, None) == principal()
+    with pytest.raises(HTTPException):
+        await auth_service.get_current_user("not-a-jwt", db)
@@ -0,0 +1,51 @@
+import json
+import pytest
+from app.core.config import settings
+from app.services.idempotency_service import IdempotencyConflict, IdempotencyService, request_fingerprint
+
+FINGERPRINT = request_fingerprint("https://youtu.be/dQw4w9WgXcQ", ["music"])
+
+@pytest.fixture
+def service(async_redis):
+    return IdempotencyService(async_redis)
+
+def test_fingerprint_depends_on_url_and_topics():
+    assert FINGERPRINT == request_fingerprint("https://youtu.be/dQw4w9WgXcQ", ["music"])
+    assert FINGERPRINT != request_fingerprint("https://youtu.be/dQw4w9WgXcQ", ["lyrics"])
+    assert FINGERPRINT != request_fingerprint("https://youtu.be/other", ["music"])
+
+@pytest.mark.asyncio
+async def test_first_claim_wins_and_expires(service, async_redis):
+    assert await service.claim("u1", "key-1", FINGERPRINT, "job-1") is None
+    key = service._key("u1", "key-1")
+    assert json.loads(await async_redis.get(key)) == {"job_id": "job-1", "fingerprint": FINGERPRINT}
+    assert 0 < await async_redis.ttl(key) <= settings.idempotency_key_ttl_seconds
+
+@pytest.mark.asyncio
+async def test_duplicate_gets_the_original_job(service):
+    await service.claim("u1", "key-1", FINGERPRINT, "job-1")
+    assert await service.claim("u1", "key-1", FINGERPRINT, "job-2") == "job-1"
+
+@pytest.mark.asyncio
+async def test_reuse_for_a_different_request_conflicts(service):
+    await service.claim("u1", "key-1", FINGERPRINT, "job-1")
+    with pytest.raises(IdempotencyConflict):
+        await service.claim("u1", "key-1", request_fingerprint("https://youtu.be/other", []), "job-2")
+
+@pytest.mark.asyncio
+async def test_keys_are_scoped_per_user(service):
+    await service.claim("u1", "key-1", FINGERPRINT, "job-1")
+    assert await service.claim("u2", "key-1", FINGERPRINT, "job-2") is None
+
+@pytest.mark.asyncio
+async def test_release_lets_a_retry_claim_again(service):
+    await service.claim("u1", "key-1", FINGERPRINT, "job-1")
+    await service.release("u1", "key-1", "job-1")
+    assert await service.claim("u1", "key-1", FINGERPRINT, "job-2") is None
+
+@pytest.mark.asyncio
+async def test_release_only_drops_the_callers_claim(service):
+    await service.claim("u1", "key-1", FINGERPRINT, "job-1")
+    await service.release("u1", "key-1", "job-2")
+    await service.release("u1", "missing", "job-1")
+    assert await service.claim("u1", "key-1", FINGERPRINT, "job-3") == "job-1"
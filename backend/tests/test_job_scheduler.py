@@ -0,0 +1,66 @@
+import pytest
+from app.core.config import settings
+from app.services.job_scheduler import JobScheduler, QuotaExceeded, BACKLOG_PREFIX
+
+def job(number: int) -> dict:
+    return {"job_id": f"job-{number}", "url": f"https://example.com/{number}", "media_key": f"url:{number}"}
+
+def job_ids(jobs) -> list:
+    return [entry["job_id"] for entry in jobs]
+
+@pytest.fixture
+def scheduler(redis, async_redis, monkeypatch):
+    monkeypatch.setattr(settings, "user_max_running_jobs", 2)
+    monkeypatch.setattr(settings, "user_max_backlog_jobs", 3)
+    monkeypatch.setattr(settings, "user_jobs_per_hour", 5)
+    return JobScheduler(redis, async_redis)
+
+def test_jobs_start_until_the_slots_are_taken(scheduler):
+    assert job_ids(scheduler.submit("alice", job(1))[0]) == ["job-1"]
+    assert job_ids(scheduler.submit("alice", job(2))[0]) == ["job-2"]
+    assert scheduler.submit("alice", job(3)) == ([], [])
+
+def test_finishing_starts_the_backlog_in_arrival_order(scheduler):
+    for number in range(1, 5):
+        scheduler.submit("alice", job(number))
+    started, expired = scheduler.finish("alice", "job-1")
+    assert job_ids(started) == ["job-3"] and expired == []
+    assert job_ids(scheduler.finish("alice", "job-3")[0]) == ["job-4"]
+    assert scheduler.finish("alice", "job-4") == ([], [])
+
+def test_users_do_not_share_slots(scheduler):
+    for number in range(1, 4):
+        scheduler.submit("alice", job(number))
+    assert job_ids(scheduler.submit("bob", job(10))[0]) == ["job-10"]
+
+def test_expired_slots_are_freed(scheduler, monkeypatch):
+    # Workflows that died without reporting back hold their slots only until the slot TTL
+    monkeypatch.setattr(settings, "transcription_slot_ttl_seconds", -1)
+    scheduler.submit("alice", job(1))
+    scheduler.submit("alice", job(2))
+    monkeypatch.setattr(settings, "transcription_slot_ttl_seconds", 3600)
+    assert job_ids(scheduler.submit("alice", job(3))[0]) == ["job-3"]
+
+def test_jobs_queued_too_long_are_returned_as_expired(scheduler, monkeypatch):
+    for number in range(1, 5):
+        scheduler.submit("alice", job(number))
+    monkeypatch.setattr(settings, "transcription_backlog_ttl_seconds", -1)
+    started, expired = scheduler.finish("alice", "job-1")
+    assert started == []
+    assert job_ids(expired) == ["job-3", "job-4"]
+    assert scheduler.redis.llen(BACKLOG_PREFIX + "alice") == 0
+
+@pytest.mark.asyncio
+async def test_admit_enforces_the_hourly_rate(scheduler):
+    for _ in range(5):
+        await scheduler.admit("alice")
+    with pytest.raises(QuotaExceeded):
+        await scheduler.admit("alice")
+    await scheduler.admit("bob")
+
+@pytest.mark.asyncio
+async def test_admit_enforces_the_backlog_cap(scheduler):
+    for number in range(1, 6):
+        scheduler.submit("alice", job(number))
+    with pytest.raises(QuotaExceeded):
+        await scheduler.admit("alice")
@@ -0,0 +1,27 @@
+from app.services.media_cache_service import MediaCacheService, media_key_for_url
+
+def test_url_spellings_of_one_video_share_a_media_key():
+    key = media_key_for_url("https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+    assert key == "youtube:dQw4w9WgXcQ"
+    assert media_key_for_url("https://youtu.be/dQw4w9WgXcQ") == key
+
+def test_unknown_urls_fall_back_to_a_normalised_hash():
+    key = media_key_for_url("HTTPS://Example.com/talk.mp3#t=10")
+    assert key.startswith("url:")
+    assert media_key_for_url("https://example.com/talk.mp3") == key
+
+def test_first_job_claims_the_media_and_later_ones_attach(redis):
+    cache_service = MediaCacheService(s3_service=object(), redis=redis)
+    assert cache_service.claim_or_attach("youtube:a", "job-1")
+    assert not cache_service.claim_or_attach("youtube:a", "job-2")
+    assert not cache_service.claim_or_attach("youtube:a", "job-3")
+    assert sorted(cache_service.release_inflight("youtube:a", "job-1")) == ["job-2", "job-3"]
+    # Released: the next job claims it for a workflow of its own
+    assert cache_service.claim_or_attach("youtube:a", "job-4")
+
+def test_release_by_a_job_not_holding_the_claim_keeps_it(redis):
+    cache_service = MediaCacheService(s3_service=object(), redis=redis)
+    cache_service.claim_or_attach("youtube:a", "job-1")
+    cache_service.claim_or_attach("youtube:a", "job-2")
+    assert cache_service.release_inflight("youtube:a", "job-9") == []
+    assert cache_service.release_inflight("youtube:a", "job-1") == ["job-2"]
@@ -0,0 +1,70 @@
+from pathlib import Path
+import pytest
+import sqlalchemy as sa
+from alembic import command
+from alembic.config import Config
+from app.core.config import settings
+from app.tasks import transcription_tasks
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "database_url", f"sqlite:///{tmp_path}/migrations.db")
+    engine = sa.create_engine(settings.database_url)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def migrate():
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    return lambda revision: command.upgrade(config, revision)
+
+@pytest.fixture
+def queued(monkeypatch):
+    queued = []
+    monkeypatch.setattr(transcription_tasks.index_transcript_task, "delay", queued.append)
+    return queued
+
+def execute(engine, sql, **params):
+    with engine.begin() as conn:
+        conn.execute(sa.text(sql), params)
+
+def query(engine, sql):
+    with engine.connect() as conn:
+        return conn.execute(sa.text(sql)).all()
+
+def add_note(engine, note_id, title, tags, segments, user_id="u1"):
+    execute(
+        engine,
+        "insert into notes (id, title, tags, source_url, segments, user_id) values (:id, :title, :tags, 'x', :segments, :user_id)",
+        id=note_id, title=title, tags=tags, segments=segments, user_id=user_id
+    )
+
+def test_search_index_is_backfilled(engine, migrate, queued):
+    migrate("0002")
+    execute(engine, "insert into users (id, email) values ('u1', 'one@example.com')")
+    add_note(engine, "n1", "Cats", '["pets"]', '[{"timestamp": 3, "text": "the cat purrs"}, {"timestamp": 4, "text": ""}]')
+    execute(engine, "insert into transcription_jobs (id, url, status, user_id) values ('j1', 'u', 'completed', 'u1'), ('j2', 'u', 'failed', 'u1')")
+    migrate("0003")
+    assert sorted(query(engine, "select source_type, source_id, position, timestamp, text from search_segments"), key=str) == [
+        ("note", "n1", 0, 3.0, "the cat purrs"),
+        ("note", "n1", None, None, "Cats pets"),
+    ]
+    assert sorted(query(engine, "select term, user_id, count from search_terms")) == [
+        ("cat", "u1", 1), ("cat", "u1", 1), ("pet", "u1", 1), ("purr", "u1", 1), ("the", "u1", 1),
+    ]
+    # Transcripts live in S3, so completed ones are queued for the indexing task
+    assert queued == ["j1"]
+
+def test_note_tags_are_backfilled(engine, migrate, queued):
+    migrate("0004")
+    execute(engine, "insert into users (id, email) values ('u1', 'one@example.com'), ('u2', 'two@example.com')")
+    add_note(engine, "n1", "One", '["work", "urgent", "work"]', "[]")
+    add_note(engine, "n2", "Two", None, "[]")
+    add_note(engine, "n3", "Three", '["work"]', "[]", user_id="u2")
+    migrate("0005")
+    assert sorted(query(engine, "select note_id, tag, user_id from note_tags")) == [
+        ("n1", "urgent", "u1"), ("n1", "work", "u1"), ("n3", "work", "u2"),
+    ]
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.models.database import Note, NoteTag
+from app.services.notes_service import NotesService, decode_note_cursor, encode_note_cursor
+
+CREATED = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+async def add_notes(db, user_id, specs):
+    """Add notes from (id, minutes after CREATED, tags) tuples"""
+    for note_id, minutes, tags in specs:
+        db.add(Note(
+            id=note_id, title=note_id, tags=tags, source_url="https://example.com/v",
+            segments=[{"timestamp": 0, "text": f"{note_id} text"}], user_id=user_id,
+            created_at=CREATED + timedelta(minutes=minutes)
+        ))
+        db.add_all(NoteTag(note_id=note_id, tag=tag, user_id=user_id) for tag in tags)
+    await db.commit()
+
+async def list_all(db, user_id, limit, **filters):
+    service = NotesService(db)
+    pages = []
+    cursor = None
+    while True:
+        page = await service.list_note_summaries(user_id, limit=limit, cursor=cursor, **filters)
+        pages.append([note.id for note in page.notes])
+        cursor = page.next_cursor
+        if cursor is None:
+            return pages
+
+def test_note_cursor_round_trip():
+    cursor = encode_note_cursor(CREATED, "note-1|with-bar")
+    assert "=" not in cursor
+    assert decode_note_cursor(cursor) == (CREATED, "note-1|with-bar")
+
+@pytest.mark.parametrize("cursor", ["!!!", "bm8tc2VwYXJhdG9y", "bm90LWEtZGF0ZXx4"])
+def test_invalid_note_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_note_cursor(cursor)
+
+@pytest.mark.asyncio
+async def test_pages_are_newest_first_and_complete(db):
+    await add_notes(db, "u1", [(f"n{i}", i, []) for i in range(5)])
+    assert await list_all(db, "u1", 2) == [["n4", "n3"], ["n2", "n1"], ["n0"]]
+
+@pytest.mark.asyncio
+async def test_equal_timestamps_are_ordered_by_id(db):
+    await add_notes(db, "u1", [("a", 0, []), ("b", 0, []), ("c", 0, []), ("d", 1, [])])
+    assert await list_all(db, "u1", 2) == [["d", "c"], ["b", "a"]]
+
+@pytest.mark.asyncio
+async def test_pages_are_scoped_to_the_user(db):
+    await add_notes(db, "u1", [("mine", 0, [])])
+    await add_notes(db, "u2", [("theirs", 1, [])])
+    assert await list_all(db, "u1", 10) == [["mine"]]
+
+@pytest.mark.asyncio
+async def test_summaries_carry_count_and_preview(db):
+    await add_notes(db, "u1", [("n0", 0, ["work"])])
+    page = await NotesService(db).list_note_summaries("u1")
+    assert (page.notes[0].segment_count, page.notes[0].preview, page.notes[0].tags) == (1, "n0 text", ["work"])
+
+@pytest.mark.asyncio
+async def test_tag_filters_page_with_the_cursor(db):
+    await add_notes(db, "u1", [
+        ("n0", 0, ["work", "urgent"]), ("n1", 1, ["work"]), ("n2", 2, ["home"]),
+        ("n3", 3, ["work", "urgent"]), ("n4", 4, ["urgent"]),
+    ])
+    assert await list_all(db, "u1", 2, tags_any=["work", "home"]) == [["n3", "n2"], ["n1", "n0"]]
+    assert await list_all(db, "u1", 1, tags_all=["work", "urgent"]) == [["n3"], ["n0"]]
+
+@pytest.mark.asyncio
+async def test_duplicate_tags_all_still_match(db):
+    # Repeats are dropped before the HAVING count, which would otherwise never match
+    await add_notes(db, "u1", [("n0", 0, ["work", "urgent"]), ("n1", 1, ["work"])])
+    assert await list_all(db, "u1", 10, tags_all=["work", "work"]) == [["n1", "n0"]]
+    assert await list_all(db, "u1", 10, tags_all=["urgent", "work", "urgent"]) == [["n0"]]
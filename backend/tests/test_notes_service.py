@@ -0,0 +1,106 @@
+import pytest
+from sqlalchemy import select
+from app.models.database import Note, NoteTag, SearchSegment, SearchTerm, User
+from app.models.schemas import NoteCreate, NotesBulkTagUpdate
+from app.services.notes_service import NotesService
+from app.services.search_service import SearchService
+
+def note_data(title, tags, texts=()):
+    return NoteCreate(
+        title=title, tags=tags, source_url="https://example.com/v",
+        segments=[{"timestamp": float(i), "text": text} for i, text in enumerate(texts)]
+    )
+
+@pytest.fixture
+def service(db):
+    db.add_all([User(id="u1", email="one@example.com"), User(id="u2", email="two@example.com")])
+    return NotesService(db)
+
+async def create(service, user_id, *notes):
+    result = await service.create_notes(list(notes), user_id)
+    return [item.id for item in result.results]
+
+async def note_tags(db):
+    rows = (await db.execute(select(NoteTag.note_id, NoteTag.tag, NoteTag.user_id))).all()
+    return sorted(tuple(row) for row in rows)
+
+async def indexed_texts(db, note_id):
+    rows = await db.execute(select(SearchSegment.text).where(SearchSegment.source_id == note_id))
+    return sorted(rows.scalars().all())
+
+async def search_sources(db, user_id, query):
+    return {hit.source_id for hit in await SearchService(db).search(user_id, query)}
+
+@pytest.mark.asyncio
+async def test_create_notes_reports_each_note_and_indexes_it(db, service):
+    result = await service.create_notes([note_data("Cats", ["pets", "pets"], ["a cat purrs"]), note_data("Dogs", [])], "u1")
+    assert [item.status for item in result.results] == ["created", "created"]
+    cats, dogs = [item.id for item in result.results]
+    assert await note_tags(db) == [(cats, "pets", "u1")]
+    assert await indexed_texts(db, cats) == ["Cats pets pets", "a cat purrs"]
+    assert await indexed_texts(db, dogs) == ["Dogs"]
+    assert await search_sources(db, "u1", "purring cats") == {cats}
+
+@pytest.mark.asyncio
+async def test_update_tags_reports_missing_and_foreign_notes(db, service):
+    mine, = await create(service, "u1", note_data("Mine", ["work"]))
+    theirs, = await create(service, "u2", note_data("Theirs", ["work"]))
+    result = await service.update_notes_tags(
+        NotesBulkTagUpdate(note_ids=[theirs, mine, "missing"], add_tags=["urgent"]), "u1"
+    )
+    assert [(item.id, item.status) for item in result.results] == [
+        (theirs, "not_found"), (mine, "updated"), ("missing", "not_found"),
+    ]
+    assert (await db.get(Note, theirs, populate_existing=True)).tags == ["work"]
+    assert await note_tags(db) == sorted([(mine, "urgent", "u1"), (mine, "work", "u1"), (theirs, "work", "u2")])
+
+@pytest.mark.asyncio
+async def test_update_tags_merges_without_duplicates(db, service):
+    first, second = await create(service, "u1", note_data("First", ["work", "home"]), note_data("Second", ["urgent"]))
+    await service.update_notes_tags(
+        NotesBulkTagUpdate(note_ids=[first, second], add_tags=["urgent", "review", "urgent"], remove_tags=["home"]), "u1"
+    )
+    assert (await db.get(Note, first, populate_existing=True)).tags == ["work", "urgent", "review"]
+    assert (await db.get(Note, second, populate_existing=True)).tags == ["urgent", "review"]
+    assert await note_tags(db) == sorted([
+        (first, "review", "u1"), (first, "urgent", "u1"), (first, "work", "u1"),
+        (second, "review", "u1"), (second, "urgent", "u1"),
+    ])
+
+@pytest.mark.asyncio
+async def test_update_tags_reindexes_titles_only(db, service):
+    note_id, = await create(service, "u1", note_data("Trip", ["home"], ["packing the tent"]))
+    await service.update_notes_tags(NotesBulkTagUpdate(note_ids=[note_id], add_tags=["travel"], remove_tags=["home"]), "u1")
+    assert await indexed_texts(db, note_id) == ["Trip travel", "packing the tent"]
+    assert await search_sources(db, "u1", "home") == set()
+    assert await search_sources(db, "u1", "travel") == {note_id}
+    assert await search_sources(db, "u1", "tent") == {note_id}
+
+@pytest.mark.asyncio
+async def test_delete_notes_removes_tags_and_index_rows(db, service):
+    kept, deleted = await create(service, "u1", note_data("Kept", ["a"], ["cat"]), note_data("Deleted", ["b"], ["cat"]))
+    theirs, = await create(service, "u2", note_data("Theirs", ["c"], ["cat"]))
+    result = await service.delete_notes([deleted, theirs, "missing"], "u1")
+    assert [item.status for item in result.results] == ["deleted", "not_found", "not_found"]
+    assert {note.id for note in (await db.execute(select(Note))).scalars()} == {kept, theirs}
+    assert await note_tags(db) == sorted([(kept, "a", "u1"), (theirs, "c", "u2")])
+    assert await indexed_texts(db, deleted) == []
+    segment_ids = select(SearchSegment.id)
+    orphans = await db.execute(select(SearchTerm).where(SearchTerm.segment_id.not_in(segment_ids)))
+    assert orphans.all() == []
+    assert await search_sources(db, "u1", "cat") == {kept}
+    assert await search_sources(db, "u2", "cat") == {theirs}
+
+@pytest.mark.asyncio
+async def test_tag_counts_are_per_user_and_most_used_first(db, service):
+    first, second, _ = await create(
+        service, "u1", note_data("A", ["work", "home"]), note_data("B", ["work", "urgent"]), note_data("C", ["work"])
+    )
+    await create(service, "u2", note_data("D", ["home", "home"]))
+    counts = await service.get_tag_counts("u1")
+    assert [(count.tag, count.count) for count in counts] == [("work", 3), ("home", 1), ("urgent", 1)]
+
+    await service.update_notes_tags(NotesBulkTagUpdate(note_ids=[first, second], add_tags=["urgent"], remove_tags=["work"]), "u1")
+    await service.delete_notes([first], "u1")
+    assert [(count.tag, count.count) for count in await service.get_tag_counts("u1")] == [("urgent", 1), ("work", 1)]
+    assert [(count.tag, count.count) for count in await service.get_tag_counts("u2")] == [("home", 1)]
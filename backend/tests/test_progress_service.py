@@ -0,0 +1,52 @@
+import asyncio
+import json
+import pytest
+import pytest_asyncio
+from app.core.config import settings
+from app.services import progress_service
+from app.services.progress_service import CHANNEL_PREFIX, SNAPSHOT_PREFIX, ProgressBroadcaster, job_event_stream
+
+@pytest_asyncio.fixture
+async def broadcaster(async_redis, monkeypatch):
+    monkeypatch.setattr(progress_service, "async_redis_client", async_redis)
+    monkeypatch.setattr(settings, "progress_keepalive_seconds", 0.05)
+    broadcaster = ProgressBroadcaster()
+    monkeypatch.setattr(progress_service, "progress_broadcaster", broadcaster)
+    yield broadcaster
+    if broadcaster._listener is not None:
+        broadcaster._listener.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await broadcaster._listener
+
+def event(status, progress):
+    return json.dumps({"status": status, "progress": progress, "message": None})
+
+async def collect(stream):
+    return [message async for message in stream]
+
+@pytest.mark.asyncio
+async def test_stream_is_subscribed_before_the_snapshot_is_sent(broadcaster, async_redis):
+    stream = job_event_stream("job-1", {"status": "pending", "progress": 0, "message": None})
+    assert json.loads((await stream.__anext__()).split("data: ")[1])["status"] == "pending"
+    # Published right after the snapshot; must reach the stream
+    await async_redis.publish(CHANNEL_PREFIX + "job-1", event("completed", 100))
+    messages = await asyncio.wait_for(collect(stream), timeout=5)
+    assert messages[-1] == f"event: progress\ndata: {event('completed', 100)}\n\n"
+    assert broadcaster._subscribers == {}
+
+@pytest.mark.asyncio
+async def test_terminal_snapshot_ends_the_stream_immediately(broadcaster, async_redis):
+    await async_redis.set(SNAPSHOT_PREFIX + "job-1", event("failed", 0))
+    messages = await asyncio.wait_for(collect(job_event_stream("job-1", {})), timeout=5)
+    assert messages == [f"event: progress\ndata: {event('failed', 0)}\n\n"]
+
+@pytest.mark.asyncio
+async def test_keepalive_notices_a_missed_terminal_event(broadcaster, async_redis):
+    await async_redis.set(SNAPSHOT_PREFIX + "job-1", event("processing", 10))
+    stream = job_event_stream("job-1", {})
+    await stream.__anext__()
+    # The event itself was lost, only the snapshot records completion
+    await async_redis.set(SNAPSHOT_PREFIX + "job-1", event("completed", 100))
+    messages = await asyncio.wait_for(collect(stream), timeout=5)
+    assert messages[-1] == f"event: progress\ndata: {event('completed', 100)}\n\n"
+    assert set(messages[:-1]) <= {": keepalive\n\n"}
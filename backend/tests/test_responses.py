@@ -0,0 +1,76 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import pytest
+import pytest_asyncio
+from app.core.responses import TrustedJSONResponse
+from app.models import schemas
+from app.models.database import Note
+from app.models.transcript import ResultPage, SegmentRecord
+from app.services.notes_service import NotesService, note_record
+from app.services.transcript_index import to_result_segment
+from app.services.transcription_service import TranscriptionService
+from app.services.transcript_store import TranscriptStore
+
+def assert_encodes_like(schema, content):
+    """The trusted body must be byte-for-byte what response_model validation would send"""
+    expected = schema.model_validate(content, from_attributes=True).model_dump_json()
+    assert TrustedJSONResponse(content).body.decode() == expected
+
+def add_note(db, note_id, segments, created_at, updated_at=None, tags=("work",)):
+    db.add(Note(
+        id=note_id, title=f"Note {note_id}", tags=list(tags), source_url="https://example.com/v",
+        segments=segments, user_id="u1", created_at=created_at, updated_at=updated_at
+    ))
+
+@pytest_asyncio.fixture
+async def notes(db):
+    # Stored segments may hold integer timestamps and no topics or score
+    add_note(db, "n1", [{"timestamp": 3, "text": "integer time"}, {"timestamp": 4.25, "text": "ünïcode ✓", "topics": ["x"]}],
+             datetime(2024, 5, 1, 12, 0, 0, 123456, tzinfo=timezone.utc), datetime(2024, 5, 2, 8, 30, tzinfo=timezone.utc))
+    add_note(db, "n2", [], datetime(2024, 5, 3, tzinfo=timezone.utc), tags=())
+    await db.commit()
+    return NotesService(db)
+
+@pytest.mark.asyncio
+async def test_notes_page(notes):
+    page = await notes.list_note_summaries("u1", limit=1)
+    assert page.next_cursor
+    assert_encodes_like(schemas.NotesPage, page)
+    assert_encodes_like(schemas.NotesPage, await notes.list_note_summaries("u1", cursor=page.next_cursor))
+
+@pytest.mark.asyncio
+async def test_note(notes):
+    for note_id in ("n1", "n2"):
+        assert_encodes_like(schemas.Note, note_record(await notes.get_note(note_id, "u1")))
+
+@pytest.mark.asyncio
+async def test_note_segments(notes):
+    segments = await notes.get_note_segments("n1", "u1")
+    expected = "[" + ",".join(schemas.Segment.model_validate(s, from_attributes=True).model_dump_json() for s in segments) + "]"
+    assert TrustedJSONResponse(segments).body.decode() == expected
+
+def test_aware_and_naive_datetimes():
+    record = {
+        "title": "t", "tags": [], "segments": [], "source_url": "u", "id": "n", "user_id": "u1",
+        "created_at": datetime(2024, 5, 1, 12, 0, 0, 500), "updated_at": None,
+    }
+    assert_encodes_like(schemas.Note, record)
+    assert_encodes_like(schemas.Note, {**record, "created_at": datetime(2024, 5, 1, tzinfo=timezone.utc)})
+
+@pytest.mark.parametrize("topics", [[], ["cat"]])
+def test_result_pages(s3, cache_redis, topics):
+    segments = [{"start": 0, "end": 1, "text": "a cat"}, {"start": 1.5, "end": 2, "text": "a dog"}, {"start": 2.0, "end": 3, "text": "cats"}]
+    key = TranscriptStore(s3).write(segments, f"transcripts/responses-{len(topics)}")
+    service = TranscriptionService(db=None)
+    service.s3_service = s3
+    job = SimpleNamespace(result_s3_key=key, topics=[])
+    page = service._read_page(job, topics, False, None, None, None, None, 1)
+    assert page.next_cursor
+    assert_encodes_like(schemas.TranscriptionResult, page)
+
+def test_semantic_and_legacy_result_records():
+    page = ResultPage(segments=[
+        to_result_segment({"start": 0, "end": 1, "text": "integer start from a legacy JSON transcript"}),
+        SegmentRecord(1.5, "ranked", ["cat", "dog"], 0.8125),
+    ])
+    assert_encodes_like(schemas.TranscriptionResult, page)
@@ -0,0 +1,91 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from app import main
+from app.services import result_cache
+from app.services.result_cache import REDIS_PARTS_PREFIX, REDIS_PREFIX, ResultCache
+from app.services.transcript_store import SegmentBlock
+
+@pytest.fixture
+def cache(cache_redis):
+    return ResultCache(max_bytes=1000, local_ttl_seconds=60, redis_ttl_seconds=60)
+
+def value(size):
+    """A value whose JSON is `size` bytes"""
+    return "x" * (size - 2)
+
+def test_local_hits_skip_redis(cache, cache_redis):
+    cache.set("t1", "json", [1, 2])
+    cache_redis.flushall()
+    assert cache.get("t1", "json") == [1, 2]
+    assert cache.stats()["local_hits"] == 1
+
+def test_least_recently_used_entries_are_evicted(cache):
+    cache.set("a", "json", value(400))
+    cache.set("b", "json", value(400))
+    cache.get("a", "json")
+    cache.set("c", "json", value(400))
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"]) == (2, 800)
+    # b was evicted locally but is still in Redis
+    assert cache.get("b", "json") == value(400)
+    assert cache.get("c", "json") == value(400)
+    assert (cache.stats()["local_hits"], cache.stats()["redis_hits"]) == (2, 1)
+
+def test_values_larger_than_the_local_tier_only_go_to_redis(cache, cache_redis):
+    cache.set("big", "json", value(2000))
+    assert cache.stats()["entries"] == 0
+    assert json.loads(cache_redis.get(REDIS_PREFIX + "big#json")) == value(2000)
+    assert cache.get("big", "json") == value(2000)
+
+def test_redis_hits_are_decoded_and_kept_locally(cache_redis):
+    cache = ResultCache(max_bytes=10_000, local_ttl_seconds=0, redis_ttl_seconds=60)
+    block = SegmentBlock.from_ndjson(b'{"start": 1, "end": 2, "text": "hi"}\n')
+    cache.set("t1", "columns0", block)
+    assert cache_redis.ttl(REDIS_PREFIX + "t1#columns0") > 0
+    # The local entry has already expired, so this reads Redis
+    restored = cache.get("t1", "columns0", SegmentBlock.from_json)
+    assert restored.segment_at(0) == {"start": 1.0, "end": 2.0, "text": "hi"}
+    assert cache.stats()["redis_hits"] == 1
+
+class BrokenRedis:
+    def __getattr__(self, name):
+        raise ConnectionError("Redis is down")
+
+def test_misses_and_redis_errors_return_none(cache, monkeypatch):
+    assert cache.get("t1", "json") is None
+    monkeypatch.setattr(result_cache, "redis_client", BrokenRedis())
+    cache.set("t2", "json", [1])
+    assert cache.get("t2", "json") == [1]
+    assert cache.get("t3", "json") is None
+    assert cache.stats()["misses"] == 2
+
+def test_get_or_load_caches_only_non_empty_values(cache):
+    loads = []
+    load = lambda result: lambda: loads.append(result) or result
+    assert cache.get_or_load("t1", "json", load([1])) == [1]
+    assert cache.get_or_load("t1", "json", load([2])) == [1]
+    assert cache.get_or_load("t2", "json", load([])) == []
+    assert cache.get_or_load("t2", "json", load([3])) == [3]
+    assert loads == [[1], [], [3]]
+
+def test_invalidate_drops_every_part_from_both_tiers(cache, cache_redis):
+    cache.set("t1", "blocks", {"a": 1})
+    cache.set("t1", "tokens", {"b": 2})
+    cache.set("t2", "blocks", {"c": 3})
+    cache.invalidate("t1")
+    assert cache.get("t1", "blocks") is None
+    assert cache.get("t1", "tokens") is None
+    assert cache.get("t2", "blocks") == {"c": 3}
+    assert sorted(cache_redis.keys()) == [REDIS_PARTS_PREFIX + "t2", REDIS_PREFIX + "t2#blocks"]
+
+def test_stats_are_served_at_the_metrics_endpoint(cache, monkeypatch):
+    monkeypatch.setattr(main, "result_cache", cache)
+    cache.get_or_load("t1", "json", lambda: [1, 2])
+    cache.get("t1", "json")
+    stats = TestClient(main.app).get("/metrics/result-cache").json()
+    assert {key: stats[key] for key in ("local_hits", "redis_hits", "misses", "load_count", "get_count", "entries", "bytes")} == {
+        "local_hits": 1, "redis_hits": 0, "misses": 1, "load_count": 1, "get_count": 2, "entries": 1, "bytes": 6,
+    }
+    assert stats["hit_ratio"] == 0.5
+    assert stats["avg_get_ms"] >= 0 and stats["avg_load_ms"] >= 0
@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+import pytest
+from app.services.transcript_index import build_token_index
+from app.services.transcript_store import TranscriptStore, index_key_for
+from app.services.transcription_service import TranscriptionService, decode_cursor, encode_cursor
+
+@pytest.fixture
+def service(s3, cache_redis):
+    service = TranscriptionService(db=None)
+    service.s3_service = s3
+    return service
+
+def store_transcript(s3, base_key, texts):
+    segments = [{"start": float(i), "end": i + 0.5, "text": text} for i, text in enumerate(texts)]
+    key = TranscriptStore(s3).write(segments, base_key)
+    s3.upload_json(build_token_index(segments), index_key_for(key))
+    return SimpleNamespace(result_s3_key=key, topics=[])
+
+def read_all(service, job, limit, topics=()):
+    pages = []
+    cursor = None
+    while True:
+        page = service._read_page(job, list(topics), False, None, None, None, cursor, limit)
+        pages.append([segment.text for segment in page.segments])
+        cursor = page.next_cursor
+        if cursor is None:
+            return pages
+
+def test_cursor_round_trip():
+    for position in (0, 7, 123456):
+        cursor = encode_cursor(position)
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == position
+
+@pytest.mark.parametrize("cursor", ["!!!", "bm90LWEtbnVtYmVy"])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+def test_pages_follow_the_cursor_to_the_end(service, s3):
+    job = store_transcript(s3, "transcripts/pages", [f"line {i}" for i in range(7)])
+    assert read_all(service, job, 3) == [["line 0", "line 1", "line 2"], ["line 3", "line 4", "line 5"], ["line 6"]]
+
+def test_no_cursor_when_the_last_page_is_full(service, s3):
+    job = store_transcript(s3, "transcripts/full", [f"line {i}" for i in range(6)])
+    assert read_all(service, job, 3) == [["line 0", "line 1", "line 2"], ["line 3", "line 4", "line 5"]]
+
+def test_no_limit_returns_everything_in_one_page(service, s3):
+    job = store_transcript(s3, "transcripts/unlimited", [f"line {i}" for i in range(5)])
+    assert read_all(service, job, None) == [[f"line {i}" for i in range(5)]]
+
+def test_topic_pages_resume_after_the_last_match(service, s3):
+    texts = ["cats purr", "dogs bark", "a cat sleeps", "birds sing", "the cat again", "no match", "cats everywhere"]
+    job = store_transcript(s3, "transcripts/topics", texts)
+    assert read_all(service, job, 2, topics=["cat"]) == [
+        ["cats purr", "a cat sleeps"], ["the cat again", "cats everywhere"],
+    ]
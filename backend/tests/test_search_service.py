@@ -0,0 +1,90 @@
+import pytest
+from app.models.database import Note, TranscriptionJob, User
+from app.services.search_service import (
+    SearchService, build_search_rows, index_statements, note_title_piece, transcript_search_segments
+)
+
+def piece(text, position=0, timestamp=1.5):
+    return {"position": position, "timestamp": timestamp, "text": text}
+
+def test_rows_carry_the_piece_and_its_term_counts():
+    segment_rows, term_rows = build_search_rows("u1", "note", "n1", [piece("Cats chase cat toys")])
+    assert [{k: v for k, v in row.items() if k != "id"} for row in segment_rows] == [{
+        "user_id": "u1", "source_type": "note", "source_id": "n1",
+        "position": 0, "timestamp": 1.5, "text": "Cats chase cat toys",
+    }]
+    assert {row["term"]: row["count"] for row in term_rows} == {"cat": 2, "chase": 1, "toy": 1}
+    assert {(row["segment_id"], row["user_id"]) for row in term_rows} == {(segment_rows[0]["id"], "u1")}
+
+def test_pieces_without_terms_are_skipped():
+    segment_rows, term_rows = build_search_rows("u1", "note", "n1", [piece(""), piece("  ,. "), piece("кошки", 2)])
+    assert [row["position"] for row in segment_rows] == [2]
+    assert [row["term"] for row in term_rows] == ["кошк"]
+
+def test_title_piece_joins_title_and_tags():
+    assert note_title_piece("Weekly sync", ["work", "notes"]) == {"position": None, "timestamp": None, "text": "Weekly sync work notes"}
+    assert note_title_piece("Weekly sync", None)["text"] == "Weekly sync"
+
+async def add_note(db, note_id, texts, user_id="u1", title="Untitled"):
+    note = Note(
+        id=note_id, title=title, tags=[], source_url="https://example.com/v", user_id=user_id,
+        segments=[{"timestamp": float(i), "text": text} for i, text in enumerate(texts)]
+    )
+    db.add(note)
+    await db.flush()
+    await SearchService(db).index_notes([note])
+
+async def add_transcript(db, job_id, texts, user_id="u1"):
+    db.add(TranscriptionJob(id=job_id, url=f"https://youtu.be/{job_id}", status="completed", user_id=user_id))
+    segments = [{"start": float(i), "end": i + 0.5, "text": text} for i, text in enumerate(texts)]
+    for statement in index_statements(*build_search_rows(user_id, "transcript", job_id, transcript_search_segments(segments))):
+        await db.execute(statement)
+
+@pytest.fixture
+def search(db):
+    db.add_all([User(id="u1", email="one@example.com"), User(id="u2", email="two@example.com")])
+    return SearchService(db)
+
+@pytest.mark.asyncio
+async def test_rarer_terms_rank_higher(db, search):
+    await add_note(db, "n1", ["python code review", "python tips", "code style", "code smells", "code golf"])
+    hits = await search.search("u1", "python code")
+    assert [hit.text for hit in hits][:2] == ["python code review", "python tips"]
+    assert hits[0].score > hits[1].score > hits[2].score
+
+@pytest.mark.asyncio
+async def test_repeated_terms_score_higher_but_saturate(db, search):
+    await add_note(db, "n1", ["cat", "cat cat", "cat cat cat cat cat cat cat cat", "dog"])
+    hits = await search.search("u1", "cats")
+    assert [hit.text for hit in hits] == ["cat cat cat cat cat cat cat cat", "cat cat", "cat"]
+    assert hits[0].score < 2 * hits[2].score
+
+@pytest.mark.asyncio
+async def test_hits_carry_source_position_and_title(db, search):
+    await add_note(db, "n1", ["first", "the cat sat"], title="Pets")
+    await add_transcript(db, "j1", ["no match", "a cat video"])
+    hits = await search.search("u1", "cat")
+    assert sorted((hit.source_type, hit.source_id, hit.title, hit.position, hit.timestamp) for hit in hits) == [
+        ("note", "n1", "Pets", 1, 1.0),
+        ("transcript", "j1", "https://youtu.be/j1", 1, 1.0),
+    ]
+
+@pytest.mark.asyncio
+async def test_source_type_filter_applies_before_the_limit(db, search):
+    await add_note(db, "n1", ["cat cat cat", "cat cat"])
+    await add_transcript(db, "j1", ["one cat"])
+    hits = await search.search("u1", "cat", source_type="transcript", limit=1)
+    assert [(hit.source_type, hit.text) for hit in hits] == [("transcript", "one cat")]
+    assert {hit.source_type for hit in await search.search("u1", "cat", source_type="note")} == {"note"}
+
+@pytest.mark.asyncio
+async def test_search_is_scoped_to_the_user(db, search):
+    await add_note(db, "n1", ["my cat"])
+    await add_note(db, "n2", ["their cat"], user_id="u2")
+    assert [hit.source_id for hit in await search.search("u2", "cat")] == ["n2"]
+
+@pytest.mark.asyncio
+async def test_queries_without_known_terms_find_nothing(db, search):
+    await add_note(db, "n1", ["my cat"])
+    assert await search.search("u1", "...") == []
+    assert await search.search("u1", "giraffe") == []
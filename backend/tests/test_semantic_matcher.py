@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+from botocore.exceptions import ClientError
+from app.models.database import TranscriptionJob
+from app.services import transcription_service
+from app.services.semantic_matcher import Embedder, SegmentEmbeddings, rank_segments
+from app.services.transcript_store import TranscriptStore
+
+TEXTS = ["cats purr on the sofa", "stock markets fell today", "my cat sleeps all day", "rain is expected tomorrow"]
+
+def store(s3, texts=TEXTS, base_key="transcripts/media"):
+    segments = [{"start": float(i), "end": i + 0.5, "text": text} for i, text in enumerate(texts)]
+    return TranscriptStore(s3).write(segments, base_key)
+
+def test_embedder_must_implement_encode():
+    with pytest.raises(TypeError):
+        Embedder()
+
+def test_hashing_embedder_rows_are_normalized(embedder):
+    vectors = embedder.encode(["cats purr", "", "stocks"])
+    assert vectors.dtype == np.float32
+    assert np.allclose(np.linalg.norm(vectors, axis=1), [1, 0, 1])
+
+def test_rank_segments_orders_matches_by_best_score(embedder):
+    ranked = rank_segments(embedder.encode(TEXTS), ["cat", "market"], threshold=0.2)
+    assert [match["position"] for match in ranked] == [1, 0, 2]
+    assert [match["topics"] for match in ranked] == [["market"], ["cat"], ["cat"]]
+    assert ranked[0]["score"] >= ranked[1]["score"] >= ranked[2]["score"] >= 0.2
+
+def test_rank_segments_applies_the_threshold_per_topic(embedder):
+    embeddings = embedder.encode(["cat and market news"])
+    assert rank_segments(embeddings, ["cat", "market"], threshold=0.2)[0]["topics"] == ["cat", "market"]
+    assert rank_segments(embeddings, ["cat"], threshold=0.99) == []
+
+def test_rank_segments_without_topics_or_segments(embedder):
+    assert rank_segments(embedder.encode(TEXTS), [" ", ""]) == []
+    assert rank_segments(np.zeros((0, 8), dtype=np.float32), ["cat"]) == []
+
+def test_embeddings_are_built_once_per_revision(embedder, s3, cache_redis):
+    key = store(s3)
+    embeddings = SegmentEmbeddings(s3)
+    assert embeddings.get(key) is None
+    assert embeddings.build(key, lambda: TEXTS)
+    assert np.allclose(embeddings.get(key), embedder.encode(TEXTS), atol=1e-3)
+    # Already built: the transcript is not read again
+    assert embeddings.build(key, lambda: pytest.fail("texts loaded again"))
+
+def test_rewritten_transcripts_never_reuse_stale_embeddings(embedder, s3, cache_redis):
+    key = store(s3)
+    embeddings = SegmentEmbeddings(s3)
+    embeddings.build(key, lambda: TEXTS)
+    old_key = embeddings._key(key)
+    assert embeddings.get(key) is not None
+
+    assert store(s3, TEXTS[:2]) == key
+    assert embeddings._key(key) != old_key
+    assert embeddings.get(key) is None
+    assert embeddings.build(key, lambda: TEXTS[:2])
+    assert embeddings.get(key).shape[0] == 2
+
+def test_loaded_embeddings_stay_in_memory(embedder, s3, cache_redis):
+    key = store(s3)
+    embeddings = SegmentEmbeddings(s3)
+    embeddings.build(key, lambda: TEXTS)
+    embeddings.get(key)
+    del s3.objects[embeddings._key(key)]
+    assert SegmentEmbeddings(s3).get(key) is not None
+
+def test_only_the_first_caller_claims_a_build(embedder, s3, cache_redis):
+    key = store(s3)
+    embeddings = SegmentEmbeddings(s3)
+    assert embeddings.claim_build(key)
+    assert not embeddings.claim_build(key)
+    store(s3, TEXTS[:2])
+    assert embeddings.claim_build(key)
+
+def test_storage_errors_are_not_mistaken_for_missing_embeddings(embedder, s3, cache_redis, monkeypatch):
+    key = store(s3)
+    def unavailable(key, chunk_size=None):
+        raise ClientError({"Error": {"Code": "SlowDown"}}, "GetObject")
+    monkeypatch.setattr(s3, "iter_object", unavailable)
+    with pytest.raises(ClientError):
+        SegmentEmbeddings(s3).get(key)
+
+@pytest.mark.asyncio
+async def test_result_is_503_until_embeddings_are_built(embedder, api, db, s3, monkeypatch):
+    queued = []
+    monkeypatch.setattr(transcription_service.embed_transcript_task, "delay", queued.append)
+    key = store(s3)
+    db.add(TranscriptionJob(id="j1", url="https://youtu.be/x", status="completed", result_s3_key=key, user_id="u1"))
+    await db.commit()
+    params = {"topics": "cat", "mode": "semantic", "threshold": 0.2}
+
+    for stream in (False, True):
+        response = await api.get("/api/transcribe/j1/result", params={**params, "stream": stream})
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "10"
+    # Concurrent requests queue the build only once
+    assert queued == [key]
+
+    SegmentEmbeddings(s3).build(key, lambda: TEXTS)
+    response = await api.get("/api/transcribe/j1/result", params=params)
+    assert response.status_code == 200
+    assert [segment["text"] for segment in response.json()["segments"]] == [TEXTS[0], TEXTS[2]]
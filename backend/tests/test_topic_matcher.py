@@ -0,0 +1,65 @@
+import re
+import threading
+import snowballstemmer
+from app.services.topic_matcher import TopicMatcher, normalize_tokens, stem
+
+WORDS = (
+    "running runner runs connection connections connected generously generation "
+    "программирование программист программы обучение обучения обученный ёлки елка "
+    "машинное машины нейронные нейронная сетями экономика экономический"
+).split()
+
+def test_match_is_word_level():
+    matcher = TopicMatcher(["art"])
+    assert matcher.match("Let's start") == []
+    assert matcher.match("Modern ART history") == ["art"]
+
+def test_match_stems_russian_and_english_phrases():
+    matcher = TopicMatcher(["машинное обучение", "neural networks", "python"])
+    assert matcher.match("Машинного обучения и нейросети") == ["машинное обучение"]
+    assert matcher.match("a neural network in Python") == ["neural networks", "python"]
+
+def test_match_overlapping_patterns_in_one_pass():
+    matcher = TopicMatcher(["machine learning", "learning rate", "rate"])
+    assert matcher.match("the machine learning rate") == ["machine learning", "learning rate", "rate"]
+    assert matcher.match("learning machines") == []
+
+def test_topics_are_deduplicated_and_blank_ones_dropped():
+    matcher = TopicMatcher(["music", " music ", "", "!!"])
+    assert matcher.topics == ["music"]
+
+def test_candidates_use_the_rarest_token():
+    matcher = TopicMatcher(["machine learning"])
+    index = {stem("machine"): [0, 1, 2, 3], stem("learning"): [2, 5]}
+    assert matcher.candidates(index) == {2, 5}
+
+def test_yo_is_folded_into_ye():
+    assert normalize_tokens("Ёлки") == normalize_tokens("елки")
+
+def test_stem_is_thread_safe():
+    tokens = [f"{word}{suffix}" for word in WORDS for suffix in ("", "s", "ов", "ами", "ing")]
+    expected = {
+        token: snowballstemmer.stemmer("russian" if re.search("[а-яё]", token) else "english").stemWord(token.replace("ё", "е"))
+        for token in tokens
+    }
+    barrier = threading.Barrier(8)
+    errors = []
+    results = []
+
+    def work():
+        barrier.wait()
+        try:
+            for _ in range(50):
+                stem.cache_clear()
+                results.extend((token, stem(token)) for token in tokens)
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert [pair for pair in results if pair[1] != expected[pair[0]]] == []
@@ -0,0 +1,71 @@
+import json
+import pytest
+from app.core.config import settings
+from app.services.result_cache import ResultCache
+from app.services.transcript_store import TranscriptStore, block_index_key_for
+
+@pytest.fixture
+def store(s3, cache_redis, monkeypatch):
+    monkeypatch.setattr(settings, "transcript_block_segments", 10)
+    monkeypatch.setattr(settings, "transcript_range_max_blocks", 3)
+    return TranscriptStore(s3, ResultCache(1024 * 1024, 60, 60))
+
+def segments(count, text="segment"):
+    return [{"start": float(i * 2), "end": float(i * 2 + 1.5), "text": f"{text} {i}"} for i in range(count)]
+
+def test_write_stores_blocks_and_index(store, s3):
+    key = store.write(segments(25), "transcripts/a")
+    assert key == "transcripts/a.ndjson.zst"
+    index = json.loads(s3.objects[block_index_key_for(key)])
+    assert index["segment_count"] == 25
+    assert index["size"] == len(s3.objects[key])
+    assert [(b["first_segment"], b["segment_count"], b["start"], b["end"]) for b in index["blocks"]] == [
+        (0, 10, 0.0, 19.5), (10, 10, 20.0, 39.5), (20, 5, 40.0, 49.5),
+    ]
+
+def test_iter_segments_reads_everything_in_order(store):
+    key = store.write(segments(25), "transcripts/a")
+    assert list(store.iter_segments(key)) == list(enumerate(segments(25)))
+
+def test_positions_fetch_only_their_blocks(store, s3):
+    key = store.write(segments(25), "transcripts/a")
+    blocks = store.read_block_index(key)["blocks"]
+    assert store.read_segments(key, positions=[3, 22]) == {3: segments(25)[3], 22: segments(25)[22]}
+    # Blocks 0 and 2 are not adjacent, so they take two range GETs
+    assert s3.ranges == [
+        (blocks[0]["offset"], blocks[0]["offset"] + blocks[0]["length"] - 1),
+        (blocks[2]["offset"], blocks[2]["offset"] + blocks[2]["length"] - 1),
+    ]
+
+def test_time_window_and_from_position(store, s3):
+    key = store.write(segments(25), "transcripts/a")
+    assert [position for position, _ in store.iter_segments(key, start_time=21.0, end_time=26.0)] == [10, 11, 12, 13]
+    assert len(s3.ranges) == 1
+    assert [position for position, _ in store.iter_segments(key, from_position=18)][:3] == [18, 19, 20]
+
+def test_adjacent_blocks_are_coalesced_up_to_the_limit(store, s3):
+    key = store.write(segments(45), "transcripts/a")
+    list(store.iter_segments(key))
+    # Five blocks at three per range GET
+    assert len(s3.ranges) == 2
+    assert s3.ranges[0][1] + 1 == s3.ranges[1][0]
+
+def test_decoded_blocks_are_cached(store, s3):
+    key = store.write(segments(25), "transcripts/a")
+    list(store.iter_segments(key))
+    fetched = len(s3.ranges)
+    assert list(store.iter_segments(key)) == list(enumerate(segments(25)))
+    assert len(s3.ranges) == fetched
+
+def test_rewrite_changes_revision_and_drops_cached_blocks(store):
+    key = store.write(segments(25), "transcripts/a")
+    revision = store.revision(key)
+    list(store.iter_segments(key))
+    assert store.write(segments(25, text="retranscribed"), "transcripts/a") == key
+    assert store.revision(key) not in ("", revision)
+    assert store.read_segments(key, positions=[0])[0]["text"] == "retranscribed 0"
+
+def test_legacy_json_transcripts_are_still_read(store, s3):
+    s3.upload_json(segments(3), "transcripts/legacy.json")
+    assert store.revision("transcripts/legacy.json") == ""
+    assert [position for position, _ in store.iter_segments("transcripts/legacy.json", from_position=1)] == [1, 2]
@@ -0,0 +1,35 @@
+import pytest
+from app.core import celery_app, metrics
+from app.core.config import settings
+
+@pytest.fixture(autouse=True)
+def no_tracing(monkeypatch):
+    monkeypatch.setattr(celery_app, "setup_tracing", lambda service: None)
+
+def test_metrics_port_without_multiprocess_dir_refuses_to_start(monkeypatch):
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    monkeypatch.setattr(settings, "worker_metrics_port", 9100)
+    started = []
+    monkeypatch.setattr(celery_app, "start_metrics_server", started.append)
+    with pytest.raises(SystemExit, match="PROMETHEUS_MULTIPROC_DIR"):
+        celery_app.setup_worker_telemetry()
+    assert started == []
+
+def test_metrics_port_with_multiprocess_dir_serves_metrics(monkeypatch, tmp_path):
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "worker_metrics_port", 9100)
+    started = []
+    monkeypatch.setattr(celery_app, "start_metrics_server", started.append)
+    celery_app.setup_worker_telemetry()
+    assert started == [9100]
+
+def test_exited_pool_processes_are_marked_dead(monkeypatch, tmp_path):
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    (tmp_path / "gauge_livesum_4242.db").write_bytes(b"")
+    (tmp_path / "histogram_4242.db").write_bytes(b"")
+    celery_app.release_process_metrics(pid=4242)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["histogram_4242.db"]
+
+def test_marking_dead_is_a_no_op_without_multiprocess_dir(monkeypatch):
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    metrics.mark_process_dead(4242)
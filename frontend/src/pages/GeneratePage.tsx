@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import {
   Box,
   TextField,
@@ -13,8 +13,13 @@ import {
   Grid,
   Alert,
 } from '@mui/material';
-import { useMutation, useQuery } from 'react-query';
-import { transcribeVideo, getTranscriptionStatus, getTranscriptionResult } from '../services/api';
+import { useMutation, useQuery, useQueryClient } from 'react-query';
+import {
+  transcribeVideo,
+  getTranscriptionStatus,
+  getTranscriptionResult,
+  subscribeToTranscriptionEvents,
+} from '../services/api';
 
 interface Segment {
   timestamp: number;
@@ -28,6 +33,8 @@ const GeneratePage: React.FC = () => {
   const [tags, setTags] = useState('');
   const [jobId, setJobId] = useState<string | null>(null);
   const [segments, setSegments] = useState<Segment[]>([]);
+  const [polling, setPolling] = useState(false);
+  const queryClient = useQueryClient();
 
   const transcribeMutation = useMutation(transcribeVideo, {
     onSuccess: (data) => {
@@ -43,15 +50,25 @@ const GeneratePage: React.FC = () => {
     () => getTranscriptionStatus(jobId!),
     {
       enabled: !!jobId,
-      refetchInterval: (data) => (data?.status === 'completed' ? false : 2000),
-      onSuccess: (data) => {
-        if (data.status === 'completed') {
-          resultQuery.refetch();
-        }
-      },
+      // Only polled when the event stream is unavailable
+      refetchInterval: (data) =>
+        polling && data?.status !== 'completed' && data?.status !== 'failed' ? 2000 : false,
     }
   );
 
+  // Progress is pushed by the server; fall back to polling if the stream fails
+  useEffect(() => {
+    if (!jobId) return;
+    setPolling(false);
+    return subscribeToTranscriptionEvents(
+      jobId,
+      (status) => {
+        queryClient.setQueryData(['transcription-status', jobId], status);
+      },
+      () => setPolling(true)
+    );
+  }, [jobId, queryClient]);
+
   const resultQuery = useQuery(
     ['transcription-result', jobId],
     () => getTranscriptionResult(jobId!, topics.split(',').map(t => t.trim())),
@@ -97,6 +114,7 @@ const GeneratePage: React.FC = () => {
 
   const isTranscribing = statusQuery.data?.status === 'processing';
   const isCompleted = statusQuery.data?.status === 'completed';
+  const isFailed = statusQuery.data?.status === 'failed';
 
   return (
     <Box>
@@ -208,6 +226,12 @@ const GeneratePage: React.FC = () => {
         </Paper>
       )}
 
+      {isFailed && (
+        <Alert severity="error" sx={{ mt: 2 }}>
+          Transcription failed{statusQuery.data?.message ? `: ${statusQuery.data.message}` : '.'}
+        </Alert>
+      )}
+
       {transcribeMutation.isError && (
         <Alert severity="error" sx={{ mt: 2 }}>
           Failed to start transcription. Please try again.
@@ -17,11 +17,11 @@ import {
   TextField,
 } from '@mui/material';
 import { Edit, Delete, Visibility } from '@mui/icons-material';
-import { useQuery, useMutation, useQueryClient } from 'react-query';
-import { getNotes, deleteNote, updateNote, Note } from '../services/api';
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient } from 'react-query';
+import { getNotes, getNoteSegments, deleteNote, updateNote, NoteSummary, CreateNoteRequest } from '../services/api';
 
 const MyNotesPage: React.FC = () => {
-  const [selectedNote, setSelectedNote] = React.useState<Note | null>(null);
+  const [selectedNote, setSelectedNote] = React.useState<NoteSummary | null>(null);
   const [editDialogOpen, setEditDialogOpen] = React.useState(false);
   const [viewDialogOpen, setViewDialogOpen] = React.useState(false);
   const [editTitle, setEditTitle] = React.useState('');
@@ -29,7 +29,24 @@ const MyNotesPage: React.FC = () => {
 
   const queryClient = useQueryClient();
 
-  const { data: notes = [], isLoading, error } = useQuery('notes', getNotes);
+  const {
+    data,
+    isLoading,
+    error,
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage,
+  } = useInfiniteQuery('notes', ({ pageParam }) => getNotes(pageParam), {
+    getNextPageParam: (lastPage) => lastPage.next_cursor ?? undefined,
+  });
+  const notes = data?.pages.flatMap((page) => page.notes) ?? [];
+
+  // Segments are loaded only for the note being viewed
+  const { data: selectedSegments = [] } = useQuery(
+    ['note-segments', selectedNote?.id],
+    () => getNoteSegments(selectedNote!.id),
+    { enabled: viewDialogOpen && !!selectedNote }
+  );
 
   const deleteMutation = useMutation(deleteNote, {
     onSuccess: () => {
@@ -38,7 +55,7 @@ const MyNotesPage: React.FC = () => {
   });
 
   const updateMutation = useMutation(
-    ({ id, data }: { id: string; data: Partial<Note> }) => updateNote(id, data),
+    ({ id, data }: { id: string; data: Partial<CreateNoteRequest> }) => updateNote(id, data),
     {
       onSuccess: () => {
         queryClient.invalidateQueries('notes');
@@ -47,14 +64,14 @@ const MyNotesPage: React.FC = () => {
     }
   );
 
-  const handleEdit = (note: Note) => {
+  const handleEdit = (note: NoteSummary) => {
     setSelectedNote(note);
     setEditTitle(note.title);
     setEditTags(note.tags.join(', '));
     setEditDialogOpen(true);
   };
 
-  const handleView = (note: Note) => {
+  const handleView = (note: NoteSummary) => {
     setSelectedNote(note);
     setViewDialogOpen(true);
   };
@@ -125,7 +142,7 @@ const MyNotesPage: React.FC = () => {
                   secondary={
                     <Box>
                       <Typography variant="body2" color="textSecondary">
-                        Created: {formatDate(note.createdAt)}
+                        Created: {formatDate(note.created_at)}
                       </Typography>
                       <Box sx={{ mt: 1 }}>
                         {note.tags.map((tag) => (
@@ -138,7 +155,7 @@ const MyNotesPage: React.FC = () => {
                         ))}
                       </Box>
                       <Typography variant="body2" color="textSecondary">
-                        {note.segments.length} segments
+                        {note.segment_count} segments
                       </Typography>
                     </Box>
                   }
@@ -157,6 +174,13 @@ const MyNotesPage: React.FC = () => {
               </ListItem>
             </Paper>
           ))}
+          {hasNextPage && (
+            <Box sx={{ textAlign: 'center' }}>
+              <Button onClick={() => fetchNextPage()} disabled={isFetchingNextPage}>
+                {isFetchingNextPage ? 'Loading...' : 'Load more'}
+              </Button>
+            </Box>
+          )}
         </List>
       )}
 
@@ -206,7 +230,7 @@ const MyNotesPage: React.FC = () => {
               Source URL:
             </Typography>
             <Typography variant="body2" color="textSecondary">
-              {selectedNote?.sourceUrl}
+              {selectedNote?.source_url}
             </Typography>
           </Box>
           <Box>
@@ -214,7 +238,7 @@ const MyNotesPage: React.FC = () => {
               Segments:
             </Typography>
             <List dense>
-              {selectedNote?.segments.map((segment, index) => (
+              {selectedSegments.map((segment, index) => (
                 <ListItem key={index}>
                   <ListItemText
                     primary={segment.text}
@@ -43,6 +43,22 @@ export interface Note {
   updatedAt: string;
 }
 
+export interface NoteSummary {
+  id: string;
+  title: string;
+  tags: string[];
+  source_url: string;
+  segment_count: number;
+  preview?: string;
+  created_at: string;
+  updated_at?: string;
+}
+
+export interface NotesPage {
+  notes: NoteSummary[];
+  next_cursor?: string;
+}
+
 export interface CreateNoteRequest {
   title: string;
   tags: string[];
@@ -60,6 +76,27 @@ export const getTranscriptionStatus = async (jobId: string): Promise<Transcripti
   return response.data;
 };
 
+export const subscribeToTranscriptionEvents = (
+  jobId: string,
+  onStatus: (status: TranscriptionStatus) => void,
+  onError: () => void
+): (() => void) => {
+  const source = new EventSource(`${API_BASE_URL}/transcribe/${jobId}/events`);
+  source.addEventListener('progress', (event) => {
+    const status: TranscriptionStatus = JSON.parse((event as MessageEvent).data);
+    onStatus(status);
+    if (status.status === 'completed' || status.status === 'failed') {
+      source.close();
+    }
+  });
+  // Blocked or dropped streams would otherwise retry silently; let the caller poll instead
+  source.onerror = () => {
+    source.close();
+    onError();
+  };
+  return () => source.close();
+};
+
 export const getTranscriptionResult = async (jobId: string, topics: string[]): Promise<TranscriptionResult> => {
   const response = await api.get(`/transcribe/${jobId}/result`, {
     params: { topics: topics.join(',') },
@@ -67,8 +104,15 @@ export const getTranscriptionResult = async (jobId: string, topics: string[]): P
   return response.data;
 };
 
-export const getNotes = async (): Promise<Note[]> => {
-  const response = await api.get('/notes');
+export const getNotes = async (cursor?: string, limit = 50): Promise<NotesPage> => {
+  const response = await api.get('/notes', {
+    params: { cursor, limit },
+  });
+  return response.data;
+};
+
+export const getNoteSegments = async (id: string): Promise<Segment[]> => {
+  const response = await api.get(`/notes/${id}/segments`);
   return response.data;
 };
 